@@ -0,0 +1,65 @@
+# Arquivo: cache_solucoes.py
+
+"""
+Cache em memória (LRU com validade) das soluções já resolvidas nesta execução.
+
+Fica na frente do histórico em disco: um pedido repetido na mesma sessão é
+respondido sem abrir o banco nem renderizar o relatório de novo. É seguro para
+uso entre threads (a interface otimiza numa thread separada).
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+MANTER = object()  # Valor padrão de configurar: deixa o limite como está (None tem significado próprio)
+
+class CacheSolucoes:
+    """LRU limitado a `tamanho_max` entradas; entradas mais velhas que `ttl_s` expiram (None = não expira)."""
+
+    def __init__(self, tamanho_max=128, ttl_s=3600.0):
+        self.tamanho_max = tamanho_max
+        self.ttl_s = ttl_s
+        self._entradas = OrderedDict()  # chave -> (instante, valor)
+        self._trava = threading.Lock()
+        self.acertos = 0
+        self.faltas = 0
+
+    def obter(self, chave):
+        """Retorna o valor guardado (marcando-o como o mais recente) ou None."""
+        with self._trava:
+            entrada = self._entradas.get(chave)
+            if entrada is not None and self.ttl_s is not None and time.monotonic() - entrada[0] > self.ttl_s:
+                del self._entradas[chave]
+                entrada = None
+            if entrada is None:
+                self.faltas += 1
+                return None
+            self._entradas.move_to_end(chave)
+            self.acertos += 1
+            return entrada[1]
+
+    def guardar(self, chave, valor):
+        """Guarda o valor, descartando as entradas menos usadas além de tamanho_max."""
+        with self._trava:
+            self._entradas[chave] = (time.monotonic(), valor)
+            self._entradas.move_to_end(chave)
+            while len(self._entradas) > max(0, self.tamanho_max):
+                self._entradas.popitem(last=False)
+
+    def configurar(self, tamanho_max=MANTER, ttl_s=MANTER):
+        """Altera os limites informados (ttl_s=None faz as entradas deixarem de expirar); o excesso é descartado na hora."""
+        with self._trava:
+            if tamanho_max is not MANTER:
+                self.tamanho_max = tamanho_max
+            if ttl_s is not MANTER:
+                self.ttl_s = ttl_s
+            while len(self._entradas) > max(0, self.tamanho_max):
+                self._entradas.popitem(last=False)
+
+    def limpar(self):
+        with self._trava:
+            self._entradas.clear()
+
+    def __len__(self):
+        return len(self._entradas)
@@ -0,0 +1,189 @@
+# Arquivo: cortex_benchmark.py
+
+"""
+Bancada de testes dos algoritmos do CorteX.
+
+Roda cada algoritmo sobre um conjunto de instâncias e mede o tempo (melhor de
+N repetições), o pico de memória (tracemalloc, numa execução à parte; processos
+do pool paralelo não entram na conta), as chapas usadas e a distância para o
+limite inferior (e para o ótimo, quando ele é conhecido). O histórico e o cache
+não são usados, então cada medição é um cálculo de verdade; as tabelas de
+padrões do algoritmo exato também ficam desligadas, a não ser que --tabela-padroes
+indique um diretório (as medições passam a contar com a tabela já pronta).
+
+Instâncias:
+  * geradas: 'uniforme' (classe "u" de Falkenauer: larguras de 20 a 100 em chapa
+    de 150) e 'tripla' (classe "t": trincas que fecham exatamente a chapa de
+    1000, então o ótimo é n/3);
+  * arquivos locais no formato do BPPLIB (Falkenauer, Scholl, ...): quantidade
+    de itens, capacidade e uma largura por linha, ou linhas "largura quantidade".
+
+A saída (JSON ou CSV) serve para comparar duas versões do código:
+    python cortex_benchmark.py --tamanhos 120 250 500 --saida antes.json
+    python cortex_benchmark.py --instancias Falkenauer_T/*.txt --formato csv
+"""
+
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+import otimizador_core as core
+
+# --- Instâncias ---
+
+def gerar_uniforme(n, semente=0, largura_chapa=150, largura_min=20, largura_max=100):
+    """Instância com n peças de largura uniforme em [largura_min, largura_max]."""
+    gerador = random.Random(semente)
+    pecas = {}
+    for _ in range(n):
+        largura = gerador.randint(largura_min, largura_max)
+        pecas[largura] = pecas.get(largura, 0) + 1
+    return {'nome': f"uniforme_{n}_{semente}", 'pecas': pecas, 'largura_chapa': largura_chapa, 'otimo': None}
+
+def gerar_tripla(n, semente=0, largura_chapa=1000):
+    """
+    Instância com n peças (n múltiplo de 3) em trincas que somam exatamente a
+    largura da chapa, como na classe "t" de Falkenauer: o ótimo é n/3 chapas.
+    """
+    gerador = random.Random(semente)
+    pecas = {}
+    for _ in range(n // 3):
+        primeira = gerador.randint(int(largura_chapa * 0.38), int(largura_chapa * 0.49))
+        segunda = gerador.randint(int(largura_chapa * 0.25), (largura_chapa - primeira) // 2)
+        for largura in (primeira, segunda, largura_chapa - primeira - segunda):
+            pecas[largura] = pecas.get(largura, 0) + 1
+    return {'nome': f"tripla_{n}_{semente}", 'pecas': pecas, 'largura_chapa': largura_chapa, 'otimo': n // 3}
+
+GERADORES = {'uniforme': gerar_uniforme, 'tripla': gerar_tripla}
+
+def carregar_bpplib(caminho):
+    """
+    Lê uma instância no formato do BPPLIB: a 1ª linha é o número de itens (ou de
+    larguras distintas), a 2ª a capacidade e as demais "largura" ou "largura quantidade".
+    """
+    with open(caminho, 'r') as f:
+        valores = [linha.split() for linha in f if linha.strip()]
+    capacidade = int(float(valores[1][0]))
+    pecas = {}
+    for linha in valores[2:]:
+        largura = int(float(linha[0]))
+        pecas[largura] = pecas.get(largura, 0) + (int(linha[1]) if len(linha) > 1 else 1)
+    return {'nome': Path(caminho).stem, 'pecas': pecas, 'largura_chapa': capacidade, 'otimo': None}
+
+# --- Algoritmos medidos ---
+
+def _lista_decrescente(pecas_dict):
+    pecas = []
+    for largura, qtd in sorted(pecas_dict.items(), reverse=True):
+        pecas.extend([largura] * qtd)
+    return pecas
+
+# Nome -> função(pecas_dict, largura_chapa, tempo_max_s) que retorna um resultado com 'total_chapas'.
+# Os dois primeiros medem os empacotadores peça a peça, sem as estratégias em volta.
+ALGORITMOS = {
+    'lista_ffd': lambda p, w, t: core.otimizar_com_lista_ffd(_lista_decrescente(p), w),
+    'lista_best_fit': lambda p, w, t: core.otimizar_com_lista_best_fit(_lista_decrescente(p), w),
+    'ffd': lambda p, w, t: core.calcular_melhor_otimizacao(p, w, 100, 'ffd', t),
+    'best_fit': lambda p, w, t: core.calcular_melhor_otimizacao(p, w, 100, 'best_fit', t),
+    'best_fit_paralelo': lambda p, w, t: core.calcular_melhor_otimizacao(p, w, 100, 'best_fit_paralelo', t),
+    'exato': lambda p, w, t: core.calcular_melhor_otimizacao(p, w, 100, 'exato', t),
+    'auto': lambda p, w, t: core.calcular_melhor_otimizacao(p, w, 100, 'auto', t),
+}
+
+def medir(instancia, algoritmo, repeticoes=1, tempo_max_s=core.TEMPO_MAX_PADRAO_S):
+    """Mede um algoritmo numa instância e retorna a linha de resultado."""
+    funcao = ALGORITMOS[algoritmo]
+    pecas, largura_chapa = instancia['pecas'], instancia['largura_chapa']
+    tempos = []
+    for _ in range(max(1, repeticoes)):
+        inicio = time.perf_counter()
+        resultado = funcao(pecas, largura_chapa, tempo_max_s)
+        tempos.append(time.perf_counter() - inicio)
+
+    tracemalloc.start()
+    try:
+        funcao(pecas, largura_chapa, tempo_max_s)
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    limite = core.calcular_limite_inferior(pecas, largura_chapa)
+    total = resultado['total_chapas']
+    return {
+        'instancia': instancia['nome'],
+        'pecas': sum(pecas.values()),
+        'larguras_distintas': len(pecas),
+        'largura_chapa': largura_chapa,
+        'algoritmo': algoritmo,
+        'tempo_s': min(tempos),
+        'memoria_pico_kb': pico / 1024,
+        'total_chapas': total,
+        'limite_inferior': limite,
+        'gap_limite': total - limite,
+        'otimo': instancia['otimo'],
+        'gap_otimo': total - instancia['otimo'] if instancia['otimo'] is not None else None,
+    }
+
+def executar(instancias, algoritmos, repeticoes=1, tempo_max_s=core.TEMPO_MAX_PADRAO_S, log=sys.stderr):
+    """Gera uma linha de resultado por (instância, algoritmo)."""
+    for instancia in instancias:
+        for algoritmo in algoritmos:
+            linha = medir(instancia, algoritmo, repeticoes, tempo_max_s)
+            log.write(f"{linha['instancia']:<24} {algoritmo:<18} {linha['tempo_s']:>9.4f}s "
+                      f"{linha['total_chapas']:>6} chapas (gap {linha['gap_limite']})\n")
+            yield linha
+
+def _ambiente():
+    return {
+        'data': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'cpus': os.cpu_count(),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="CorteX - bancada de testes dos algoritmos.")
+    parser.add_argument('--tipos', nargs='*', choices=sorted(GERADORES), default=sorted(GERADORES),
+                        help="Famílias de instâncias geradas.")
+    parser.add_argument('--tamanhos', nargs='*', type=int, default=[120, 250, 500], help="Número de peças das instâncias geradas.")
+    parser.add_argument('--sementes', type=int, default=1, help="Instâncias geradas por tipo e tamanho.")
+    parser.add_argument('--instancias', nargs='*', default=[], help="Arquivos no formato do BPPLIB (Falkenauer, Scholl, ...).")
+    parser.add_argument('--algoritmos', nargs='*', choices=list(ALGORITMOS), default=list(ALGORITMOS))
+    parser.add_argument('--repeticoes', type=int, default=1, help="Execuções por medição de tempo (vale a menor).")
+    parser.add_argument('--tempo-max', type=float, default=2.0, help="Orçamento das estratégias iterativas (s).")
+    parser.add_argument('--formato', choices=('json', 'csv'), default='json')
+    parser.add_argument('--saida', help="Arquivo de saída (padrão: saída padrão).")
+    parser.add_argument('--tabela-padroes', help="Diretório das tabelas de padrões do exato (padrão: sem tabela).")
+    args = parser.parse_args(argv)
+    core.configurar_tabela_padroes(args.tabela_padroes)
+
+    instancias = [GERADORES[tipo](n, semente) for tipo in args.tipos for n in args.tamanhos for semente in range(args.sementes)]
+    instancias += [carregar_bpplib(caminho) for caminho in args.instancias]
+    linhas = list(executar(instancias, args.algoritmos, args.repeticoes, args.tempo_max))
+
+    saida = open(args.saida, 'w', newline='', encoding='utf-8') if args.saida else sys.stdout
+    try:
+        if args.formato == 'csv':
+            escritor = csv.DictWriter(saida, fieldnames=list(linhas[0]) if linhas else [])
+            escritor.writeheader()
+            escritor.writerows(linhas)
+        else:
+            json.dump({'ambiente': _ambiente(), 'resultados': linhas}, saida, indent=2)
+            saida.write("\n")
+    finally:
+        if args.saida:
+            saida.close()
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    main()
@@ -0,0 +1,340 @@
+# Arquivo: cortex_lote.py
+
+"""
+Modo em lote do CorteX, pela linha de comando.
+
+Lê pedidos de arquivos .json (o formato salvo pelo botão "Salvar Pedido"), de
+pastas com esses arquivos ou de fluxos JSONL (arquivos .jsonl ou '-' para a
+entrada padrão, um pedido por linha), resolve vários ao mesmo tempo num pool de
+processos e escreve cada resultado na saída padrão assim que ele fica pronto.
+Progresso e vazão vão para a saída de erro.
+
+Cada linha JSONL pode ser a lista de peças ou um objeto
+{"id": ..., "pecas": [...] ou {largura: qtd}, "largura_chapa": ..., "meta": ..., "algoritmo": ...};
+os campos ausentes usam os valores da linha de comando.
+
+Pedidos com comprimento ([{"largura", "comprimento", "quantidade"}, ...] ou
+{"LxC": qtd}) são cortados em 2D, na chapa largura_chapa x comprimento_chapa
+(campo do pedido ou --comprimento-chapa), pelo corte guilhotinado do
+otimizador_2d; eles não passam pelo histórico nem pelo cache.
+
+Com --consolidar, os pedidos da mesma largura de chapa são otimizados juntos
+(ver otimizador_core.consolidar_pedidos) e sai um plano por largura, com o
+pedido de origem de cada corte.
+
+Exemplos:
+    python cortex_lote.py pedidos/ > planos.jsonl
+    python cortex_lote.py exportacao_erp.jsonl --algoritmo exato --formato texto
+    python cortex_lote.py turno_manha/ --consolidar --formato texto
+    python cortex_lote.py tampos.jsonl --largura-chapa 1850 --comprimento-chapa 2750
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+
+import metricas
+import otimizador_2d
+import otimizador_core as core
+
+ALGORITMOS = ('auto', 'ffd', 'best_fit', 'best_fit_paralelo', 'exato')
+
+# --- Leitura dos pedidos ---
+
+def _pedido(identificador, dados, padroes):
+    """Monta o pedido a resolver a partir de uma lista de peças ou de um objeto com 'pecas'."""
+    pedido = dict(padroes)
+    if isinstance(dados, dict) and 'pecas' in dados:
+        pedido.update({campo: dados[campo] for campo in ('largura_chapa', 'comprimento_chapa', 'meta', 'algoritmo')
+                       if campo in dados})
+        identificador = str(dados.get('id', identificador))
+        dados = dados['pecas']
+    pedido['id'] = identificador
+    pedido['pecas'] = dados
+    return pedido
+
+def _ler_jsonl(linhas, origem, padroes):
+    for numero, linha in enumerate(linhas, 1):
+        linha = linha.strip()
+        if not linha:
+            continue
+        identificador = f"{origem}:{numero}"
+        try:
+            yield _pedido(identificador, json.loads(linha), padroes)
+        except json.JSONDecodeError as erro:
+            yield {'id': identificador, 'erro': f"JSON inválido: {erro}"}
+
+def ler_pedidos(entradas, padroes):
+    """
+    Gera os pedidos das entradas (arquivos, pastas, .jsonl ou '-'), na ordem dada.
+    Entradas ilegíveis viram pedidos com 'erro', para o lote seguir adiante.
+    """
+    for entrada in entradas:
+        if entrada == '-':
+            yield from _ler_jsonl(sys.stdin, 'stdin', padroes)
+            continue
+        caminho = Path(entrada)
+        arquivos = sorted(caminho.glob('*.json')) + sorted(caminho.glob('*.jsonl')) if caminho.is_dir() else [caminho]
+        for arquivo in arquivos:
+            try:
+                if arquivo.suffix == '.jsonl':
+                    with open(arquivo, 'r', encoding='utf-8') as f:
+                        yield from _ler_jsonl(f, str(arquivo), padroes)
+                else:
+                    with open(arquivo, 'r', encoding='utf-8') as f:
+                        yield _pedido(str(arquivo), json.load(f), padroes)
+            except (OSError, json.JSONDecodeError) as erro:
+                yield {'id': str(arquivo), 'erro': f"Não foi possível ler o pedido: {erro}"}
+
+# --- Resolução (roda nos processos do pool) ---
+
+def validar_pedido(pedido):
+    """Converte os campos do pedido em (pecas, largura_chapa, meta, algoritmo); ValueError se algum for inválido."""
+    try:
+        pecas = core.pecas_de_pedido(pedido['pecas'])
+        largura_chapa = int(pedido['largura_chapa'])
+        meta = float(pedido['meta'])
+    except (ValueError, TypeError, AttributeError) as erro:
+        raise ValueError(f"Pedido inválido: {erro}")
+    algoritmo = pedido['algoritmo']
+    if algoritmo not in ALGORITMOS:
+        raise ValueError(f"Algoritmo desconhecido: {algoritmo}")
+    return pecas, largura_chapa, meta, algoritmo
+
+def montar_saida(identificador, resposta, largura_chapa, meta, algoritmo, formato='jsonl'):
+    """
+    Dicionário de saída (uma linha JSONL) a partir de uma resposta de resolver_pedido.
+    O relatório em texto só é gerado (em 'relatorio') quando o formato é 'texto'.
+    """
+    resultado = resposta['resultado']
+    saida = {
+        'id': identificador,
+        'origem': resposta['origem'],
+        'largura_chapa': largura_chapa,
+        'algoritmo': algoritmo,
+        'total_chapas': resultado['total_chapas'],
+        'aproveitamento': resultado['aproveitamento'],
+        'limite_inferior': resultado.get('limite_inferior'),
+        'otimo_comprovado': bool(resultado.get('otimo_comprovado')),
+        'padroes': resultado.get('padroes', []),
+    }
+    if 'metricas' in resposta:
+        saida['metricas'] = resposta['metricas']
+    if formato == 'texto':
+        saida['relatorio'] = core.formatar_relatorio_final(resposta, meta, algoritmo)
+    return saida
+
+def relatorio_da_saida(saida, meta):
+    """
+    Relatório em texto de uma saída de montar_saida ou resolver_2d gerada sem ele
+    (ex.: o serviço calcula uma vez para pedidos idênticos e formata o texto só
+    para quem o pediu).
+    """
+    if 'chapas' in saida:
+        return otimizador_2d.exibir_resultado_2d_como_texto(saida, saida['largura_chapa'], saida['comprimento_chapa'])
+    resposta = {'resultado': saida, 'largura_chapa': saida['largura_chapa'], 'origem': saida['origem']}
+    if 'metricas' in saida:
+        resposta['metricas'] = saida['metricas']
+    return core.formatar_relatorio_final(resposta, meta, saida['algoritmo'])
+
+def resolver_2d(pedido, formato='jsonl'):
+    """Resolve um pedido com comprimentos pelo corte guilhotinado (otimizador_2d)."""
+    try:
+        pecas = otimizador_2d.pecas_de_pedido_2d(pedido['pecas'])
+        largura_chapa = int(pedido['largura_chapa'])
+        comprimento_chapa = int(pedido.get('comprimento_chapa', otimizador_2d.COMPRIMENTO_CHAPA_PADRAO))
+        resultado = otimizador_2d.otimizar_guilhotina(pecas, largura_chapa, comprimento_chapa)
+    except (ValueError, TypeError, AttributeError) as erro:
+        return {'id': pedido['id'], 'erro': f"Pedido inválido: {erro}"}
+    saida = {
+        'id': pedido['id'],
+        'origem': 'calculo',
+        'largura_chapa': largura_chapa,
+        'comprimento_chapa': comprimento_chapa,
+        'algoritmo': 'guilhotina_2d',
+        'total_chapas': resultado['total_chapas'],
+        'aproveitamento': resultado['aproveitamento'],
+        'limite_inferior': resultado['limite_inferior'],
+        'otimo_comprovado': resultado['total_chapas'] <= resultado['limite_inferior'],
+        'chapas': resultado['chapas'],
+    }
+    if formato == 'texto':
+        saida['relatorio'] = otimizador_2d.exibir_resultado_2d_como_texto(resultado, largura_chapa, comprimento_chapa)
+    return saida
+
+def resolver(pedido, formato='jsonl'):
+    """
+    Resolve um pedido e retorna um dicionário pronto para virar uma linha JSONL
+    (ou, com formato 'texto', também o relatório que _escrever vai mostrar).
+    """
+    if 'erro' in pedido:
+        return pedido
+    if otimizador_2d.e_pedido_2d(pedido['pecas']):
+        return resolver_2d(pedido, formato)
+    try:
+        pecas, largura_chapa, meta, algoritmo = validar_pedido(pedido)
+    except ValueError as erro:
+        return {'id': pedido['id'], 'erro': str(erro)}
+    resposta = core.resolver_pedido(pecas, largura_chapa, meta, algoritmo, pedido['tempo_max_s'], pedido['tempo_melhoria_s'])
+    return montar_saida(pedido['id'], resposta, largura_chapa, meta, algoritmo, formato)
+
+# --- Consolidação (no processo principal) ---
+
+def consolidar_lote(pedidos, formato='jsonl', saida=sys.stdout, log=sys.stderr):
+    """
+    Agrupa os pedidos por largura de chapa e otimiza cada grupo de uma vez. O
+    algoritmo, a meta e os tempos de cada grupo são os do primeiro pedido dele.
+    Pedidos inválidos saem como erro e não entram no grupo; pedidos 2D são
+    resolvidos um a um. Retorna (total, erros).
+    """
+    grupos = {}
+    total = erros = 0
+    for pedido in pedidos:
+        total += 1
+        if 'erro' not in pedido and otimizador_2d.e_pedido_2d(pedido['pecas']):
+            pedido = resolver_2d(pedido, formato)
+            if 'erro' not in pedido:
+                _escrever(saida, pedido, formato)
+                continue
+        if 'erro' in pedido:
+            erros += 1
+            _escrever(saida, pedido, formato)
+            continue
+        try:
+            pecas = core.pecas_de_pedido(pedido['pecas'])
+            largura_chapa = int(pedido['largura_chapa'])
+        except (ValueError, TypeError, AttributeError) as erro:
+            erros += 1
+            _escrever(saida, {'id': pedido['id'], 'erro': f"Pedido inválido: {erro}"}, formato)
+            continue
+        grupo = grupos.setdefault(largura_chapa, {'pedido': pedido, 'pecas': {}})
+        grupo['pecas'][pedido['id']] = pecas
+
+    for largura_chapa, grupo in grupos.items():
+        modelo = grupo['pedido']
+        meta, algoritmo = float(modelo['meta']), modelo['algoritmo']
+        inicio = time.monotonic()
+        resposta = core.consolidar_pedidos(grupo['pecas'], largura_chapa, meta, algoritmo,
+                                           modelo['tempo_max_s'], modelo['tempo_melhoria_s'])
+        resultado = resposta['resultado']
+        log.write(f"Chapa {largura_chapa}mm: {len(grupo['pecas'])} pedidos -> {resultado['total_chapas']} chapas, "
+                  f"{resultado['aproveitamento']:.2f}% ({resposta['origem']}, {time.monotonic() - inicio:.1f}s)\n")
+        saida_grupo = {
+            'id': f"consolidado_{largura_chapa}",
+            'origem': resposta['origem'],
+            'largura_chapa': largura_chapa,
+            'algoritmo': algoritmo,
+            'total_chapas': resultado['total_chapas'],
+            'aproveitamento': resultado['aproveitamento'],
+            'limite_inferior': resultado.get('limite_inferior'),
+            'pedidos': resposta['pedidos'],
+            'padroes': resultado['padroes'],
+        }
+        if 'metricas' in resposta:
+            saida_grupo['metricas'] = resposta['metricas']
+        if formato == 'texto':
+            saida_grupo['relatorio'] = core.formatar_relatorio_final(resposta, meta, algoritmo)
+        _escrever(saida, saida_grupo, formato)
+    return total, erros
+
+# --- Saída ---
+
+def _escrever(saida, resposta, formato):
+    if formato == 'texto':
+        saida.write(f"===== {resposta['id']} =====\n")
+        saida.write(f"ERRO: {resposta['erro']}\n\n" if 'erro' in resposta else resposta['relatorio'] + "\n\n")
+    else:
+        saida.write(json.dumps(resposta, ensure_ascii=False) + "\n")
+    saida.flush()
+
+def executar_lote(pedidos, processos=None, formato='jsonl', saida=sys.stdout, log=sys.stderr):
+    """
+    Resolve os pedidos num pool de processos e escreve cada resposta assim que ela
+    termina (a ordem da saída é a de conclusão; use o 'id' para casar). No máximo
+    2 pedidos por processo ficam em andamento, então fluxos longos não são lidos
+    inteiros para a memória. Cada processo resolve um pedido por vez e não abre
+    pool próprio: a busca multi-início de 'best_fit_paralelo' e do 'auto' roda
+    nele mesmo, lote a lote (core.configurar_processos(1)).
+    Retorna (total, erros).
+    """
+    processos = processos or os.cpu_count() or 1
+    inicio = time.monotonic()
+    total = erros = 0
+    pendentes = {}  # futuro -> id do pedido
+    pedidos = iter(pedidos)
+    with ProcessPoolExecutor(max_workers=processos, initializer=core.configurar_processos, initargs=(1,)) as pool:
+        esgotado = False
+        while pendentes or not esgotado:
+            while not esgotado and len(pendentes) < 2 * processos:
+                pedido = next(pedidos, None)
+                if pedido is None:
+                    esgotado = True
+                else:
+                    pendentes[pool.submit(resolver, pedido, formato)] = pedido.get('id', '?')
+            if not pendentes:
+                break
+            prontos, _ = wait(pendentes, return_when=FIRST_COMPLETED)
+            for futuro in prontos:
+                identificador = pendentes.pop(futuro)
+                try:
+                    resposta = futuro.result()
+                except Exception as erro:  # Falha inesperada num processo do pool
+                    resposta = {'id': identificador, 'erro': f"{type(erro).__name__}: {erro}"}
+                total += 1
+                decorrido = time.monotonic() - inicio
+                if 'erro' in resposta:
+                    erros += 1
+                    situacao = f"ERRO: {resposta['erro']}"
+                else:
+                    situacao = (f"{resposta['total_chapas']} chapas, {resposta['aproveitamento']:.2f}% "
+                                f"({resposta['origem']})")
+                log.write(f"[{total}] {resposta['id']}: {situacao} | {total / decorrido:.2f} pedidos/s\n")
+                _escrever(saida, resposta, formato)
+
+    decorrido = time.monotonic() - inicio
+    log.write(f"Concluído: {total} pedidos em {decorrido:.1f}s "
+              f"({total / decorrido if decorrido else 0:.2f} pedidos/s), {erros} com erro.\n")
+    return total, erros
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="CorteX - otimização de pedidos em lote.")
+    parser.add_argument('entradas', nargs='+', help="Arquivos .json/.jsonl, pastas com pedidos ou '-' (JSONL na entrada padrão).")
+    parser.add_argument('--largura-chapa', type=int, default=core.LARGURA_CHAPA_PADRAO, help="Largura da chapa em mm.")
+    parser.add_argument('--comprimento-chapa', type=int, default=otimizador_2d.COMPRIMENTO_CHAPA_PADRAO,
+                        help="Comprimento da chapa em mm (só para pedidos 2D).")
+    parser.add_argument('--meta', type=float, default=core.META_EXCELENCIA, help="Meta de aproveitamento (%%).")
+    parser.add_argument('--algoritmo', choices=ALGORITMOS, default='best_fit')
+    parser.add_argument('--tempo-max', type=float, default=core.TEMPO_MAX_PADRAO_S, help="Orçamento de tempo por pedido (s).")
+    parser.add_argument('--busca-local', action='store_true', help="Refina cada plano com a busca local.")
+    parser.add_argument('--processos', type=int, default=None, help="Pedidos resolvidos ao mesmo tempo (padrão: núcleos da CPU).")
+    parser.add_argument('--formato', choices=('jsonl', 'texto'), default='jsonl', help="Formato da saída padrão.")
+    parser.add_argument('--metricas', action='store_true', help="Inclui as métricas de cada otimização na saída.")
+    parser.add_argument('--consolidar', action='store_true',
+                        help="Otimiza juntos os pedidos da mesma largura de chapa (um plano por largura).")
+    args = parser.parse_args(argv)
+    if args.metricas:
+        os.environ[metricas.VARIAVEL_AMBIENTE] = "1"  # Herdada pelos processos do pool
+
+    padroes = {
+        'largura_chapa': args.largura_chapa,
+        'comprimento_chapa': args.comprimento_chapa,
+        'meta': args.meta,
+        'algoritmo': args.algoritmo,
+        'tempo_max_s': args.tempo_max,
+        'tempo_melhoria_s': core.TEMPO_MELHORIA_PADRAO_S if args.busca_local else 0,
+    }
+    if args.consolidar:
+        _, erros = consolidar_lote(ler_pedidos(args.entradas, padroes), args.formato)
+    else:
+        _, erros = executar_lote(ler_pedidos(args.entradas, padroes), args.processos, args.formato)
+    return 1 if erros else 0
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
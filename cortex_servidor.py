@@ -0,0 +1,246 @@
+# Arquivo: cortex_servidor.py
+
+"""
+Serviço HTTP local do CorteX (asyncio, só biblioteca padrão).
+
+Várias estações usam o mesmo otimizador enviando o pedido para este processo,
+que escuta apenas em 127.0.0.1. Pedidos já resolvidos (cache em memória ou
+histórico, consultados numa thread) são respondidos sem passar pelo pool; os
+demais rodam num pool de processos (sem pool dentro do pool) e passam por
+resolver_pedido, que grava no mesmo histórico. Pedidos idênticos (mesmo pedido,
+largura de chapa, algoritmo e meta) que chegam enquanto um deles ainda está
+sendo resolvido esperam pelo mesmo cálculo em vez de disparar outro; o relatório
+em texto é gerado depois, só para as requisições que o pediram.
+
+    POST /otimizar   corpo: {"pecas": [...] ou {largura: qtd}, "largura_chapa": 1200,
+                             "meta": 99, "algoritmo": "best_fit"}
+                     pedidos 2D: "pecas" com comprimentos ({"600x400": qtd} ou
+                     [{"largura", "comprimento", "quantidade"}]) e "comprimento_chapa";
+                     resposta em JSON; com ?formato=texto, o relatório em texto.
+    GET  /saude      estado do serviço.
+
+Exemplo:
+    python cortex_servidor.py --porta 8765
+    curl -d '{"pecas": {"500": 20, "110": 10}}' http://127.0.0.1:8765/otimizar?formato=texto
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+import otimizador_2d
+import otimizador_core as core
+from cortex_lote import montar_saida, relatorio_da_saida, resolver, validar_pedido
+
+HOST = "127.0.0.1"
+PORTA_PADRAO = 8765
+TAMANHO_MAX_CORPO = 10 * 1024 * 1024
+TIMEOUT_LEITURA_S = 30.0
+
+_MOTIVOS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+            413: "Payload Too Large", 500: "Internal Server Error"}
+
+class ErroHTTP(Exception):
+    def __init__(self, status, mensagem):
+        super().__init__(mensagem)
+        self.status = status
+
+class ServidorCorteX:
+    """Atende as requisições HTTP e agrupa otimizações idênticas em andamento."""
+
+    def __init__(self, processos=None, tempo_max_s=core.TEMPO_MAX_PADRAO_S):
+        # Cada processo resolve um pedido por vez, com a busca paralela rodando nele mesmo.
+        self.processos = processos or os.cpu_count() or 1
+        self.pool = ProcessPoolExecutor(max_workers=self.processos,
+                                        initializer=core.configurar_processos, initargs=(1,))
+        self.tempo_max_s = tempo_max_s
+        self._em_andamento = {}  # (chave do histórico, meta, busca local) -> future da otimização
+        self.atendidos = 0
+        self.agrupados = 0
+        self.ja_resolvidos = 0  # Respondidos do cache/histórico sem passar pelo pool
+
+    def preparar_pool(self):
+        """
+        Cria os processos do pool antes de aceitar conexões: um processo criado com
+        fork no meio de uma requisição herdaria o socket dela, e o cliente só veria
+        a conexão fechar quando esse processo terminasse.
+        """
+        for futuro in [self.pool.submit(os.getpid) for _ in range(self.processos)]:
+            futuro.result()
+
+    # --- Otimização ---
+
+    async def otimizar(self, corpo, formato='jsonl'):
+        """
+        Resolve o pedido do corpo (JSON), reaproveitando um cálculo idêntico em
+        andamento. Com formato 'texto' a resposta traz também o 'relatorio'.
+        """
+        try:
+            dados = json.loads(corpo or b"{}")
+        except (json.JSONDecodeError, UnicodeDecodeError) as erro:
+            raise ErroHTTP(400, f"JSON inválido: {erro}")
+        if not isinstance(dados, dict) or 'pecas' not in dados:
+            raise ErroHTTP(400, "O corpo deve ser um objeto com o campo 'pecas'.")
+        pedido = {
+            'id': str(dados.get('id', '')),
+            'pecas': dados['pecas'],
+            'largura_chapa': dados.get('largura_chapa', core.LARGURA_CHAPA_PADRAO),
+            'meta': dados.get('meta', core.META_EXCELENCIA),
+            'algoritmo': dados.get('algoritmo', 'best_fit'),
+            'tempo_max_s': self.tempo_max_s,
+            'tempo_melhoria_s': core.TEMPO_MELHORIA_PADRAO_S if dados.get('busca_local') else 0,
+        }
+        if otimizador_2d.e_pedido_2d(pedido['pecas']):
+            pedido['comprimento_chapa'] = dados.get('comprimento_chapa', otimizador_2d.COMPRIMENTO_CHAPA_PADRAO)
+            try:
+                pecas = otimizador_2d.pecas_de_pedido_2d(pedido['pecas'])
+                largura_chapa, comprimento_chapa = int(pedido['largura_chapa']), int(pedido['comprimento_chapa'])
+            except (ValueError, TypeError, AttributeError) as erro:
+                raise ErroHTTP(400, f"Pedido inválido: {erro}")
+            # Planos 2D não passam pelo cache nem pelo histórico (que são de pedidos 1D) e têm chave própria.
+            chave = ('2d', tuple(sorted(pecas.items())), largura_chapa, comprimento_chapa)
+            calcular = lambda: asyncio.get_running_loop().run_in_executor(self.pool, resolver, pedido)
+            meta = None
+        else:
+            try:
+                pecas, largura_chapa, meta, algoritmo = validar_pedido(pedido)
+            except ValueError as erro:
+                raise ErroHTTP(400, str(erro))
+            chave = (core.gerar_chave_historico(pecas, largura_chapa, algoritmo), meta, pedido['tempo_melhoria_s'])
+            calcular = lambda: self._resolver(pedido, pecas, largura_chapa, meta, algoritmo)
+
+        futuro = self._em_andamento.get(chave)
+        agrupado = futuro is not None
+        if agrupado:
+            self.agrupados += 1
+        else:
+            futuro = asyncio.ensure_future(calcular())
+            self._em_andamento[chave] = futuro
+            futuro.add_done_callback(lambda _: self._em_andamento.pop(chave, None))
+        # shield: um cliente que desconecta não cancela o cálculo dos outros.
+        resposta = dict(await asyncio.shield(futuro))
+        if 'erro' in resposta:
+            raise ErroHTTP(400, resposta['erro'])
+        resposta['id'] = pedido['id']
+        resposta['agrupado'] = agrupado
+        if formato == 'texto':
+            # O cálculo é compartilhado; o texto é de cada requisição (e fica fora do laço de eventos).
+            resposta['relatorio'] = await asyncio.get_running_loop().run_in_executor(
+                None, relatorio_da_saida, resposta, meta)
+        return resposta
+
+    async def _resolver(self, pedido, pecas, largura_chapa, meta, algoritmo):
+        """
+        Um pedido já resolvido não ocupa o pool: cache e histórico são consultados
+        numa thread (o SQLite pode esperar pelo bloqueio de outra instância sem
+        travar o laço de eventos); um banco bloqueado conta como solução não
+        encontrada. Os demais pedidos vão para o pool.
+        """
+        laco = asyncio.get_running_loop()
+        try:
+            conhecida = await laco.run_in_executor(None, core.consultar_solucao, pecas, largura_chapa, meta, algoritmo)
+        except sqlite3.OperationalError:
+            conhecida = None
+        if conhecida is not None:
+            self.ja_resolvidos += 1
+            return montar_saida(pedido['id'], conhecida, largura_chapa, meta, algoritmo)
+        return await laco.run_in_executor(self.pool, resolver, pedido)
+
+    # --- HTTP ---
+
+    async def atender(self, leitor, escritor):
+        try:
+            try:
+                metodo, caminho, corpo = await asyncio.wait_for(self._ler_requisicao(leitor), TIMEOUT_LEITURA_S)
+                url = urlsplit(caminho)
+                formato = parse_qs(url.query).get('formato', ['json'])[0]
+                if url.path == '/saude':
+                    if metodo != 'GET':
+                        raise ErroHTTP(405, "Use GET.")
+                    status, conteudo = 200, {'status': 'ok', 'atendidos': self.atendidos, 'agrupados': self.agrupados,
+                                             'ja_resolvidos': self.ja_resolvidos,
+                                             'em_andamento': len(self._em_andamento)}
+                elif url.path == '/otimizar':
+                    if metodo != 'POST':
+                        raise ErroHTTP(405, "Use POST.")
+                    if formato == 'texto':
+                        conteudo = (await self.otimizar(corpo, 'texto'))['relatorio']
+                    else:
+                        conteudo = await self.otimizar(corpo)
+                    status = 200
+                else:
+                    raise ErroHTTP(404, "Caminho desconhecido.")
+            except ErroHTTP as erro:
+                status, conteudo = erro.status, {'erro': str(erro)}
+            except asyncio.TimeoutError:
+                return
+            except Exception as erro:
+                status, conteudo = 500, {'erro': f"Falha durante a otimização: {erro}"}
+            self.atendidos += 1
+            await self._responder(escritor, status, conteudo)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            escritor.close()
+
+    async def _ler_requisicao(self, leitor):
+        linha = (await leitor.readline()).decode('latin-1').split()
+        if len(linha) != 3:
+            raise ErroHTTP(400, "Requisição HTTP inválida.")
+        metodo, caminho, _ = linha
+        cabecalhos = {}
+        while True:
+            cabecalho = (await leitor.readline()).decode('latin-1').strip()
+            if not cabecalho:
+                break
+            nome, _, valor = cabecalho.partition(':')
+            cabecalhos[nome.strip().lower()] = valor.strip()
+        try:
+            tamanho = int(cabecalhos.get('content-length', 0))
+        except ValueError:
+            raise ErroHTTP(400, "Content-Length inválido.")
+        if tamanho > TAMANHO_MAX_CORPO:
+            raise ErroHTTP(413, "Pedido grande demais.")
+        corpo = await leitor.readexactly(tamanho) if tamanho else b""
+        return metodo.upper(), caminho, corpo
+
+    async def _responder(self, escritor, status, conteudo):
+        if isinstance(conteudo, str):
+            dados, tipo = conteudo.encode('utf-8'), "text/plain; charset=utf-8"
+        else:
+            dados, tipo = json.dumps(conteudo, ensure_ascii=False).encode('utf-8'), "application/json; charset=utf-8"
+        cabecalho = (f"HTTP/1.1 {status} {_MOTIVOS[status]}\r\nContent-Type: {tipo}\r\n"
+                     f"Content-Length: {len(dados)}\r\nConnection: close\r\n\r\n")
+        escritor.write(cabecalho.encode('latin-1') + dados)
+        await escritor.drain()
+
+    async def servir(self, porta=PORTA_PADRAO):
+        self.preparar_pool()
+        servidor = await asyncio.start_server(self.atender, HOST, porta)
+        print(f"CorteX atendendo em http://{HOST}:{porta}", flush=True)
+        try:
+            async with servidor:
+                await servidor.serve_forever()
+        finally:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="CorteX - serviço HTTP local de otimização.")
+    parser.add_argument('--porta', type=int, default=PORTA_PADRAO)
+    parser.add_argument('--processos', type=int, default=None, help="Otimizações simultâneas (padrão: núcleos da CPU).")
+    parser.add_argument('--tempo-max', type=float, default=core.TEMPO_MAX_PADRAO_S, help="Orçamento de tempo por pedido (s).")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(ServidorCorteX(args.processos, args.tempo_max).servir(args.porta))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    main()
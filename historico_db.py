@@ -0,0 +1,172 @@
+# Arquivo: historico_db.py
+
+"""
+Histórico de otimizações em SQLite.
+
+Substitui a regravação completa do historico_otimizacao.json: cada solução é uma
+linha indexada pela chave (pedido + largura da chapa + algoritmo), a leitura é uma
+busca pela chave e a gravação é um único UPSERT dentro de uma transação. O SQLite
+bloqueia o arquivo durante a escrita, então duas instâncias do CorteX apontando
+para o mesmo banco (ex.: numa pasta de rede) não sobrescrevem uma à outra; quem
+chega depois espera até TIMEOUT_BLOQUEIO_S. O modo WAL não é usado porque ele não
+funciona em compartilhamentos de rede.
+
+Planos de pedidos consolidados (vários pedidos somados) ficam marcados na coluna
+'consolidado' e com chave própria: são reaproveitados quando o mesmo conjunto
+volta, mas não aparecem em listar_pedidos nem como ponto de partida de um
+pedido comum.
+"""
+
+import json
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+
+TIMEOUT_BLOQUEIO_S = 30.0
+
+# (banco, JSON legado) cujo esquema e migração já foram conferidos neste processo
+_preparados = set()
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS solucoes (
+    chave            TEXT PRIMARY KEY,
+    pecas_id         TEXT NOT NULL,
+    largura_chapa    NUMERIC NOT NULL,
+    algoritmo        TEXT NOT NULL,
+    total_chapas     INTEGER NOT NULL,
+    aproveitamento   REAL NOT NULL,
+    otimo_comprovado INTEGER NOT NULL DEFAULT 0,
+    consolidado      INTEGER NOT NULL DEFAULT 0,
+    dados            TEXT NOT NULL,
+    timestamp        TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_solucoes_largura ON solucoes (largura_chapa, algoritmo);
+CREATE INDEX IF NOT EXISTS idx_solucoes_recentes ON solucoes (largura_chapa, algoritmo, timestamp);
+CREATE TABLE IF NOT EXISTS migracoes (
+    origem    TEXT PRIMARY KEY,
+    timestamp TEXT NOT NULL
+);
+"""
+
+# Só atualiza a linha existente se a nova solução for melhor (ou comprovar o ótimo).
+_UPSERT = """
+INSERT INTO solucoes (chave, pecas_id, largura_chapa, algoritmo, total_chapas, aproveitamento,
+                      otimo_comprovado, consolidado, dados, timestamp)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (chave) DO UPDATE SET
+    total_chapas = excluded.total_chapas,
+    aproveitamento = excluded.aproveitamento,
+    otimo_comprovado = excluded.otimo_comprovado,
+    dados = excluded.dados,
+    timestamp = excluded.timestamp
+WHERE excluded.aproveitamento > solucoes.aproveitamento
+   OR (excluded.otimo_comprovado AND NOT solucoes.otimo_comprovado
+       AND excluded.total_chapas <= solucoes.total_chapas)
+"""
+
+def gerar_chave(pecas_id, largura_chapa, algoritmo, consolidado=False):
+    """Chave do histórico: pedido canônico + largura da chapa + algoritmo (+ marca de consolidado)."""
+    chave = f"{pecas_id}|L{largura_chapa}|alg:{algoritmo}"
+    return chave + "|consolidado" if consolidado else chave
+
+def abrir(caminho_db, caminho_json_legado=None):
+    """
+    Abre (criando se preciso) o banco de histórico. Se `caminho_json_legado` existir
+    e ainda não tiver sido importado, suas soluções são migradas uma única vez.
+    O esquema e a migração só são conferidos na primeira abertura de cada banco
+    neste processo; as seguintes são só a conexão.
+    """
+    caminho_db = Path(caminho_db).resolve()
+    preparo = (caminho_db, caminho_json_legado and Path(caminho_json_legado).resolve())
+    preparado = preparo in _preparados and caminho_db.exists()
+    conexao = sqlite3.connect(str(caminho_db), timeout=TIMEOUT_BLOQUEIO_S, isolation_level=None)
+    if not preparado:
+        _preparar(conexao, caminho_json_legado)
+        _preparados.add(preparo)
+    return conexao
+
+def _preparar(conexao, caminho_json_legado):
+    """Cria as tabelas, acrescenta colunas novas a bancos antigos e migra o JSON legado."""
+    conexao.executescript(_ESQUEMA)
+    colunas = {linha[1] for linha in conexao.execute("PRAGMA table_info(solucoes)")}
+    if 'consolidado' not in colunas:  # Bancos criados antes da coluna existir
+        try:
+            conexao.execute("ALTER TABLE solucoes ADD COLUMN consolidado INTEGER NOT NULL DEFAULT 0")
+        except sqlite3.OperationalError:
+            pass  # Outra instância acrescentou a coluna primeiro
+    if caminho_json_legado is not None and Path(caminho_json_legado).exists():
+        migrar_json(conexao, caminho_json_legado)
+
+def buscar(conexao, chave):
+    """Retorna a solução armazenada para a chave, ou None."""
+    linha = conexao.execute("SELECT dados FROM solucoes WHERE chave = ?", (chave,)).fetchone()
+    return json.loads(linha[0]) if linha else None
+
+def listar_pedidos(conexao, largura_chapa, algoritmo=None, limite=None):
+    """
+    Lista (chave, pecas_id, total_chapas, aproveitamento) das soluções para a largura
+    de chapa informada (e o algoritmo, se informado), das mais recentes para as mais
+    antigas; `limite` corta a lista no próprio SQLite. Consolidações ficam de fora.
+    """
+    sql = ("SELECT chave, pecas_id, total_chapas, aproveitamento FROM solucoes "
+           "WHERE largura_chapa = ? AND NOT consolidado")
+    parametros = [largura_chapa]
+    if algoritmo is not None:
+        sql += " AND algoritmo = ?"
+        parametros.append(algoritmo)
+    sql += " ORDER BY timestamp DESC"
+    if limite is not None:
+        sql += " LIMIT ?"
+        parametros.append(limite)
+    return conexao.execute(sql, parametros).fetchall()
+
+def gravar(conexao, chave, pecas_id, largura_chapa, algoritmo, solucao, consolidado=False):
+    """
+    Grava a solução se ela for melhor que a armazenada para a chave (ou se não houver
+    nenhuma). A comparação e a escrita acontecem num só comando, sob o bloqueio de
+    escrita do SQLite. `consolidado` marca planos de vários pedidos somados (ver
+    listar_pedidos). Retorna o número de bytes gravados (0 se nada mudou).
+    """
+    dados = json.dumps(solucao, separators=(',', ':'))
+    cursor = conexao.execute(_UPSERT, (
+        chave, pecas_id, largura_chapa, algoritmo, solucao['total_chapas'], solucao['aproveitamento'],
+        int(bool(solucao.get('otimo_comprovado'))), int(consolidado), dados, solucao.get('timestamp') or datetime.now().isoformat(),
+    ))
+    return len(dados) if cursor.rowcount else 0
+
+def migrar_json(conexao, caminho_json):
+    """
+    Importa o historico_otimizacao.json antigo. As chaves antigas não têm a largura
+    da chapa; ela é recuperada de cada solução (largura usada + sobra da primeira
+    chapa). Chaves sem o sufixo '|alg:' vêm da primeira versão, que só usava Best-Fit.
+    O bloqueio de escrita só é pedido se o arquivo ainda não tiver sido importado.
+    """
+    origem = str(Path(caminho_json).resolve())
+    if conexao.execute("SELECT 1 FROM migracoes WHERE origem = ?", (origem,)).fetchone():
+        return 0
+    conexao.execute("BEGIN IMMEDIATE")
+    try:
+        if conexao.execute("SELECT 1 FROM migracoes WHERE origem = ?", (origem,)).fetchone():
+            conexao.execute("COMMIT")
+            return 0
+        with open(caminho_json, 'r') as f:
+            try:
+                historico = json.load(f)
+            except json.JSONDecodeError:
+                historico = {}
+        migradas = 0
+        for chave_antiga, solucao in historico.items():
+            pecas_id, _, algoritmo = chave_antiga.partition("|alg:")
+            detalhes = solucao.get('detalhes_chapas') or []
+            if not detalhes:
+                continue
+            largura_chapa = detalhes[0]['largura_usada'] + detalhes[0]['sobra']
+            algoritmo = algoritmo or 'best_fit'
+            gravar(conexao, gerar_chave(pecas_id, largura_chapa, algoritmo), pecas_id, largura_chapa, algoritmo, solucao)
+            migradas += 1
+        conexao.execute("INSERT INTO migracoes (origem, timestamp) VALUES (?, ?)", (origem, datetime.now().isoformat()))
+        conexao.execute("COMMIT")
+        return migradas
+    except BaseException:
+        conexao.execute("ROLLBACK")
+        raise
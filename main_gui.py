@@ -3,10 +3,16 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext, filedialog
 import json
+import multiprocessing
 import os # Importado para ajudar a encontrar o ícone
+import queue
+import re
+import threading
 
 import otimizador_core as core
 
+PADROES_POR_PAGINA = 200  # Padrões de corte (linhas de chapas iguais) por página do resultado
+
 class OtimizadorApp:
     def __init__(self, master):
         self.master = master
@@ -35,14 +41,7 @@ class OtimizadorApp:
         file_actions_frame.pack(side=tk.LEFT, padx=(10, 0))
         pecas_frame_container = ttk.LabelFrame(main_frame, text="Lista de Peças", padding=10)
         pecas_frame_container.pack(fill=tk.BOTH, expand=True, pady=(0, 10))
-        canvas = tk.Canvas(pecas_frame_container, bg=self.colors['frame_bg'], borderwidth=0, highlightthickness=0)
-        scrollbar = ttk.Scrollbar(pecas_frame_container, orient="vertical", command=canvas.yview)
-        self.pecas_frame = ttk.Frame(canvas, style='Dark.TFrame')
-        self.pecas_frame.bind("<Configure>", lambda e: canvas.configure(scrollregion=canvas.bbox("all")))
-        canvas.create_window((0, 0), window=self.pecas_frame, anchor="nw")
-        canvas.configure(yscrollcommand=scrollbar.set)
-        canvas.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
+        self._create_pecas_table(pecas_frame_container)
         controls_frame = ttk.Frame(main_frame)
         controls_frame.pack(fill=tk.X, pady=(0, 10))
         result_frame = ttk.LabelFrame(main_frame, text="Plano de Otimização CorteX", padding=10)
@@ -51,9 +50,15 @@ class OtimizadorApp:
         self._create_file_action_widgets(file_actions_frame)
         self._create_control_widgets(controls_frame)
         self._create_result_widgets(result_frame)
-        self.pecas_entries = []
         for _ in range(5): self._adicionar_campo_peca()
 
+        # --- Otimização em segundo plano ---
+        self.fila_otimizacao = queue.Queue()
+        self.cancelar_evento = threading.Event()
+        self.worker_otimizacao = None
+        self.plano_atual = None  # Último plano completo (base dos ajustes): {'pecas', 'largura_chapa', 'algoritmo', 'resultado'}
+        self.exibicao = None     # Resposta exibida: {'resposta', 'excelencia', 'algoritmo', 'largura_chapa', 'paginas', 'pagina'}
+
     def _set_app_icon(self):
         """Tenta encontrar e definir o ícone da aplicação."""
         try:
@@ -120,8 +125,14 @@ class OtimizadorApp:
         style.map('Secondary.TButton', background=[('active', self.colors['secondary_active'])])
         style.configure('TEntry', fieldbackground=self.colors['entry_bg'], foreground=self.colors['text'], bordercolor=self.colors['secondary'], insertcolor=self.colors['text'])
         style.map('TEntry', background=[('focus', self.colors['entry_bg'])])
+        style.configure('TCheckbutton', background=self.colors['bg'], foreground=self.colors['text'])
+        style.map('TCheckbutton', background=[('active', self.colors['bg'])])
         style.configure('TCombobox', foreground='#000000', bordercolor=self.colors['secondary'], arrowcolor=self.colors['text'])
         style.map('TCombobox', selectbackground=[('readonly', self.colors['accent'])], selectforeground=[('readonly', self.colors['text'])])
+        style.configure('Treeview', background=self.colors['entry_bg'], fieldbackground=self.colors['entry_bg'], foreground=self.colors['text'], rowheight=24, borderwidth=0)
+        style.map('Treeview', background=[('selected', self.colors['accent'])], foreground=[('selected', self.colors['text'])])
+        style.configure('Treeview.Heading', background=self.colors['secondary'], foreground=self.colors['text'], font=('Segoe UI', 10, 'bold'), relief=tk.FLAT)
+        style.map('Treeview.Heading', background=[('active', self.colors['secondary_active'])])
         style.configure('Vertical.TScrollbar', background=self.colors['secondary'], troughcolor=self.colors['frame_bg'], bordercolor=self.colors['bg'], arrowcolor=self.colors['text'])
         style.map('Vertical.TScrollbar', background=[('active', self.colors['secondary_active'])])
 
@@ -137,9 +148,11 @@ class OtimizadorApp:
         ttk.Entry(frame, textvariable=self.excelencia_var, width=10).grid(row=1, column=1, padx=5, pady=(5,0), sticky="W")
         ttk.Label(frame, text="Algoritmo:").grid(row=0, column=2, sticky="W", padx=(20,5))
         self.algoritmo_var = tk.StringVar()
-        algoritmo_combo = ttk.Combobox(frame, textvariable=self.algoritmo_var, values=["Primeiro Encaixe Decrescente (FFD)", "Melhor Encaixe (Múltiplas Tentativas)"], width=35, state='readonly')
+        algoritmo_combo = ttk.Combobox(frame, textvariable=self.algoritmo_var, values=["Automático (Conforme o Pedido)", "Primeiro Encaixe Decrescente (FFD)", "Melhor Encaixe (Múltiplas Tentativas)", "Melhor Encaixe Paralelo (Multinúcleo)", "Exato (Geração de Colunas)"], width=35, state='readonly')
         algoritmo_combo.grid(row=0, column=3, rowspan=2, sticky="W")
         algoritmo_combo.current(0)
+        self.busca_local_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(frame, text="Refinar com busca local", variable=self.busca_local_var).grid(row=2, column=0, columnspan=2, sticky="W", pady=(5,0))
         
     def _create_file_action_widgets(self, frame):
         ttk.Button(frame, text="Carregar Pedido", command=self._carregar_pedido, style='Secondary.TButton').pack(fill=tk.X, pady=2)
@@ -148,29 +161,186 @@ class OtimizadorApp:
     def _create_control_widgets(self, frame):
         ttk.Button(frame, text="Adicionar Linha", command=self._adicionar_campo_peca, style='Secondary.TButton').pack(side=tk.LEFT, padx=(0, 10))
         ttk.Button(frame, text="Limpar Lista", command=self._limpar_lista_pecas, style='Secondary.TButton').pack(side=tk.LEFT)
-        ttk.Button(frame, text="OTIMIZAR", command=self._otimizar, style="Accent.TButton").pack(side=tk.LEFT, padx=50)
+        self.otimizar_button = ttk.Button(frame, text="OTIMIZAR", command=self._otimizar, style="Accent.TButton")
+        self.otimizar_button.pack(side=tk.LEFT, padx=(50, 10))
+        self.reotimizar_button = ttk.Button(frame, text="Reotimizar Tudo", command=lambda: self._otimizar(completo=True), style='Secondary.TButton')
+        self.reotimizar_button.pack(side=tk.LEFT, padx=(0, 10))
+        self.cancelar_button = ttk.Button(frame, text="Cancelar", command=self._cancelar_otimizacao, style='Secondary.TButton', state="disabled")
+        self.cancelar_button.pack(side=tk.LEFT)
         ttk.Button(frame, text="Exportar Plano de Corte", command=self._exportar_relatorio, style='Secondary.TButton').pack(side=tk.RIGHT)
+        self.status_var = tk.StringVar(value="")
+        ttk.Label(frame, textvariable=self.status_var, foreground=self.colors['disabled_fg']).pack(side=tk.LEFT, padx=10)
 
     def _create_result_widgets(self, frame):
+        paginacao_frame = ttk.Frame(frame)
+        paginacao_frame.pack(side=tk.BOTTOM, fill=tk.X, pady=(5, 0))
+        self.pagina_anterior_button = ttk.Button(paginacao_frame, text="< Anterior", command=lambda: self._exibir_pagina(self.exibicao['pagina'] - 1), style='Secondary.TButton', state="disabled")
+        self.pagina_anterior_button.pack(side=tk.LEFT)
+        self.pagina_var = tk.StringVar(value="")
+        ttk.Label(paginacao_frame, textvariable=self.pagina_var, foreground=self.colors['disabled_fg']).pack(side=tk.LEFT, padx=10)
+        self.proxima_pagina_button = ttk.Button(paginacao_frame, text="Próxima >", command=lambda: self._exibir_pagina(self.exibicao['pagina'] + 1), style='Secondary.TButton', state="disabled")
+        self.proxima_pagina_button.pack(side=tk.LEFT)
         self.result_text = scrolledtext.ScrolledText(frame, wrap=tk.WORD, state="disabled", font=("Courier New", 10), bg=self.colors['entry_bg'], fg=self.colors['text'], relief=tk.FLAT)
         self.result_text.pack(fill=tk.BOTH, expand=True)
 
-    def _adicionar_campo_peca(self):
-        row_frame = ttk.Frame(self.pecas_frame)
-        row_frame.pack(fill=tk.X, pady=4, padx=5)
-        ttk.Label(row_frame, text=f"Item {len(self.pecas_entries) + 1}:").pack(side=tk.LEFT, padx=5)
-        ttk.Label(row_frame, text="Largura (mm):").pack(side=tk.LEFT)
-        largura_entry = ttk.Entry(row_frame, width=10)
-        largura_entry.pack(side=tk.LEFT, padx=5)
-        ttk.Label(row_frame, text="Qtd:").pack(side=tk.LEFT)
-        qtd_entry = ttk.Entry(row_frame, width=8)
-        qtd_entry.pack(side=tk.LEFT, padx=5)
-        self.pecas_entries.append((largura_entry, qtd_entry))
-        
+    def _exibir_pagina(self, pagina):
+        """
+        Mostra só os padrões de uma página do plano (PADROES_POR_PAGINA por vez), com o
+        cabeçalho e o rodapé do relatório; planos com milhares de chapas não passam
+        inteiros pelo widget de texto.
+        """
+        exibicao = self.exibicao
+        exibicao['pagina'] = pagina = max(0, min(pagina, exibicao['paginas'] - 1))
+        cabecalho, rodape = core.partes_relatorio_final(exibicao['resposta'], exibicao['excelencia'], exibicao['algoritmo'])
+        inicio = pagina * PADROES_POR_PAGINA
+        linhas = core.gerar_linhas_relatorio(exibicao['resposta']['resultado'], exibicao['largura_chapa'], inicio, inicio + PADROES_POR_PAGINA)
+        self.result_text.config(state="normal")
+        self.result_text.delete(1.0, tk.END)
+        self.result_text.insert(tk.END, cabecalho + "\n".join(linhas) + rodape)
+        self.result_text.config(state="disabled")
+        self.pagina_var.set(f"Página {pagina + 1} de {exibicao['paginas']}" if exibicao['paginas'] > 1 else "")
+        self.pagina_anterior_button.config(state="normal" if pagina > 0 else "disabled")
+        self.proxima_pagina_button.config(state="normal" if pagina < exibicao['paginas'] - 1 else "disabled")
+
+    def _create_pecas_table(self, frame):
+        """
+        Lista de peças como uma tabela (Treeview): as linhas não são widgets, então
+        pedidos com milhares de linhas carregam e rolam sem travar. A edição é feita
+        por um único Entry posicionado sobre a célula (duplo clique ou Enter).
+        """
+        ttk.Label(frame, text="Duplo clique para editar  |  Ctrl+V cola linhas de planilha (largura, quantidade)  |  Delete remove", foreground=self.colors['disabled_fg']).pack(side=tk.TOP, anchor="w", pady=(0, 5))
+        self.pecas_tree = ttk.Treeview(frame, columns=("item", "largura", "quantidade"), show="headings", selectmode="extended")
+        self.total_linhas_pecas = 0  # Mantido a cada inserção/remoção: contar get_children() por linha seria O(n²)
+        self.pecas_tree.heading("item", text="Item")
+        self.pecas_tree.heading("largura", text="Largura (mm)")
+        self.pecas_tree.heading("quantidade", text="Qtd")
+        self.pecas_tree.column("item", width=60, anchor="center", stretch=False)
+        self.pecas_tree.column("largura", width=140, anchor="e")
+        self.pecas_tree.column("quantidade", width=100, anchor="e")
+        scrollbar = ttk.Scrollbar(frame, orient="vertical", command=self.pecas_tree.yview)
+        self.pecas_tree.configure(yscrollcommand=scrollbar.set)
+        self.pecas_tree.pack(side="left", fill="both", expand=True)
+        scrollbar.pack(side="right", fill="y")
+        self.pecas_tree.bind("<Double-1>", self._editar_celula_peca)
+        self.pecas_tree.bind("<Return>", self._editar_celula_peca)
+        self.pecas_tree.bind("<Delete>", self._remover_linhas_selecionadas)
+        self.pecas_tree.bind("<Control-v>", self._colar_pecas)
+        self.pecas_tree.bind("<Control-V>", self._colar_pecas)
+        self.editor_celula = None
+
+    def _adicionar_campo_peca(self, largura="", quantidade=""):
+        self.total_linhas_pecas += 1
+        return self.pecas_tree.insert("", tk.END, values=(self.total_linhas_pecas, largura, quantidade))
+
+    def _linhas_pecas(self):
+        """Retorna (largura, quantidade) como texto, na ordem da tabela."""
+        return [tuple(str(v) for v in self.pecas_tree.item(item, "values")[1:3]) for item in self.pecas_tree.get_children()]
+
+    def _renumerar_linhas(self):
+        itens = self.pecas_tree.get_children()
+        for numero, item in enumerate(itens, start=1):
+            self.pecas_tree.set(item, "item", numero)
+        self.total_linhas_pecas = len(itens)
+
+    def _editar_celula_peca(self, event):
+        """Duplo clique (na célula) ou Enter (na largura da linha em foco) abre o editor."""
+        if event.type == tk.EventType.KeyPress:
+            item, coluna = self.pecas_tree.focus(), "#2"
+        else:
+            item, coluna = self.pecas_tree.identify_row(event.y), self.pecas_tree.identify_column(event.x)
+        if item and coluna in ("#2", "#3"):
+            self._abrir_editor_celula(item, coluna)
+
+    def _abrir_editor_celula(self, item, coluna):
+        """Posiciona um Entry sobre a célula de largura (#2) ou quantidade (#3)."""
+        self._fechar_editor_celula(salvar=True)
+        self.pecas_tree.see(item)
+        self.pecas_tree.update_idletasks()
+        bbox = self.pecas_tree.bbox(item, coluna)
+        if not bbox:
+            return
+        x, y, largura, altura = bbox
+        nome_coluna = "largura" if coluna == "#2" else "quantidade"
+        editor = ttk.Entry(self.pecas_tree)
+        editor.insert(0, self.pecas_tree.set(item, nome_coluna))
+        editor.select_range(0, tk.END)
+        editor.place(x=x, y=y, width=largura, height=altura)
+        editor.focus_set()
+        self.editor_celula = (editor, item, nome_coluna)
+
+        def proxima_celula(_event):
+            # Enter na largura pula para a quantidade; na quantidade, para a próxima linha.
+            if nome_coluna == "largura":
+                destino_item, destino_coluna = item, "#3"
+            else:
+                self._fechar_editor_celula(salvar=True)
+                destino_item = self.pecas_tree.next(item) or self._adicionar_campo_peca()
+                destino_coluna = "#2"
+            self.pecas_tree.focus(destino_item)
+            self.pecas_tree.selection_set(destino_item)
+            self._abrir_editor_celula(destino_item, destino_coluna)
+            return "break"
+
+        def cancelar(_event):
+            self._fechar_editor_celula(salvar=False)
+            self.pecas_tree.focus_set()
+            return "break"
+
+        editor.bind("<Return>", proxima_celula)
+        editor.bind("<Tab>", proxima_celula)
+        editor.bind("<Escape>", cancelar)
+        editor.bind("<FocusOut>", lambda _event: self._fechar_editor_celula(salvar=True, editor=editor))
+
+    def _fechar_editor_celula(self, salvar, editor=None):
+        """Fecha o editor aberto (gravando o valor se `salvar`); `editor` restringe a um editor específico."""
+        if self.editor_celula is None or (editor is not None and self.editor_celula[0] is not editor):
+            return
+        editor, item, nome_coluna = self.editor_celula
+        self.editor_celula = None
+        if salvar and self.pecas_tree.exists(item):
+            self.pecas_tree.set(item, nome_coluna, editor.get().strip())
+        editor.destroy()
+
+    def _remover_linhas_selecionadas(self, _event=None):
+        selecionadas = self.pecas_tree.selection()
+        if not selecionadas:
+            return
+        self.pecas_tree.delete(*selecionadas)
+        self._renumerar_linhas()
+
+    def _colar_pecas(self, _event=None):
+        """Cola linhas copiadas de planilha: largura e quantidade separadas por tab, espaço, ';' ou ','."""
+        try:
+            texto = self.master.clipboard_get()
+        except tk.TclError:
+            return "break"
+        linhas = []
+        for linha in texto.splitlines():
+            campos = [c for c in re.split(r"[\t;, ]+", linha.strip()) if c]
+            if len(campos) < 2 or not campos[0].isdigit():
+                continue # Cabeçalhos e linhas vazias são ignorados
+            linhas.append((campos[0], campos[1]))
+        if not linhas:
+            messagebox.showwarning("CorteX", "A área de transferência não contém linhas de largura e quantidade.")
+            return "break"
+        # Linhas vazias no fim da tabela são reaproveitadas antes de criar novas.
+        vazias = []
+        for item in reversed(self.pecas_tree.get_children()):
+            if any(self.pecas_tree.item(item, "values")[1:3]):
+                break
+            vazias.append(item)
+        if vazias:
+            self.pecas_tree.delete(*vazias)
+            self.total_linhas_pecas -= len(vazias)
+        for largura, quantidade in linhas:
+            self._adicionar_campo_peca(largura, quantidade)
+        self.status_var.set(f"{len(linhas)} linhas coladas.")
+        return "break"
+
     def _limpar_lista_pecas(self, recriar_campos=True):
-        for widgets in self.pecas_entries:
-            widgets[0].master.destroy()
-        self.pecas_entries = []
+        self._fechar_editor_celula(salvar=False)
+        self.pecas_tree.delete(*self.pecas_tree.get_children())
+        self.total_linhas_pecas = 0
         if recriar_campos:
             for _ in range(5): self._adicionar_campo_peca()
 
@@ -178,15 +348,14 @@ class OtimizadorApp:
         try:
             largura_chapa = int(self.largura_chapa_var.get())
             excelencia = float(self.excelencia_var.get())
-            algoritmo_map = {"Primeiro Encaixe Decrescente (FFD)": "ffd", "Melhor Encaixe (Múltiplas Tentativas)": "best_fit"}
+            algoritmo_map = {"Automático (Conforme o Pedido)": "auto", "Primeiro Encaixe Decrescente (FFD)": "ffd", "Melhor Encaixe (Múltiplas Tentativas)": "best_fit", "Melhor Encaixe Paralelo (Multinúcleo)": "best_fit_paralelo", "Exato (Geração de Colunas)": "exato"}
             algoritmo_selecionado = algoritmo_map.get(self.algoritmo_var.get())
         except (ValueError, TypeError):
             messagebox.showerror("CorteX - Erro de Entrada", "A Largura da Chapa e a Meta de Aproveitamento devem ser números válidos.")
             return None, None, None, None
         pecas_dict = {}
-        for largura_entry, qtd_entry in self.pecas_entries:
-            largura_str = largura_entry.get()
-            qtd_str = qtd_entry.get()
+        self._fechar_editor_celula(salvar=True)
+        for largura_str, qtd_str in self._linhas_pecas():
             if largura_str and qtd_str:
                 try:
                     largura = int(largura_str)
@@ -201,20 +370,95 @@ class OtimizadorApp:
             return None, None, None, None
         return pecas_dict, largura_chapa, excelencia, algoritmo_selecionado
 
-    def _otimizar(self):
+    def _otimizar(self, completo=False):
+        """
+        Com um plano já exibido para a mesma chapa e algoritmo, uma edição pequena da
+        lista só ajusta as chapas afetadas (core.resolver_incremental); `completo`
+        ("Reotimizar Tudo") ou edições grandes recalculam o plano inteiro. Os ajustes
+        partem sempre do último plano completo, não do rascunho anterior, e duram
+        pouco (core.TEMPO_REPARO_S): o botão Cancelar fica desligado durante eles.
+        """
+        if self.worker_otimizacao is not None and self.worker_otimizacao.is_alive(): return
         pecas, largura_chapa, excelencia, algoritmo = self._coletar_dados_de_entrada()
         if pecas is None: return
-        relatorio_texto = core.executar_otimizacao(pecas, largura_chapa, excelencia, algoritmo)
-        self.result_text.config(state="normal")
-        self.result_text.delete(1.0, tk.END)
-        self.result_text.insert(tk.END, relatorio_texto)
-        self.result_text.config(state="disabled")
+        tempo_melhoria_s = core.TEMPO_MELHORIA_PADRAO_S if self.busca_local_var.get() else 0
+        anterior = self.plano_atual
+        incremental = (not completo and anterior is not None and anterior['pecas'] != pecas
+                       and anterior['largura_chapa'] == largura_chapa and anterior['algoritmo'] == algoritmo
+                       and core.distancia_pedidos(anterior['pecas'], pecas) <= core.FRACAO_MAX_DIFERENCA_SEMELHANTE * sum(pecas.values()))
+
+        # A otimização roda numa thread; a janela só conversa com ela pela fila.
+        self.cancelar_evento = threading.Event()
+        self.fila_otimizacao = queue.Queue()
+        fila, cancelar = self.fila_otimizacao, self.cancelar_evento
+        def tarefa():
+            try:
+                if incremental:
+                    resposta = core.resolver_incremental(anterior['resultado'], anterior['pecas'], pecas, largura_chapa)
+                else:
+                    resposta = core.resolver_pedido(pecas, largura_chapa, excelencia, algoritmo, tempo_melhoria_s=tempo_melhoria_s,
+                                                    progresso=lambda info: fila.put(('progresso', info)), cancelar=cancelar)
+                plano = {'pecas': pecas, 'largura_chapa': largura_chapa, 'algoritmo': algoritmo, 'resultado': resposta['resultado']}
+                fila.put(('fim', (plano, resposta, excelencia)))
+            except Exception as erro:
+                fila.put(('erro', erro))
+        self.worker_otimizacao = threading.Thread(target=tarefa, daemon=True)
+
+        self.otimizar_button.config(state="disabled")
+        self.reotimizar_button.config(state="disabled")
+        self.cancelar_button.config(state="disabled" if incremental else "normal")
+        self.status_var.set("Ajustando o plano anterior..." if incremental else "Otimizando...")
+        self.worker_otimizacao.start()
+        self.master.after(100, self._verificar_fila_otimizacao)
+
+    def _verificar_fila_otimizacao(self):
+        """Consome as mensagens da thread de otimização (chamado pelo after() do Tk)."""
+        try:
+            while True:
+                tipo, conteudo = self.fila_otimizacao.get_nowait()
+                if tipo == 'progresso':
+                    self.status_var.set(
+                        f"Estratégias testadas: {conteudo['estrategias_testadas']} | "
+                        f"Melhor: {conteudo['melhor_aproveitamento']:.2f}% ({conteudo['melhor_total_chapas']} chapas) | "
+                        f"{conteudo['tempo_decorrido']:.1f}s"
+                    )
+                elif tipo == 'fim':
+                    plano, resposta, excelencia = conteudo
+                    self._finalizar_otimizacao()
+                    if resposta['origem'] != 'incremental':  # O rascunho ajustado não vira base de outro ajuste
+                        self.plano_atual = plano if plano['resultado']['total_chapas'] else None
+                    resultado = resposta['resultado']
+                    padroes = len(core.padroes_compactos(resultado)) if resultado['total_chapas'] else 0
+                    self.exibicao = {'resposta': resposta, 'excelencia': excelencia, 'algoritmo': plano['algoritmo'],
+                                     'largura_chapa': plano['largura_chapa'], 'paginas': max(1, -(-padroes // PADROES_POR_PAGINA))}
+                    self._exibir_pagina(0)
+                    if resposta['origem'] == 'incremental' and resultado['aproveitamento'] < excelencia and not resultado.get('otimo_comprovado'):
+                        self.status_var.set("Plano ajustado abaixo da meta - use \"Reotimizar Tudo\" para recalcular do zero.")
+                    return
+                elif tipo == 'erro':
+                    self._finalizar_otimizacao()
+                    messagebox.showerror("CorteX - Erro", f"Falha durante a otimização: {conteudo}")
+                    return
+        except queue.Empty:
+            pass
+        self.master.after(100, self._verificar_fila_otimizacao)
+
+    def _finalizar_otimizacao(self):
+        self.otimizar_button.config(state="normal")
+        self.reotimizar_button.config(state="normal")
+        self.cancelar_button.config(state="disabled")
+        self.status_var.set("Cancelado - exibindo o melhor plano encontrado." if self.cancelar_evento.is_set() else "")
+
+    def _cancelar_otimizacao(self):
+        """Pede para a busca parar; o melhor plano encontrado até aqui continua sendo exibido."""
+        self.cancelar_evento.set()
+        self.cancelar_button.config(state="disabled")
+        self.status_var.set("Cancelando...")
 
     def _salvar_pedido(self):
+        self._fechar_editor_celula(salvar=True)
         pecas_lista = []
-        for largura_entry, qtd_entry in self.pecas_entries:
-            largura = largura_entry.get()
-            qtd = qtd_entry.get()
+        for largura, qtd in self._linhas_pecas():
             if largura and qtd:
                 pecas_lista.append({"largura": largura, "quantidade": qtd})
         if not pecas_lista:
@@ -237,25 +481,24 @@ class OtimizadorApp:
                 return
         self._limpar_lista_pecas(recriar_campos=False)
         for peca in pecas_lista:
-            self._adicionar_campo_peca()
-            largura_entry, qtd_entry = self.pecas_entries[-1]
-            largura_entry.insert(0, str(peca.get("largura", "")))
-            qtd_entry.insert(0, str(peca.get("quantidade", "")))
+            self._adicionar_campo_peca(str(peca.get("largura", "")), str(peca.get("quantidade", "")))
         messagebox.showinfo("CorteX", f"Pedido carregado com sucesso!")
 
     def _exportar_relatorio(self):
-        relatorio_texto = self.result_text.get(1.0, tk.END)
-        if len(relatorio_texto.strip()) == 0:
+        """Grava o plano inteiro (todas as páginas) direto do resultado, sem passar pelo widget de texto."""
+        exibicao = self.exibicao
+        if exibicao is None:
             messagebox.showwarning("CorteX", "Não há plano de corte para exportar.")
             return
         filepath = filedialog.asksaveasfilename(defaultextension=".txt", filetypes=[("Text Files", "*.txt"), ("All Files", "*.*")], title="Exportar Plano de Corte Como...")
         if not filepath: return
         with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(relatorio_texto)
+            core.exportar_relatorio(f, exibicao['resposta'], exibicao['excelencia'], exibicao['algoritmo'], exibicao['largura_chapa'])
         messagebox.showinfo("CorteX", f"Plano de corte exportado com sucesso!")
 
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support() # Necessário para a busca paralela no executável do Windows
     root = tk.Tk()
     app = OtimizadorApp(root)
     root.mainloop()
\ No newline at end of file
@@ -0,0 +1,112 @@
+# Arquivo: metricas.py
+
+"""
+Instrumentação da otimização: onde o tempo foi gasto num pedido.
+
+Liga com a variável de ambiente CORTEX_METRICAS=1 (ou com metricas=True nas
+funções do otimizador_core). Desligada, as funções recebem DESLIGADAS, cujos
+métodos não fazem nada, então o custo é uma chamada vazia por fase.
+"""
+
+import os
+import time
+from contextlib import contextmanager, nullcontext
+
+VARIAVEL_AMBIENTE = "CORTEX_METRICAS"
+
+def ativas_pelo_ambiente():
+    """True se CORTEX_METRICAS estiver definida com um valor que não seja 0/false/nao."""
+    return os.environ.get(VARIAVEL_AMBIENTE, "").strip().lower() not in ("", "0", "false", "nao", "não")
+
+class Metricas:
+    """Coleta tempos por fase, estratégias testadas, cache e bytes gravados de um pedido."""
+
+    def __init__(self):
+        self._inicio = time.perf_counter()
+        self.fases_s = {}
+        self.estrategias = []  # [{'estrategia', 'tempo_s', 'total_chapas'}, ...] na ordem testada
+        self.estrategia_vencedora = None
+        self.cache = None      # 'acerto' ou 'falta'
+        self.bytes_gravados = 0
+
+    @contextmanager
+    def fase(self, nome):
+        """Soma ao tempo da fase a duração do bloco `with`."""
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.fases_s[nome] = self.fases_s.get(nome, 0.0) + time.perf_counter() - inicio
+
+    def estrategia(self, nome, tempo_s, total_chapas):
+        self.estrategias.append({'estrategia': nome, 'tempo_s': tempo_s, 'total_chapas': total_chapas})
+
+    def vencedora(self, nome):
+        self.estrategia_vencedora = nome
+
+    def registrar_cache(self, acertou):
+        self.cache = 'acerto' if acertou else 'falta'
+
+    def registrar_gravacao(self, quantidade_bytes):
+        self.bytes_gravados += quantidade_bytes
+
+    def como_dict(self):
+        return {
+            'total_s': time.perf_counter() - self._inicio,
+            'fases_s': dict(self.fases_s),
+            'estrategias': list(self.estrategias),
+            'estrategia_vencedora': self.estrategia_vencedora,
+            'cache': self.cache,
+            'bytes_gravados': self.bytes_gravados,
+        }
+
+class _MetricasDesligadas:
+    """Mesma interface de Metricas, sem fazer nada."""
+    _vazio = nullcontext()
+
+    def fase(self, nome):
+        return self._vazio
+
+    def estrategia(self, nome, tempo_s, total_chapas):
+        pass
+
+    def vencedora(self, nome):
+        pass
+
+    def registrar_cache(self, acertou):
+        pass
+
+    def registrar_gravacao(self, quantidade_bytes):
+        pass
+
+DESLIGADAS = _MetricasDesligadas()
+
+def coletor(metricas=None):
+    """
+    Coletor para uma execução: um Metricas já criado é devolvido como está (para
+    somar as fases de várias funções); True cria um novo; False, DESLIGADAS; None
+    segue a variável de ambiente.
+    """
+    if isinstance(metricas, (Metricas, _MetricasDesligadas)):
+        return metricas
+    if metricas is None:
+        metricas = ativas_pelo_ambiente()
+    return Metricas() if metricas else DESLIGADAS
+
+def formatar_rodape(dados):
+    """Rodapé do relatório com as métricas coletadas (dados = Metricas.como_dict())."""
+    linhas = [
+        "--------------------------------------",
+        "MÉTRICAS DA OTIMIZAÇÃO",
+        f"  Tempo total................: {dados['total_s']:.4f}s",
+    ]
+    for nome, segundos in dados['fases_s'].items():
+        linhas.append(f"  Fase {nome:<22}: {segundos:.4f}s")
+    for item in dados['estrategias']:
+        linhas.append(f"  Estratégia {item['estrategia']:<24} {item['tempo_s']:.4f}s  ->  {item['total_chapas']} chapas")
+    if dados['estrategia_vencedora']:
+        linhas.append(f"  Estratégia vencedora.......: {dados['estrategia_vencedora']}")
+    if dados['cache']:
+        linhas.append(f"  Cache......................: {dados['cache']}")
+    linhas.append(f"  Bytes gravados.............: {dados['bytes_gravados']}")
+    return "\n".join(linhas)
@@ -0,0 +1,204 @@
+# Arquivo: otimizador_2d.py
+
+"""
+Corte guilhotinado em duas dimensões (largura x comprimento).
+
+A chapa é cortada no comprimento em faixas que ocupam toda a largura; dentro
+de cada faixa as peças ficam lado a lado e, se forem mais curtas que a faixa,
+recebem um refilo (corte guilhotinado em dois estágios + refilo). A altura de
+cada faixa é a da peça mais comprida que ainda falta; o resto da largura é
+preenchido por uma mochila limitada (a mesma do otimizador_exato) que maximiza
+a área aproveitada. Uma faixa boa é repetida enquanto houver demanda para ela.
+Por fim as faixas são distribuídas nas chapas como um problema 1D no comprimento
+(FFD do otimizador_core).
+
+As mochilas ficam memorizadas pela chave (comprimento da faixa, largura livre,
+demanda restante das peças que cabem nela), então subproblemas que se repetem
+entre faixas e entre pedidos só são calculados uma vez.
+
+As peças não são giradas (o veio da chapa é respeitado); larguras e comprimentos
+precisam ser inteiros (mm).
+"""
+
+import otimizador_core as core
+from otimizador_exato import mochila_limitada
+
+COMPRIMENTO_CHAPA_PADRAO = 2750
+MEMO_TAMANHO_MAX = 50_000
+# Só os tipos mais compridos que cabem entram na mochila de cada faixa (menos refilo e DP menor).
+TIPOS_MAX_FAIXA = 40
+
+# (comprimento da faixa, largura livre, ((largura, comprimento, limite), ...)) -> quantidades escolhidas
+_memo_faixas = {}
+
+def limpar_memo():
+    """Esvazia a memória de faixas já calculadas."""
+    _memo_faixas.clear()
+
+def _preencher_faixa(altura, largura_livre, tipos):
+    """
+    Melhor preenchimento (em área) de `largura_livre` com os tipos (largura,
+    comprimento, limite) que cabem na faixa. Memorizado; retorna uma tupla com a
+    quantidade de cada tipo.
+    """
+    chave = (altura, largura_livre, tipos)
+    escolha = _memo_faixas.get(chave)
+    if escolha is None:
+        if len(_memo_faixas) >= MEMO_TAMANHO_MAX:
+            _memo_faixas.clear()
+        _, quantidades = mochila_limitada([t[0] for t in tipos], [t[0] * t[1] for t in tipos],
+                                          [t[2] for t in tipos], largura_livre)
+        escolha = _memo_faixas[chave] = tuple(quantidades)
+    return escolha
+
+def _gerar_faixas(pecas, largura_chapa):
+    """
+    Gera as faixas até esgotar a demanda. Retorna [(altura, cortes, multiplicidade)],
+    com cortes = ((largura, comprimento, qtd), ...).
+    """
+    restante = dict(pecas)
+    faixas = []
+    while restante:
+        # A peça mais comprida (e, no empate, mais larga) define a altura da faixa.
+        largura_base, altura = max(restante, key=lambda p: (p[1], p[0]))
+        livre = largura_chapa - largura_base
+        restante[(largura_base, altura)] -= 1
+        cabem = sorted(((comprimento, largura, qtd) for (largura, comprimento), qtd in restante.items()
+                        if comprimento <= altura and largura <= livre and qtd), reverse=True)
+        tipos = tuple((largura, comprimento, min(qtd, livre // largura))
+                      for comprimento, largura, qtd in cabem[:TIPOS_MAX_FAIXA])
+        contagem = {(largura_base, altura): 1}
+        if tipos:
+            for (largura, comprimento, _), qtd in zip(tipos, _preencher_faixa(altura, livre, tipos)):
+                if qtd:
+                    contagem[(largura, comprimento)] = contagem.get((largura, comprimento), 0) + qtd
+        restante[(largura_base, altura)] += 1
+
+        # Repete a faixa enquanto todas as peças dela ainda tiverem demanda.
+        multiplicidade = min(restante[peca] // qtd for peca, qtd in contagem.items())
+        for peca, qtd in contagem.items():
+            restante[peca] -= qtd * multiplicidade
+            if not restante[peca]:
+                del restante[peca]
+        cortes = tuple((largura, comprimento, qtd) for (largura, comprimento), qtd in
+                       sorted(contagem.items(), key=lambda item: (-item[0][1], -item[0][0])))
+        faixas.append((altura, cortes, multiplicidade))
+    return faixas
+
+def e_pedido_2d(pecas):
+    """True se o pedido traz comprimentos: lista com 'comprimento' ou dicionário com chaves "LxC"."""
+    if isinstance(pecas, dict):
+        return any('x' in str(chave).lower() for chave in pecas)
+    return isinstance(pecas, list) and any(isinstance(p, dict) and 'comprimento' in p for p in pecas)
+
+def pecas_de_pedido_2d(pecas):
+    """
+    Converte um pedido 2D ([{"largura", "comprimento", "quantidade"}, ...] ou
+    {"LxC": quantidade}) em {(largura, comprimento): quantidade}, somando peças
+    repetidas. Linhas vazias são ignoradas; valores que não são inteiros levantam ValueError.
+    """
+    if isinstance(pecas, dict):
+        itens = []
+        for chave, qtd in pecas.items():
+            largura, separador, comprimento = str(chave).lower().partition('x')
+            if not separador:
+                raise ValueError(f"Peça 2D sem comprimento: {chave!r} (use \"LxC\").")
+            itens.append((largura, comprimento, qtd))
+    else:
+        itens = ((p.get("largura"), p.get("comprimento"), p.get("quantidade")) for p in pecas)
+    pecas_dict = {}
+    for largura, comprimento, qtd in itens:
+        if any(valor in (None, "") for valor in (largura, comprimento, qtd)):
+            continue
+        chave = (int(largura), int(comprimento))
+        pecas_dict[chave] = pecas_dict.get(chave, 0) + int(qtd)
+    return pecas_dict
+
+def otimizar_guilhotina(pecas, largura_chapa=core.LARGURA_CHAPA_PADRAO, comprimento_chapa=COMPRIMENTO_CHAPA_PADRAO):
+    """
+    Otimiza o corte 2D. `pecas` é {(largura, comprimento): quantidade}.
+    Retorna {'total_chapas', 'aproveitamento' (% da área), 'limite_inferior',
+    'chapas': [{'faixas': [{'altura', 'cortes': [[largura, comprimento, qtd], ...],
+    'largura_usada'}, ...], 'comprimento_usado', 'quantidade'}, ...]}, com as
+    chapas iguais agrupadas em 'quantidade'.
+    """
+    validas = {}
+    for (largura, comprimento), qtd in pecas.items():
+        if qtd <= 0:
+            continue
+        if any(float(v) != int(v) or v <= 0 for v in (largura, comprimento)):
+            raise ValueError(f"Peça inválida: {largura} x {comprimento} (use milímetros inteiros).")
+        if largura > largura_chapa or comprimento > comprimento_chapa:
+            raise ValueError(f"A peça {largura} x {comprimento} não cabe na chapa {largura_chapa} x {comprimento_chapa}.")
+        chave = (int(largura), int(comprimento))
+        validas[chave] = validas.get(chave, 0) + int(qtd)
+    pecas = validas
+    if not pecas:
+        return {'total_chapas': 0, 'aproveitamento': 0, 'limite_inferior': 0, 'chapas': []}
+
+    faixas = _gerar_faixas(pecas, largura_chapa)
+
+    # As faixas viram peças 1D no comprimento da chapa; faixas da mesma altura são intercambiáveis.
+    por_altura = {}
+    alturas = []
+    for altura, cortes, multiplicidade in faixas:
+        por_altura.setdefault(altura, []).extend([cortes] * multiplicidade)
+        alturas.extend([altura] * multiplicidade)
+    for lista in por_altura.values():
+        lista.reverse()  # pop() devolve na ordem de geração
+    plano_1d = core.otimizar_com_lista_ffd(sorted(alturas, reverse=True), comprimento_chapa)
+
+    chapas = {}
+    for chapa in plano_1d['detalhes_chapas']:
+        conteudo = tuple((altura, por_altura[altura].pop()) for altura in chapa['cortes'])
+        if conteudo in chapas:
+            chapas[conteudo]['quantidade'] += 1
+        else:
+            chapas[conteudo] = {
+                'faixas': [{'altura': altura, 'cortes': [list(c) for c in cortes],
+                            'largura_usada': sum(l * q for l, _, q in cortes)} for altura, cortes in conteudo],
+                'comprimento_usado': chapa['largura_usada'],
+                'quantidade': 1,
+            }
+
+    area_pecas = sum(l * c * q for (l, c), q in pecas.items())
+    area_chapa = largura_chapa * comprimento_chapa
+    total_chapas = plano_1d['total_chapas']
+    return {
+        'total_chapas': total_chapas,
+        'aproveitamento': area_pecas / (total_chapas * area_chapa) * 100,
+        'limite_inferior': -(-area_pecas // area_chapa),
+        'chapas': list(chapas.values()),
+    }
+
+def exibir_resultado_2d_como_texto(resultado, largura_chapa, comprimento_chapa):
+    """Relatório do plano 2D: uma linha por faixa, chapas iguais agrupadas."""
+    if resultado['total_chapas'] == 0:
+        return "Nenhuma peça para otimizar."
+
+    relatorio = []
+    relatorio.append("======================================")
+    relatorio.append("==     PLANO DE CORTE 2D (GUILHOTINA)  ==")
+    relatorio.append("======================================")
+    relatorio.append(f"  Chapa.................: {largura_chapa} x {comprimento_chapa} mm")
+    relatorio.append(f"  Aproveitamento Geral..: {resultado['aproveitamento']:.2f}%%")
+    relatorio.append(f"  Total de Chapas.......: {resultado['total_chapas']}")
+    relatorio.append(f"  Limite Inferior.......: {resultado['limite_inferior']}")
+    relatorio.append("--------------------------------------\n")
+
+    chapa_num = 1
+    for chapa in resultado['chapas']:
+        if chapa['quantidade'] > 1:
+            rotulo = f"Chapas {chapa_num}–{chapa_num + chapa['quantidade'] - 1}"
+        else:
+            rotulo = f"Chapa {chapa_num}"
+        chapa_num += chapa['quantidade']
+        relatorio.append(f"{rotulo}: {len(chapa['faixas'])} faixas  ->  "
+                         f"Comprimento usado: {chapa['comprimento_usado']}mm | "
+                         f"Sobra: {comprimento_chapa - chapa['comprimento_usado']}mm")
+        for faixa in chapa['faixas']:
+            cortes = "  //  ".join(f"{l}x{c}mm #{q}" for l, c, q in faixa['cortes'])
+            relatorio.append(f"    Faixa {faixa['altura']}mm: [{cortes}]  (sobra na largura: "
+                             f"{largura_chapa - faixa['largura_usada']}mm)")
+        relatorio.append("")
+    return "\n".join(relatorio)
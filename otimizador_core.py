@@ -1,19 +1,48 @@
 # Arquivo: otimizador_core.py (VERSÃO COMPLETA E CORRIGIDA)
 
 import json
+import os
 import random
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from contextlib import closing
+from bisect import bisect_left, insort
+from heapq import heappop, heappush
 from pathlib import Path
 from datetime import datetime
 
+import historico_db
+import metricas as metricas_mod
+from cache_solucoes import MANTER, CacheSolucoes
+import otimizador_exato
+import otimizador_vetorizado
+import tabela_padroes
+
 # --- Parâmetros e Configurações ---
 LARGURA_CHAPA_PADRAO = 1200
 META_EXCELENCIA = 99.0
-HISTORICO_FILE = Path("historico_otimizacao.json")
+TEMPO_MAX_PADRAO_S = 10.0           # Orçamento da busca paralela
+TENTATIVAS_PARALELAS_PADRAO = 5000  # Permutações sorteadas pela busca paralela
+SEMENTES_POR_LOTE = 16              # Permutações avaliadas por tarefa do pool
+TENTATIVAS_VETORIZADAS = 256        # Permutações por lote do Best-Fit vetorizado (com NumPy)
+FRACAO_TEMPO_EXATO_AUTO = 0.5       # No modo 'auto', fração do tempo restante dada ao exato
+PECAS_MIN_PARALELO_AUTO = 2000      # No modo 'auto', pedidos a partir daqui usam a busca paralela
+TEMPO_MELHORIA_PADRAO_S = 2.0       # Orçamento da busca local quando ela é ativada
+INTERVALO_CANCELAMENTO_S = 0.2      # De quanto em quanto tempo a busca paralela confere o cancelamento
+CACHE_TAMANHO_MAX = 128             # Soluções mantidas em memória (ver configurar_cache)
+CACHE_TTL_S = 3600.0
+FRACAO_MAX_DIFERENCA_SEMELHANTE = 0.25  # Diferença máxima (fração das peças) para reaproveitar um plano do histórico
+MAX_CANDIDATOS_SEMELHANTE = 500    # Pedidos mais recentes do histórico comparados na busca por um semelhante
+TEMPO_REPARO_S = 0.5                # Busca local depois de reparar um plano reaproveitado
+HISTORICO_FILE = Path("historico_otimizacao.json")  # Formato antigo; migrado para o banco na primeira abertura
+HISTORICO_DB_FILE = Path("historico_otimizacao.db")
+PADROES_DIR = Path("padroes_chapa")  # Tabelas de padrões, se ligadas (ver configurar_tabela_padroes)
+_CHAPA_FECHADA = float('-inf')  # Sobra das posições ainda não abertas na árvore do FFD
 
 # --- Funções de Histórico e Utilitários ---
 
 def carregar_historico():
-    """Carrega o histórico de otimizações de um arquivo JSON."""
+    """Carrega o histórico de otimizações de um arquivo JSON (formato antigo; ver abrir_historico)."""
     if HISTORICO_FILE.exists():
         with open(HISTORICO_FILE, 'r') as f:
             return json.load(f)
@@ -28,15 +57,80 @@ def gerar_id_unico(pecas_dict):
     """Gera um ID único e canônico para um conjunto de peças."""
     return "|".join(f"{largura}x{qtd}" for largura, qtd in sorted(pecas_dict.items()))
 
+def pecas_de_pedido(pecas):
+    """
+    Converte um pedido no formato salvo pela interface ([{"largura": "110", "quantidade": "10"}, ...])
+    ou um dicionário {largura: quantidade} em pecas_dict, somando larguras repetidas.
+    Linhas vazias ou com valores não positivos são ignoradas, como na interface;
+    valores que não são inteiros levantam ValueError.
+    """
+    itens = pecas.items() if isinstance(pecas, dict) else ((p.get("largura"), p.get("quantidade")) for p in pecas)
+    pecas_dict = {}
+    for largura, qtd in itens:
+        if largura in (None, "") or qtd in (None, ""):
+            continue
+        largura, qtd = int(largura), int(qtd)
+        if largura > 0 and qtd > 0:
+            pecas_dict[largura] = pecas_dict.get(largura, 0) + qtd
+    return pecas_dict
+
+def gerar_chave_historico(pecas_dict, largura_chapa, algoritmo, consolidado=False):
+    """Chave do histórico: o ID do pedido mais a largura da chapa e o algoritmo."""
+    return historico_db.gerar_chave(gerar_id_unico(pecas_dict), largura_chapa, algoritmo, consolidado)
+
+def abrir_historico():
+    """Abre o banco de histórico (migrando o JSON antigo na primeira vez)."""
+    return historico_db.abrir(HISTORICO_DB_FILE, HISTORICO_FILE)
+
+# Cache do processo na frente do histórico: {chave: {'solucao': ...}}
+_cache_solucoes = CacheSolucoes(CACHE_TAMANHO_MAX, CACHE_TTL_S)
+
+def configurar_cache(tamanho_max=MANTER, ttl_s=MANTER):
+    """Ajusta o tamanho máximo e a validade (segundos, None = sem validade) do cache de soluções em memória."""
+    _cache_solucoes.configurar(tamanho_max, ttl_s)
+
+def limpar_cache():
+    """Esvazia o cache de soluções em memória (o histórico em disco não é afetado)."""
+    _cache_solucoes.limpar()
+
+# Diretório das tabelas de padrões usadas pelo algoritmo exato (None desliga)
+_diretorio_padroes = None
+
+def configurar_tabela_padroes(diretorio):
+    """
+    Liga as tabelas de padrões do algoritmo exato no diretório informado (ex.:
+    PADROES_DIR); None as desliga. Vêm desligadas: elas só aceleram quando os
+    pedidos repetem poucas larguras numa chapa estreita, e uma tabela acumulada
+    de muitas larguras deixa o exato mais lento sem o NumPy. Meça antes de ligar:
+        python cortex_benchmark.py --algoritmos exato --tabela-padroes padroes_chapa
+    """
+    global _diretorio_padroes
+    _diretorio_padroes = diretorio
+
+# Processos da busca paralela (None = núcleos da CPU; 1 = sem pool, no próprio processo)
+_processos_paralelos = None
+
+def configurar_processos(processos):
+    """
+    Limita os processos da busca paralela. Processos de um pool externo (lote,
+    servidor) usam 1: a busca roda neles mesmos, sem abrir um pool dentro do pool.
+    """
+    global _processos_paralelos
+    _processos_paralelos = processos
+
+def _processos():
+    return _processos_paralelos or os.cpu_count() or 1
+
 def formatar_cortes_agrupados(cortes):
     """Agrupa cortes iguais e retorna uma string formatada."""
     contagem = {}
     for valor in cortes:
         contagem[valor] = contagem.get(valor, 0) + 1
-    agrupados = []
-    for valor, qtd in sorted(contagem.items(), key=lambda item: item[0], reverse=True):
-        agrupados.append(f"{valor}mm #{qtd}")
-    return "  //  ".join(agrupados)
+    return formatar_padrao(sorted(contagem.items(), key=lambda item: item[0], reverse=True))
+
+def formatar_padrao(cortes):
+    """Formata os cortes de um padrão ([largura, qtd], ...) como '500mm #2  //  110mm #1'."""
+    return "  //  ".join(f"{valor}mm #{qtd}" for valor, qtd in cortes)
 # DENTRO DE otimizador_core.py
 
 # DENTRO DE otimizador_core.py
@@ -67,23 +161,8 @@ def gerar_visualizacao_chapa(chapa_info, largura_chapa, largura_total_barra=50):
 
 # --- Funções de Algoritmos de Otimização ---
 
-def otimizar_com_lista_best_fit(pecas, largura_chapa):
-    """Otimiza o corte usando o algoritmo Best-Fit."""
-    chapas = []
-    for peca in pecas:
-        melhor_chapa_index = -1
-        menor_espaco_vazio = largura_chapa + 1
-        for i, chapa in enumerate(chapas):
-            espaco_livre = largura_chapa - chapa['largura_usada']
-            if peca <= espaco_livre and espaco_livre < menor_espaco_vazio:
-                melhor_chapa_index = i
-                menor_espaco_vazio = espaco_livre
-        if melhor_chapa_index == -1:
-            chapas.append({'largura_usada': peca, 'cortes': [peca]})
-        else:
-            chapas[melhor_chapa_index]['largura_usada'] += peca
-            chapas[melhor_chapa_index]['cortes'].append(peca)
-
+def _montar_resultado(chapas, largura_chapa):
+    """Monta o dicionário de resultado a partir das chapas abertas por um algoritmo."""
     if not chapas:
         return {'total_chapas': 0, 'aproveitamento': 0, 'detalhes_chapas': []}
 
@@ -93,56 +172,822 @@ def otimizar_com_lista_best_fit(pecas, largura_chapa):
     detalhes = [{'cortes': c['cortes'], 'largura_usada': c['largura_usada'], 'sobra': largura_chapa - c['largura_usada']} for c in chapas]
     return {'total_chapas': total_chapas, 'aproveitamento': aproveitamento, 'detalhes_chapas': detalhes}
 
-def otimizar_com_lista_ffd(pecas_ordenadas, largura_chapa):
-    """Otimiza o corte usando o algoritmo First-Fit (FFD)."""
-    chapas = []
+def _resultado_de_atribuicao(pecas, atribuicao, usadas, largura_chapa, cortes_iniciais=()):
+    """
+    Converte o modelo interno dos empacotadores (largura usada por chapa + chapa de
+    cada peça) no dicionário de resultado público. As listas de cortes só são
+    montadas aqui, uma vez, na ordem em que as peças foram colocadas.
+    """
+    if not usadas:
+        return {'total_chapas': 0, 'aproveitamento': 0, 'detalhes_chapas': []}
+    cortes = [list(c) for c in cortes_iniciais]
+    cortes.extend([] for _ in range(len(usadas) - len(cortes)))
+    for peca, chapa_index in zip(pecas, atribuicao):
+        cortes[chapa_index].append(peca)
+    aproveitamento = (sum(usadas) / (len(usadas) * largura_chapa)) * 100
+    detalhes = [{'cortes': c, 'largura_usada': u, 'sobra': largura_chapa - u} for c, u in zip(cortes, usadas)]
+    return {'total_chapas': len(usadas), 'aproveitamento': aproveitamento, 'detalhes_chapas': detalhes}
+
+def _empacotar_best_fit(pecas, largura_chapa, usadas=None):
+    """
+    Núcleo do Best-Fit sobre o modelo compacto: `usadas` é a largura usada de cada
+    chapa (alterada no lugar; pode trazer chapas já abertas) e o retorno é
+    (usadas, atribuicao), com atribuicao[i] = índice da chapa da i-ésima peça.
+    As sobras das chapas abertas ficam num multiconjunto ordenado (sobras distintas
+    em ordem crescente + heap de índices por sobra), então achar a chapa mais justa
+    custa uma busca binária em vez de uma varredura. Em caso de empate, a chapa de
+    menor índice continua sendo a escolhida, como na versão linear.
+    """
+    usadas = [] if usadas is None else usadas
+    atribuicao = []
+    sobras = []              # Sobras distintas, em ordem crescente
+    indices_por_sobra = {}   # Sobra -> heap com os índices das chapas que a possuem
+    for chapa_index, usada in enumerate(usadas):
+        sobra = largura_chapa - usada
+        if sobra not in indices_por_sobra:
+            indices_por_sobra[sobra] = []
+            insort(sobras, sobra)
+        heappush(indices_por_sobra[sobra], chapa_index)
+    for peca in pecas:
+        pos = bisect_left(sobras, peca)
+        if pos == len(sobras):
+            chapa_index = len(usadas)
+            usadas.append(peca)
+        else:
+            sobra = sobras[pos]
+            indices = indices_por_sobra[sobra]
+            chapa_index = heappop(indices)
+            if not indices:
+                del indices_por_sobra[sobra]
+                del sobras[pos]
+            usadas[chapa_index] += peca
+        atribuicao.append(chapa_index)
+
+        nova_sobra = largura_chapa - usadas[chapa_index]
+        indices = indices_por_sobra.get(nova_sobra)
+        if indices is None:
+            indices_por_sobra[nova_sobra] = [chapa_index]
+            insort(sobras, nova_sobra)
+        else:
+            heappush(indices, chapa_index)
+    return usadas, atribuicao
+
+def otimizar_com_lista_best_fit(pecas, largura_chapa, chapas_iniciais=None):
+    """
+    Otimiza o corte usando o algoritmo Best-Fit (ver _empacotar_best_fit).
+    `chapas_iniciais` (listas de cortes) são chapas já abertas, cujas sobras são
+    aproveitadas antes de abrir novas (usado para reparar planos existentes).
+    """
+    chapas_iniciais = chapas_iniciais or []
+    usadas, atribuicao = _empacotar_best_fit(pecas, largura_chapa, [sum(cortes) for cortes in chapas_iniciais])
+    return _resultado_de_atribuicao(pecas, atribuicao, usadas, largura_chapa, chapas_iniciais)
+
+def _empacotar_ffd(pecas_ordenadas, largura_chapa):
+    """
+    Núcleo do First-Fit sobre o modelo compacto; retorna (usadas, atribuicao).
+    Uma árvore de segmentos guarda a maior sobra de cada faixa de chapas; descer
+    pela árvore sempre pelo filho da esquerda que comporta a peça encontra a
+    primeira chapa que serve em O(log n).
+    """
+    tamanho = 1
+    while tamanho < len(pecas_ordenadas):
+        tamanho *= 2
+    arvore = [_CHAPA_FECHADA] * (2 * tamanho)  # Folhas ainda não abertas nunca aceitam peças
+
+    usadas = []
+    atribuicao = []
     for peca in pecas_ordenadas:
-        chapa_encontrada = False
-        for chapa in chapas:
-            if (largura_chapa - chapa['largura_usada']) >= peca:
-                chapa['largura_usada'] += peca
-                chapa['cortes'].append(peca)
-                chapa_encontrada = True
+        if arvore[1] >= peca:
+            no = 1
+            while no < tamanho:
+                no *= 2
+                if arvore[no] < peca:
+                    no += 1
+            chapa_index = no - tamanho
+            usadas[chapa_index] += peca
+        else:
+            chapa_index = len(usadas)
+            no = tamanho + chapa_index
+            usadas.append(peca)
+        atribuicao.append(chapa_index)
+
+        arvore[no] = largura_chapa - usadas[chapa_index]
+        no //= 2
+        while no:
+            esquerda, direita = arvore[2 * no], arvore[2 * no + 1]
+            arvore[no] = esquerda if esquerda >= direita else direita
+            no //= 2
+    return usadas, atribuicao
+
+def otimizar_com_lista_ffd(pecas_ordenadas, largura_chapa):
+    """Otimiza o corte usando o algoritmo First-Fit (FFD); ver _empacotar_ffd."""
+    usadas, atribuicao = _empacotar_ffd(pecas_ordenadas, largura_chapa)
+    return _resultado_de_atribuicao(pecas_ordenadas, atribuicao, usadas, largura_chapa)
+
+def otimizar_agrupado(grupos, largura_chapa, regra='ffd', padroes_iniciais=None):
+    """
+    Empacota sequências de peças iguais (largura, quantidade) sem expandi-las.
+    Chapas idênticas e vizinhas formam um bloco com multiplicidade, e cada sequência
+    é distribuída em lote pelos blocos (na ordem de posição para 'ffd', da sobra mais
+    justa para 'best_fit'). O plano é o mesmo que os algoritmos peça a peça gerariam
+    para a lista expandida, mas o custo depende do número de larguras distintas.
+    `padroes_iniciais` permite começar com chapas já abertas (ex.: o arredondamento
+    do algoritmo exato), cujas sobras são aproveitadas antes de abrir chapas novas.
+    """
+    # Em ordem de posição: {'cortes': [[largura, qtd], ...], 'largura_usada', 'quantidade'}
+    blocos = [
+        {'cortes': padrao['cortes'], 'largura_usada': padrao['largura_usada'], 'quantidade': padrao['quantidade']}
+        for padrao in (padroes_iniciais or [])
+    ]
+    for largura, quantidade in grupos:
+        if quantidade <= 0:
+            continue
+        candidatos = [i for i, bloco in enumerate(blocos) if largura_chapa - bloco['largura_usada'] >= largura]
+        if regra == 'best_fit':
+            candidatos.sort(key=lambda i: blocos[i]['largura_usada'], reverse=True)
+
+        divisoes = {}
+        for i in candidatos:
+            if quantidade == 0:
                 break
-        if not chapa_encontrada:
-            chapas.append({'largura_usada': peca, 'cortes': [peca]})
+            bloco = blocos[i]
+            por_chapa = int((largura_chapa - bloco['largura_usada']) // largura)
+            colocadas = min(quantidade, por_chapa * bloco['quantidade'])
+            divisoes[i] = (por_chapa, colocadas)
+            quantidade -= colocadas
 
-    if not chapas:
-        return {'total_chapas': 0, 'aproveitamento': 0, 'detalhes_chapas': []}
+        if divisoes:
+            novos_blocos = []
+            for i, bloco in enumerate(blocos):
+                if i not in divisoes:
+                    novos_blocos.append(bloco)
+                    continue
+                por_chapa, colocadas = divisoes[i]
+                cheias, resto = divmod(colocadas, por_chapa)
+                intactas = bloco['quantidade'] - cheias - (1 if resto else 0)
+                for qtd_chapas, qtd_pecas in ((cheias, por_chapa), (1 if resto else 0, resto)):
+                    if qtd_chapas:
+                        novos_blocos.append({
+                            'cortes': _acrescentar_corte(bloco['cortes'], largura, qtd_pecas),
+                            'largura_usada': bloco['largura_usada'] + largura * qtd_pecas,
+                            'quantidade': qtd_chapas,
+                        })
+                if intactas:
+                    novos_blocos.append({'cortes': bloco['cortes'], 'largura_usada': bloco['largura_usada'], 'quantidade': intactas})
+            blocos = novos_blocos
 
-    total_chapas = len(chapas)
-    largura_total_usada = sum(chapa['largura_usada'] for chapa in chapas)
+        if quantidade:
+            # Nenhuma chapa aberta comporta mais peças desta largura: abre chapas novas.
+            por_chapa = max(1, int(largura_chapa // largura))
+            cheias, resto = divmod(quantidade, por_chapa)
+            if cheias:
+                blocos.append({'cortes': [[largura, por_chapa]], 'largura_usada': largura * por_chapa, 'quantidade': cheias})
+            if resto:
+                blocos.append({'cortes': [[largura, resto]], 'largura_usada': largura * resto, 'quantidade': 1})
+
+    if not blocos:
+        return {'total_chapas': 0, 'aproveitamento': 0, 'padroes': []}
+
+    total_chapas = sum(bloco['quantidade'] for bloco in blocos)
+    largura_total_usada = sum(bloco['largura_usada'] * bloco['quantidade'] for bloco in blocos)
     aproveitamento = (largura_total_usada / (total_chapas * largura_chapa)) * 100
-    detalhes = [{'cortes': c['cortes'], 'largura_usada': c['largura_usada'], 'sobra': largura_chapa - c['largura_usada']} for c in chapas]
-    return {'total_chapas': total_chapas, 'aproveitamento': aproveitamento, 'detalhes_chapas': detalhes}
+    padroes = [
+        {
+            'cortes': bloco['cortes'],
+            'largura_usada': bloco['largura_usada'],
+            'sobra': largura_chapa - bloco['largura_usada'],
+            'quantidade': bloco['quantidade'],
+        } for bloco in blocos
+    ]
+    return {'total_chapas': total_chapas, 'aproveitamento': aproveitamento, 'padroes': padroes}
 
-def calcular_melhor_otimizacao(pecas_dict, largura_chapa, excelencia, algoritmo='best_fit'):
-    """Testa estratégias para encontrar a melhor otimização, usando o algoritmo escolhido."""
-    if not pecas_dict:
-        return {'total_chapas': 0, 'aproveitamento': 0, 'detalhes_chapas': []}
+def otimizar_exato(pecas_dict, largura_chapa, tempo_max_s=None, cancelar=None):
+    """
+    Otimiza o corte por padrões: geração de colunas sobre a relaxação linear e
+    arredondamento (ver otimizador_exato). As peças que sobram do arredondamento
+    preenchem as sobras dos padrões arredondados e, se preciso, chapas novas (FFD).
+    Se o FFD puro já for melhor, ele é devolvido. O valor da relaxação linear vai
+    em 'valor_lp' (seu teto é um limite inferior para o número de chapas); se a
+    geração de colunas parar no prazo (tempo_max_s) ou por `cancelar`,
+    'lp_convergiu' é False e 'valor_lp' é um limite mais fraco, mas ainda válido.
+    Se as tabelas estiverem ligadas (ver configurar_tabela_padroes), a da chapa
+    cresce com as larguras do pedido e é usada para precificar as colunas.
+    """
+    tabela = None
+    if _diretorio_padroes is not None and isinstance(largura_chapa, int):
+        tabela = tabela_padroes.atualizar(largura_chapa, list(pecas_dict), _diretorio_padroes)
+    solucao = otimizador_exato.resolver_padroes(pecas_dict, largura_chapa, tabela if tabela and tabela[1] else None,
+                                                tempo_max_s, cancelar)
+    padroes = []
+    for contagem, multiplicidade in solucao['padroes']:
+        cortes = [[largura, qtd] for largura, qtd in sorted(contagem.items(), reverse=True)]
+        padroes.append({
+            'cortes': cortes,
+            'largura_usada': sum(largura * qtd for largura, qtd in cortes),
+            'quantidade': multiplicidade,
+        })
+    residual = sorted(solucao['residual'].items(), reverse=True)
+    resultado = otimizar_agrupado(residual, largura_chapa, 'ffd', padroes_iniciais=padroes)
+
+    resultado_ffd = otimizar_agrupado(sorted(pecas_dict.items(), reverse=True), largura_chapa, 'ffd')
+    if resultado_ffd['total_chapas'] < resultado['total_chapas']:
+        resultado = resultado_ffd
+    resultado['valor_lp'] = solucao['valor_lp']
+    resultado['lp_convergiu'] = solucao['lp_convergiu']
+    return resultado
 
+def _acrescentar_corte(cortes, largura, qtd):
+    """Retorna uma cópia de `cortes` com mais `qtd` peças da largura informada."""
+    if cortes and cortes[-1][0] == largura:
+        return cortes[:-1] + [[largura, cortes[-1][1] + qtd]]
+    return cortes + [[largura, qtd]]
+
+def expandir_padroes(padroes):
+    """
+    Converte padrões com multiplicidade no formato 'detalhes_chapas' (uma entrada por chapa).
+    Chapas do mesmo padrão compartilham a mesma lista de cortes.
+    """
+    detalhes = []
+    for padrao in padroes:
+        cortes = []
+        for largura, qtd in padrao['cortes']:
+            cortes.extend([largura] * qtd)
+        chapa = {'cortes': cortes, 'largura_usada': padrao['largura_usada'], 'sobra': padrao['sobra']}
+        detalhes.extend(dict(chapa) for _ in range(padrao['quantidade']))
+    return detalhes
+
+def padroes_compactos(resultado):
+    """
+    Representação compacta do plano: cada padrão distinto aparece uma vez, com os
+    cortes como [largura, qtd] em ordem decrescente de largura e a 'quantidade' de
+    chapas que o usam (na ordem em que o padrão aparece pela primeira vez). Aceita
+    resultados com 'padroes' ou só com 'detalhes_chapas' (formato antigo do histórico).
+    """
+    if 'padroes' in resultado:
+        itens = ((padrao['cortes'], padrao['largura_usada'], padrao['sobra'], padrao['quantidade'])
+                 for padrao in resultado['padroes'])
+    else:
+        itens = ((((largura, 1) for largura in chapa['cortes']), chapa['largura_usada'], chapa['sobra'], 1)
+                 for chapa in resultado['detalhes_chapas'])
+    padroes = {}
+    for cortes, largura_usada, sobra, quantidade in itens:
+        contagem = {}
+        for largura, qtd in cortes:
+            contagem[largura] = contagem.get(largura, 0) + qtd
+        assinatura = tuple(sorted(contagem.items(), reverse=True))
+        padrao = padroes.get(assinatura)
+        if padrao is None:
+            padroes[assinatura] = {'cortes': [list(corte) for corte in assinatura], 'largura_usada': largura_usada,
+                                   'sobra': sobra, 'quantidade': quantidade}
+        else:
+            padrao['quantidade'] += quantidade
+    return list(padroes.values())
+
+def compactar_resultado(resultado):
+    """Cópia do resultado com 'padroes' compactos no lugar de 'detalhes_chapas'."""
+    compacto = {chave: valor for chave, valor in resultado.items() if chave != 'detalhes_chapas'}
+    compacto['padroes'] = padroes_compactos(resultado)
+    return compacto
+
+def obter_detalhes_chapas(resultado):
+    """Uma entrada por chapa ('detalhes_chapas'), expandindo os padrões se o resultado for compacto."""
+    if 'detalhes_chapas' in resultado:
+        return resultado['detalhes_chapas']
+    return expandir_padroes(resultado['padroes'])
+
+def _com_detalhes(resultado):
+    """Acrescenta 'detalhes_chapas' a um resultado produzido por otimizar_agrupado."""
+    resultado['detalhes_chapas'] = expandir_padroes(resultado['padroes'])
+    return resultado
+
+def _divisao_teto(a, b):
+    """Divisão arredondada para cima (funciona para inteiros e floats)."""
+    return int(-(-a // b))
+
+def calcular_limite_inferior(pecas_dict, largura_chapa):
+    """
+    Limite inferior de Martello–Toth para o número de chapas.
+    L1 é a área total dividida pela chapa; L2 (que nunca é menor que L1) separa,
+    para cada K <= largura/2, as peças que não podem dividir chapa com outras:
+    as maiores que largura - K ocupam uma chapa sozinhas, as maiores que a metade
+    não dividem chapa entre si, e o que sobra nelas é descontado da área das
+    peças entre K e a metade.
+    Peças maiores que a chapa ocupam uma chapa cada, como nos empacotadores.
+    """
+    grupos = sorted((largura, qtd) for largura, qtd in pecas_dict.items() if qtd > 0)
+    maiores = sum(qtd for largura, qtd in grupos if largura > largura_chapa)
+    grupos = [(largura, qtd) for largura, qtd in grupos if largura <= largura_chapa]
+    if not grupos:
+        return maiores
+
+    limite_l1 = _divisao_teto(sum(largura * qtd for largura, qtd in grupos), largura_chapa)
+    metade = largura_chapa / 2
+    melhor = limite_l1
+    candidatos_k = [0] + [largura for largura, _ in grupos if largura <= metade]
+    for k in candidatos_k:
+        qtd_n1 = qtd_n2 = 0
+        soma_n2 = soma_n3 = 0
+        for largura, qtd in grupos:
+            if largura > largura_chapa - k:
+                qtd_n1 += qtd
+            elif largura > metade:
+                qtd_n2 += qtd
+                soma_n2 += largura * qtd
+            elif largura >= k:
+                soma_n3 += largura * qtd
+        excedente = soma_n3 - (qtd_n2 * largura_chapa - soma_n2)
+        limite_k = qtd_n1 + qtd_n2 + max(0, _divisao_teto(excedente, largura_chapa))
+        if limite_k > melhor:
+            melhor = limite_k
+    return maiores + melhor
+
+def _registrar_limite(resultado, limite_inferior):
+    """Anota no resultado o limite inferior e se o plano comprovadamente o atinge."""
+    resultado['limite_inferior'] = limite_inferior
+    resultado['otimo_comprovado'] = resultado['total_chapas'] <= limite_inferior
+    return resultado
+
+def _lista_embaralhada(pecas_dict, semente):
+    """Lista de peças numa ordem aleatória reproduzível: a mesma semente gera sempre a mesma ordem."""
     pecas = []
-    for largura, quantidade in pecas_dict.items():
+    for largura, quantidade in sorted(pecas_dict.items()):
         pecas.extend([largura] * quantidade)
-    
-    if algoritmo == 'ffd':
-        pecas_ordenadas = sorted(pecas, reverse=True)
-        return otimizar_com_lista_ffd(pecas_ordenadas, largura_chapa)
-    else: # algoritmo == 'best_fit'
-        estrategias = [sorted(pecas, reverse=True), sorted(pecas)]
-        for _ in range(8):
-            lista_aleatoria = pecas[:]
-            random.shuffle(lista_aleatoria)
-            estrategias.append(lista_aleatoria)
-
-        melhor_resultado = None
-        for lista in estrategias:
-            resultado = otimizar_com_lista_best_fit(lista, largura_chapa)
-            if not melhor_resultado or resultado['aproveitamento'] > melhor_resultado['aproveitamento']:
-                melhor_resultado = resultado
-            if melhor_resultado['aproveitamento'] >= excelencia:
-                break
-        return melhor_resultado
+    random.Random(semente).shuffle(pecas)
+    return pecas
+
+def _avaliar_sementes(pecas_dict, largura_chapa, sementes):
+    """Tarefa do pool: roda o Best-Fit para cada semente e retorna (total_chapas, semente) da melhor."""
+    melhor = None
+    for semente in sementes:
+        # Só o número de chapas importa aqui: o resultado completo nem é montado.
+        usadas, _ = _empacotar_best_fit(_lista_embaralhada(pecas_dict, semente), largura_chapa)
+        candidato = (len(usadas), semente)
+        if melhor is None or candidato < melhor:
+            melhor = candidato
+    return melhor
+
+def _iterar_paralelo(pecas_dict, largura_chapa, limite_inferior=0, tempo_max_s=TEMPO_MAX_PADRAO_S,
+                     max_tentativas=TENTATIVAS_PARALELAS_PADRAO, semente_base=0, processos=None, cancelar=None):
+    """
+    Busca multi-início em paralelo: distribui permutações sorteadas (sementes
+    semente_base, semente_base + 1, ...) entre os núcleos num pool de processos e
+    gera um resultado a cada melhora. Os processos só devolvem (chapas, semente);
+    o plano é reconstruído aqui a partir da semente, registrada em 'semente'.
+    Com processos=1 (ou configurar_processos(1)) não há pool: os lotes rodam no
+    próprio processo, um a um, com as mesmas sementes.
+    Para no limite inferior, no orçamento de tempo, em max_tentativas, quando
+    `cancelar` (ex.: threading.Event) é sinalizado ou quando o chamador deixa de
+    consumir o gerador (o pool é encerrado em todos os casos).
+    """
+    inicio = time.monotonic()
+    processos = processos or _processos()
+    melhor = None  # (total_chapas, semente)
+    proxima = 0
+
+    def proximo_lote():
+        nonlocal proxima
+        quantidade = min(SEMENTES_POR_LOTE, max_tentativas - proxima)
+        lote = range(semente_base + proxima, semente_base + proxima + quantidade)
+        proxima += quantidade
+        return list(lote)
+
+    def restante():
+        return None if tempo_max_s is None else tempo_max_s - (time.monotonic() - inicio)
+
+    def interrompida():
+        tempo = restante()
+        return (tempo is not None and tempo <= 0) or (cancelar is not None and cancelar.is_set())
+
+    def no_processo():
+        while proxima < max_tentativas and not interrompida():
+            yield [_avaliar_sementes(pecas_dict, largura_chapa, proximo_lote())]
+
+    def no_pool():
+        pool = ProcessPoolExecutor(max_workers=processos)
+        try:
+            pendentes = set()
+            while proxima < max_tentativas and len(pendentes) < 2 * processos:
+                pendentes.add(pool.submit(_avaliar_sementes, pecas_dict, largura_chapa, proximo_lote()))
+            while pendentes and not interrompida():
+                tempo = restante()
+                if cancelar is not None:
+                    tempo = INTERVALO_CANCELAMENTO_S if tempo is None else min(tempo, INTERVALO_CANCELAMENTO_S)
+                concluidos, pendentes = wait(pendentes, timeout=tempo, return_when=FIRST_COMPLETED)
+                yield [futuro.result() for futuro in concluidos]
+                while proxima < max_tentativas and len(pendentes) < 2 * processos:
+                    pendentes.add(pool.submit(_avaliar_sementes, pecas_dict, largura_chapa, proximo_lote()))
+        finally:
+            # Os lotes em andamento são curtos: esperar por eles não deixa processos órfãos.
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    lotes = no_processo() if processos == 1 else no_pool()
+    try:
+        for candidatos in lotes:
+            melhorou = False
+            for candidato in candidatos:
+                if candidato and (melhor is None or candidato < melhor):
+                    melhor = candidato
+                    melhorou = True
+            if melhorou:
+                resultado = otimizar_com_lista_best_fit(_lista_embaralhada(pecas_dict, melhor[1]), largura_chapa)
+                resultado['semente'] = melhor[1]
+                resultado['tentativas'] = proxima
+                yield resultado
+                if melhor[0] <= limite_inferior:
+                    break
+    finally:
+        lotes.close()
+
+def otimizar_paralelo(pecas_dict, largura_chapa, excelencia, limite_inferior=0,
+                      tempo_max_s=TEMPO_MAX_PADRAO_S, max_tentativas=TENTATIVAS_PARALELAS_PADRAO,
+                      semente_base=0, processos=None):
+    """
+    Roda a busca paralela (_iterar_paralelo) até atingir a meta, o limite inferior,
+    o orçamento de tempo ou max_tentativas e retorna o melhor plano. Com o mesmo
+    max_tentativas e tempo de sobra o resultado é sempre o mesmo.
+    """
+    melhor_resultado = None
+    for resultado in _iterar_paralelo(pecas_dict, largura_chapa, limite_inferior, tempo_max_s,
+                                      max_tentativas, semente_base, processos):
+        melhor_resultado = resultado
+        if melhor_resultado['aproveitamento'] >= excelencia:
+            break
+    if melhor_resultado is None:
+        # Nenhum lote terminou dentro do orçamento: avalia ao menos a primeira semente aqui.
+        melhor_resultado = otimizar_com_lista_best_fit(_lista_embaralhada(pecas_dict, semente_base), largura_chapa)
+        melhor_resultado['semente'] = semente_base
+        melhor_resultado['tentativas'] = 1
+    return melhor_resultado
+
+def _interrompida(prazo, cancelar):
+    """A busca passou do prazo (time.monotonic) ou `cancelar` foi sinalizado."""
+    return (prazo is not None and time.monotonic() >= prazo) or (cancelar is not None and cancelar.is_set())
+
+def _esvaziar_chapa(chapas, sobras, alvo, largura_chapa, prazo=None, cancelar=None):
+    """
+    Tenta redistribuir as peças da chapa `alvo` nas sobras das demais, movendo
+    cada peça para a chapa mais justa ou, se não couber em nenhuma, trocando-a
+    por uma peça menor de outra chapa (a menor volta para a fila). Só altera
+    `chapas`/`sobras` se conseguir esvaziar a chapa; retorna True nesse caso.
+    Desiste (retorna False sem alterar nada) ao passar do prazo ou se `cancelar`
+    for sinalizado, conferidos a cada peça.
+    """
+    alteradas = {}  # índice -> cortes tentativos
+    fila = sorted(chapas[alvo], reverse=True)
+    while fila:
+        if _interrompida(prazo, cancelar):
+            return False
+        peca = fila.pop(0)
+        melhor_index = None
+        for i, cortes in enumerate(chapas):
+            if i == alvo:
+                continue
+            sobra = sobras[i] if i not in alteradas else largura_chapa - sum(alteradas[i])
+            if peca <= sobra and (melhor_index is None or sobra < melhor_sobra):
+                melhor_index, melhor_sobra = i, sobra
+        if melhor_index is not None:
+            alteradas[melhor_index] = alteradas.get(melhor_index, chapas[melhor_index]) + [peca]
+            continue
+
+        # Troca: coloca a peça no lugar de uma menor, deixando a menor sobra possível.
+        troca = None
+        for i, cortes in enumerate(chapas):
+            if i == alvo:
+                continue
+            atuais = alteradas.get(i, cortes)
+            sobra = largura_chapa - sum(atuais) if i in alteradas else sobras[i]
+            for j, menor in enumerate(atuais):
+                nova_sobra = sobra + menor - peca
+                if menor < peca and nova_sobra >= 0 and (troca is None or nova_sobra < troca[0]):
+                    troca = (nova_sobra, i, j)
+        if troca is None:
+            return False
+        _, i, j = troca
+        atuais = list(alteradas.get(i, chapas[i]))
+        menor = atuais[j]
+        atuais[j] = peca
+        alteradas[i] = atuais
+        insort(fila, menor, key=lambda valor: -valor)
+
+    for i, cortes in alteradas.items():
+        chapas[i] = cortes
+        sobras[i] = largura_chapa - sum(cortes)
+    chapas[alvo] = []
+    return True
+
+def melhorar_solucao(resultado, largura_chapa, tempo_max_s=TEMPO_MELHORIA_PADRAO_S, limite_inferior=0, cancelar=None):
+    """
+    Busca local depois dos empacotadores: tenta eliminar a chapa menos usada
+    redistribuindo suas peças (movimentos e trocas) nas sobras das outras, até
+    esgotar o tempo, atingir o limite inferior, nenhuma chapa poder ser esvaziada
+    ou `cancelar` ser sinalizado (o prazo e o cancelamento também são conferidos
+    a cada peça movida ou trocada, não só entre chapas).
+    Retorna um novo resultado com 'detalhes_chapas' consistente.
+    """
+    prazo = None if tempo_max_s is None else time.monotonic() + tempo_max_s
+    chapas = [list(chapa['cortes']) for chapa in obter_detalhes_chapas(resultado)]
+    sobras = [largura_chapa - sum(cortes) for cortes in chapas]
+    tentadas = set()
+    while len(chapas) > limite_inferior and not _interrompida(prazo, cancelar):
+        candidatas = [i for i in range(len(chapas)) if i not in tentadas]
+        if not candidatas:
+            break
+        alvo = max(candidatas, key=lambda i: sobras[i])
+        if _esvaziar_chapa(chapas, sobras, alvo, largura_chapa, prazo, cancelar):
+            del chapas[alvo]
+            del sobras[alvo]
+            tentadas = set()  # Outras chapas mudaram; vale tentar de novo
+        else:
+            tentadas.add(alvo)
+
+    return _montar_resultado(
+        [{'largura_usada': largura_chapa - sobra, 'cortes': cortes} for cortes, sobra in zip(chapas, sobras)],
+        largura_chapa)
+
+def reparar_plano(detalhes_chapas, pecas_antigas, pecas_novas, largura_chapa, tempo_reparo_s=TEMPO_REPARO_S,
+                  limite_inferior=0):
+    """
+    Adapta um plano feito para `pecas_antigas` ao pedido `pecas_novas`: as peças a
+    mais saem das chapas menos aproveitadas (chapas vazias somem), as que faltam
+    entram nas sobras por Best-Fit (abrindo chapas se preciso) e, por fim, a busca
+    local tenta eliminar chapas por tempo_reparo_s. Só as chapas afetadas mudam.
+    """
+    excesso = {}
+    faltantes = []
+    for largura in set(pecas_antigas) | set(pecas_novas):
+        diferenca = pecas_antigas.get(largura, 0) - pecas_novas.get(largura, 0)
+        if diferenca > 0:
+            excesso[largura] = diferenca
+        elif diferenca < 0:
+            faltantes.extend([largura] * -diferenca)
+
+    chapas = [list(chapa['cortes']) for chapa in detalhes_chapas]
+    if excesso:
+        for cortes in sorted(chapas, key=sum):
+            for j in range(len(cortes) - 1, -1, -1):
+                if excesso.get(cortes[j]):
+                    excesso[cortes[j]] -= 1
+                    del cortes[j]
+        chapas = [cortes for cortes in chapas if cortes]
+
+    resultado = otimizar_com_lista_best_fit(sorted(faltantes, reverse=True), largura_chapa, chapas_iniciais=chapas)
+    if tempo_reparo_s and resultado['total_chapas'] > limite_inferior:
+        melhorado = melhorar_solucao(resultado, largura_chapa, tempo_reparo_s, limite_inferior)
+        if melhorado['total_chapas'] < resultado['total_chapas']:
+            resultado = melhorado
+    return resultado
+
+def _pecas_de_id(pecas_id):
+    """Inverso de gerar_id_unico: '110x10|215x8' -> {110: 10, 215: 8}."""
+    pecas = {}
+    for item in pecas_id.split("|"):
+        largura, _, qtd = item.rpartition("x")
+        largura = float(largura)
+        pecas[int(largura) if largura.is_integer() else largura] = int(qtd)
+    return pecas
+
+def distancia_pedidos(pecas_a, pecas_b):
+    """Quantas peças precisam entrar ou sair para transformar um pedido no outro."""
+    return sum(abs(pecas_a.get(l, 0) - pecas_b.get(l, 0)) for l in set(pecas_a) | set(pecas_b))
+
+def buscar_plano_semelhante(historico, pecas_dict, largura_chapa, algoritmo=None,
+                            fracao_max=FRACAO_MAX_DIFERENCA_SEMELHANTE, max_candidatos=MAX_CANDIDATOS_SEMELHANTE):
+    """
+    Procura no histórico (conexão aberta) o pedido mais parecido com `pecas_dict`
+    para a mesma largura de chapa e o mesmo algoritmo (qualquer um, se None): a
+    distância é quantas peças precisam entrar ou sair, e só valem pedidos até
+    fracao_max do total de peças. O filtro é feito no SQLite e só os max_candidatos
+    pedidos mais recentes são comparados. Retorna o plano guardado já reparado para
+    o pedido novo, ou None.
+    """
+    total_pecas = sum(pecas_dict.values())
+    if not total_pecas or fracao_max <= 0:
+        return None
+    melhor = None  # (distancia, -aproveitamento, chave, pecas)
+    for chave, pecas_id, _, aproveitamento in historico_db.listar_pedidos(historico, largura_chapa, algoritmo,
+                                                                          max_candidatos):
+        try:
+            pecas = _pecas_de_id(pecas_id)
+        except ValueError:
+            continue
+        distancia = distancia_pedidos(pecas, pecas_dict)
+        if distancia <= fracao_max * total_pecas and (melhor is None or (distancia, -aproveitamento) < melhor[:2]):
+            melhor = (distancia, -aproveitamento, chave, pecas)
+    if melhor is None:
+        return None
+    solucao = historico_db.buscar(historico, melhor[2])
+    if not solucao or not solucao.get('total_chapas'):
+        return None
+    return reparar_plano(obter_detalhes_chapas(solucao), melhor[3], pecas_dict, largura_chapa,
+                         limite_inferior=calcular_limite_inferior(pecas_dict, largura_chapa))
+
+def caracteristicas_pedido(pecas_dict, largura_chapa):
+    """
+    Características baratas do pedido usadas pelo modo 'auto': número de peças,
+    larguras distintas, maior razão e razão média largura/chapa (ponderada pela
+    quantidade) e se todas as larguras são inteiras (requisito do exato).
+    """
+    total = sum(pecas_dict.values())
+    return {
+        'pecas': total,
+        'larguras_distintas': len(pecas_dict),
+        'maior_razao': max(pecas_dict) / largura_chapa,
+        'razao_media': sum(l * q for l, q in pecas_dict.items()) / (total * largura_chapa),
+        'larguras_inteiras': isinstance(largura_chapa, int) and all(isinstance(l, int) for l in pecas_dict),
+    }
+
+def otimizar_iterativo(pecas_dict, largura_chapa, algoritmo='best_fit', tempo_max_s=TEMPO_MAX_PADRAO_S,
+                       tempo_melhoria_s=0, progresso=None, cancelar=None, plano_inicial=None, metricas=None):
+    """
+    Versão "anytime" da otimização: gera cada plano estritamente melhor assim que
+    ele é encontrado, como {'resultado', 'estrategia', 'tempo_decorrido', 'limite_inferior'}.
+    As ordenações crescente/decrescente são empacotadas por grupos de largura, sem
+    montar a lista peça a peça; ela só é criada (uma vez) para as tentativas aleatórias.
+    Em 'best_fit_paralelo' as tentativas aleatórias vão para a busca paralela,
+    limitada por tempo_max_s; o 'exato' também para em tempo_max_s e entrega o
+    resto ao FFD. Em 'auto' o FFD vem primeiro e, enquanto houver
+    distância para o limite inferior e tempo (tempo_max_s), a busca sobe de nível
+    conforme caracteristicas_pedido: Best-Fit; exato (larguras inteiras) com
+    FRACAO_TEMPO_EXATO_AUTO do tempo restante; tentativas aleatórias (paralelas
+    em pedidos grandes); busca local. Com tempo_melhoria_s > 0, o melhor plano
+    ainda passa pela busca local de melhorar_solucao no fim.
+    O gerador termina sozinho quando um plano atinge o limite inferior (nesse caso
+    ele é comprovadamente ótimo); quem chama pode parar antes, por exemplo ao
+    atingir a meta, simplesmente saindo do laço.
+    `progresso`, se informado, é chamado após cada estratégia testada (melhorando
+    ou não) com {'estrategias_testadas', 'melhor_aproveitamento', 'melhor_total_chapas',
+    'tempo_decorrido', 'limite_inferior'}. Se `cancelar` (ex.: threading.Event) for
+    sinalizado, a busca termina na próxima verificação e o último plano gerado é o melhor.
+    `plano_inicial` (ex.: um plano do histórico reparado por reparar_plano) é
+    avaliado antes de qualquer estratégia e serve de ponto de partida.
+    `metricas` (ver metricas.coletor) recebe o tempo e o resultado de cada estratégia.
+    """
+    inicio = time.monotonic()
+    if not pecas_dict:
+        return
+    metricas = metricas_mod.coletor(metricas)
+
+    with metricas.fase('limite_inferior'):
+        limite_inferior = calcular_limite_inferior(pecas_dict, largura_chapa)
+    grupos_decrescentes = sorted(pecas_dict.items(), reverse=True)
+
+    def tempo_restante():
+        return tempo_max_s - (time.monotonic() - inicio)
+
+    def aleatorios(pecas):
+        """Tentativas Best-Fit em ordens aleatórias (em lote com NumPy, quando compensa)."""
+        if otimizador_vetorizado.compensa(TENTATIVAS_VETORIZADAS, pecas, largura_chapa):
+            # Com NumPy, centenas de permutações custam o mesmo que poucas em Python.
+            _, ordem = otimizador_vetorizado.melhor_permutacao_best_fit(pecas, largura_chapa, TENTATIVAS_VETORIZADAS)
+            yield 'best_fit_vetorizado', otimizar_com_lista_best_fit(ordem, largura_chapa)
+            return
+        for tentativa in range(8):
+            random.shuffle(pecas)
+            yield f'best_fit_aleatorio_{tentativa + 1}', otimizar_com_lista_best_fit(pecas, largura_chapa)
+
+    def portfolio():
+        """Modo 'auto': cada nível só roda se o anterior não fechou no limite inferior e ainda há tempo."""
+        nonlocal limite_inferior
+        perfil = caracteristicas_pedido(pecas_dict, largura_chapa)
+        yield 'ffd', otimizar_agrupado(grupos_decrescentes, largura_chapa, 'ffd')
+        yield 'best_fit_decrescente', otimizar_agrupado(grupos_decrescentes, largura_chapa, 'best_fit')
+        if perfil['larguras_inteiras'] and tempo_restante() > 0:
+            # O exato para no prazo e entrega o resto ao FFD, então o que decide é o tempo, não o
+            # número de larguras; parte do orçamento fica para as tentativas aleatórias e a busca local.
+            resultado = otimizar_exato(pecas_dict, largura_chapa, FRACAO_TEMPO_EXATO_AUTO * tempo_restante(), cancelar)
+            limite_inferior = max(limite_inferior, _divisao_teto(resultado['valor_lp'] - 1e-6, 1))
+            yield 'exato', resultado
+        if perfil['larguras_distintas'] > 1 and tempo_restante() > 0:
+            if perfil['pecas'] >= PECAS_MIN_PARALELO_AUTO and _processos() > 1:
+                for resultado in _iterar_paralelo(pecas_dict, largura_chapa, limite_inferior, tempo_restante(),
+                                                  cancelar=cancelar):
+                    yield 'best_fit_paralelo', resultado
+            else:
+                pecas = []
+                for largura, quantidade in pecas_dict.items():
+                    pecas.extend([largura] * quantidade)
+                for estrategia, resultado in aleatorios(pecas):
+                    yield estrategia, resultado
+                    if tempo_restante() <= 0:
+                        break
+        if tempo_restante() > 0 and melhor_resultado['total_chapas'] > limite_inferior:
+            yield 'busca_local', melhorar_solucao(melhor_resultado, largura_chapa, tempo_restante(), limite_inferior, cancelar)
+
+    def candidatos():
+        nonlocal limite_inferior
+        if plano_inicial is not None:
+            yield 'historico_semelhante', plano_inicial
+        if algoritmo == 'auto':
+            yield from portfolio()
+        elif algoritmo == 'ffd':
+            yield 'ffd', otimizar_agrupado(grupos_decrescentes, largura_chapa, 'ffd')
+        elif algoritmo == 'exato':
+            resultado = otimizar_exato(pecas_dict, largura_chapa, tempo_restante(), cancelar)
+            limite_inferior = max(limite_inferior, _divisao_teto(resultado['valor_lp'] - 1e-6, 1))
+            yield 'exato', resultado
+        else: # algoritmo == 'best_fit' ou 'best_fit_paralelo'
+            yield 'best_fit_decrescente', otimizar_agrupado(grupos_decrescentes, largura_chapa, 'best_fit')
+            yield 'best_fit_crescente', otimizar_agrupado(grupos_decrescentes[::-1], largura_chapa, 'best_fit')
+
+            # Com uma só largura toda ordem é igual; embaralhar não muda nada.
+            if len(pecas_dict) == 1:
+                return
+            if algoritmo == 'best_fit_paralelo':
+                for resultado in _iterar_paralelo(pecas_dict, largura_chapa, limite_inferior, tempo_max_s,
+                                                  cancelar=cancelar):
+                    yield 'best_fit_paralelo', resultado
+            else:
+                pecas = []
+                for largura, quantidade in pecas_dict.items():
+                    pecas.extend([largura] * quantidade)
+                yield from aleatorios(pecas)
+
+    def passo(resultado, estrategia):
+        return {
+            'resultado': resultado,
+            'estrategia': estrategia,
+            'tempo_decorrido': time.monotonic() - inicio,
+            'limite_inferior': limite_inferior,
+        }
+
+    def cancelado():
+        return cancelar is not None and cancelar.is_set()
+
+    testadas = 0
+    def informar():
+        if progresso is not None:
+            progresso({
+                'estrategias_testadas': testadas,
+                'melhor_aproveitamento': melhor_resultado['aproveitamento'],
+                'melhor_total_chapas': melhor_resultado['total_chapas'],
+                'tempo_decorrido': time.monotonic() - inicio,
+                'limite_inferior': limite_inferior,
+            })
+
+    melhor_resultado = None
+    fonte = candidatos()
+    try:
+        inicio_estrategia = time.perf_counter()
+        for estrategia, resultado in fonte:
+            metricas.estrategia(estrategia, time.perf_counter() - inicio_estrategia, resultado['total_chapas'])
+            testadas += 1
+            if melhor_resultado is None or resultado['aproveitamento'] > melhor_resultado['aproveitamento']:
+                if 'detalhes_chapas' not in resultado:
+                    with metricas.fase('expansao_padroes'):
+                        _com_detalhes(resultado)
+                melhor_resultado = _registrar_limite(resultado, limite_inferior)
+                informar()
+                yield passo(melhor_resultado, estrategia)
+                if melhor_resultado['otimo_comprovado']:
+                    return
+            else:
+                informar()
+            if cancelado():
+                return
+            inicio_estrategia = time.perf_counter()
+    finally:
+        fonte.close()
+
+    if tempo_melhoria_s and not cancelado():
+        inicio_estrategia = time.perf_counter()
+        resultado = melhorar_solucao(melhor_resultado, largura_chapa, tempo_melhoria_s, limite_inferior, cancelar)
+        metricas.estrategia('busca_local', time.perf_counter() - inicio_estrategia, resultado['total_chapas'])
+        testadas += 1
+        if resultado['total_chapas'] < melhor_resultado['total_chapas']:
+            melhor_resultado = _registrar_limite(resultado, limite_inferior)
+            informar()
+            yield passo(melhor_resultado, 'busca_local')
+
+def calcular_melhor_otimizacao(pecas_dict, largura_chapa, excelencia, algoritmo='best_fit', tempo_max_s=TEMPO_MAX_PADRAO_S,
+                               tempo_melhoria_s=0, progresso=None, cancelar=None, plano_inicial=None, metricas=None):
+    """
+    Testa estratégias para encontrar a melhor otimização, usando o algoritmo escolhido.
+    Consome otimizar_iterativo até a meta de excelência ser atingida ou as
+    estratégias acabarem (ou o limite inferior ser atingido). Se a busca for
+    cancelada, o melhor plano até ali é devolvido com 'cancelado': True.
+    O plano vem compacto ('padroes', ver padroes_compactos); obter_detalhes_chapas
+    devolve a lista chapa a chapa quando ela for necessária.
+    Com as métricas ligadas (`metricas`=True ou CORTEX_METRICAS; ver metricas.coletor),
+    o resultado traz 'metricas' com os tempos das fases e das estratégias.
+    """
+    if not pecas_dict:
+        return {'total_chapas': 0, 'aproveitamento': 0, 'padroes': []}
+    coletor = metricas_mod.coletor(metricas)
+
+    melhor_resultado = None
+    for passo in otimizar_iterativo(pecas_dict, largura_chapa, algoritmo, tempo_max_s, tempo_melhoria_s,
+                                    progresso, cancelar, plano_inicial, coletor):
+        melhor_resultado = passo['resultado']
+        coletor.vencedora(passo['estrategia'])
+        if melhor_resultado['aproveitamento'] >= excelencia:
+            break
+    with coletor.fase('compactacao'):
+        melhor_resultado = compactar_resultado(melhor_resultado)
+    if cancelar is not None and cancelar.is_set() and not melhor_resultado['otimo_comprovado']:
+        melhor_resultado['cancelado'] = True
+    if coletor is not metricas_mod.DESLIGADAS and metricas is not coletor:
+        melhor_resultado['metricas'] = coletor.como_dict()
+    return melhor_resultado
 
 # --- Funções de Geração de Relatório e Execução ---
 
@@ -150,72 +995,384 @@ def calcular_melhor_otimizacao(pecas_dict, largura_chapa, excelencia, algoritmo=
 
 # DENTRO DE otimizador_core.py (Substituir a função existente)
 
-def exibir_resultados_como_texto(resultado, largura_chapa):
-    """Gera o relatório de otimização com formatação e visualização aprimoradas."""
+def gerar_linhas_relatorio(resultado, largura_chapa, inicio=0, fim=None):
+    """
+    Gera, linha a linha, o relatório de otimização com formatação e visualização
+    aprimoradas: o cabeçalho e as chapas dos padrões `inicio` a `fim` (exclusive,
+    na ordem de padroes_compactos), para exportar ou exibir planos grandes aos
+    poucos sem montar o texto inteiro.
+    """
     if resultado['total_chapas'] == 0:
-        return "Nenhuma peça para otimizar."
+        yield "Nenhuma peça para otimizar."
+        return
 
-    relatorio = []
-    
-    relatorio.append("======================================")
-    relatorio.append("==        PLANO DE CORTE FINAL        ==")
-    relatorio.append("======================================")
-    relatorio.append(f"  Aproveitamento Geral..: {resultado['aproveitamento']:.2f}%%")
-    relatorio.append(f"  Total de Chapas.......: {resultado['total_chapas']}")
-    relatorio.append("--------------------------------------\n")
+    yield "======================================"
+    yield "==        PLANO DE CORTE FINAL        =="
+    yield "======================================"
+    yield f"  Aproveitamento Geral..: {resultado['aproveitamento']:.2f}%%"
+    yield f"  Total de Chapas.......: {resultado['total_chapas']}"
+    if 'limite_inferior' in resultado:
+        yield f"  Limite Inferior.......: {resultado['limite_inferior']}"
+        if resultado.get('otimo_comprovado'):
+            yield "  >> Plano comprovadamente ótimo (atinge o limite inferior)."
+    yield "--------------------------------------\n"
 
-    for i, chapa in enumerate(resultado['detalhes_chapas']):
-        chapa_num = i + 1
+    # Chapas idênticas saem numa linha só: "Chapas 1–40: [500mm #2  //  110mm #1]".
+    padroes = padroes_compactos(resultado)
+    chapa_num = 1 + sum(chapa['quantidade'] for chapa in padroes[:inicio])
+    for chapa in padroes[inicio:fim]:
         aproveitamento_chapa = (chapa['largura_usada'] / largura_chapa) * 100
-        cortes_str = formatar_cortes_agrupados(chapa['cortes'])
+        cortes_str = formatar_padrao(chapa['cortes'])
         
         # --- NOVA LINHA DE VISUALIZAÇÃO ---
         visualizacao_str = gerar_visualizacao_chapa(chapa, largura_chapa)
         
-        linha_info = (
-            f"Chapa {chapa_num:<2}: [{cortes_str}]  ->  "
+        if chapa['quantidade'] > 1:
+            rotulo = f"Chapas {chapa_num}–{chapa_num + chapa['quantidade'] - 1}"
+        else:
+            rotulo = f"Chapa {chapa_num:<2}"
+        chapa_num += chapa['quantidade']
+        yield (
+            f"{rotulo}: [{cortes_str}]  ->  "
             f"Uso: {chapa['largura_usada']}mm | "
             f"Sobra: {chapa['sobra']}mm (Aprov: {aproveitamento_chapa:.2f}%%)"
         )
-        relatorio.append(linha_info)
-        relatorio.append(f"          {visualizacao_str}\n") # Adiciona a visualização abaixo da info
-    
-    return "\n".join(relatorio)
+        yield f"          {visualizacao_str}\n" # Adiciona a visualização abaixo da info
+
+def exibir_resultados_como_texto(resultado, largura_chapa):
+    """Gera o relatório de otimização inteiro como texto (ver gerar_linhas_relatorio)."""
+    return "\n".join(gerar_linhas_relatorio(resultado, largura_chapa))
 
 # DENTRO DE otimizador_core.py
 
-def executar_otimizacao(pecas_para_corte, largura_chapa, excelencia, algoritmo='best_fit'):
-    """Função principal que orquestra a otimização e RETORNA o relatório."""
-    historico = carregar_historico()
-    id_pecas = gerar_id_unico(pecas_para_corte) + f"|alg:{algoritmo}"
-    solucao_armazenada = historico.get(id_pecas)
-    
-    if solucao_armazenada and solucao_armazenada['aproveitamento'] >= excelencia:
-        relatorio_final = f"--- Solução (Algoritmo: {algoritmo.upper()}) encontrada no histórico! ---\n"
-        relatorio_final += exibir_resultados_como_texto(solucao_armazenada, largura_chapa)
-        return relatorio_final
+def _solucao_satisfaz(solucao, excelencia):
+    return solucao['aproveitamento'] >= excelencia or solucao.get('otimo_comprovado')
 
-    resultado = calcular_melhor_otimizacao(pecas_para_corte, largura_chapa, excelencia, algoritmo)
+def _consultar(chave, largura_chapa, excelencia, coletor):
+    """
+    Cache em memória e depois histórico em disco, sem calcular nada. Retorna
+    (resposta ou None, entrada do cache); um acerto no histórico passa para o cache.
+    """
+    with coletor.fase('cache'):
+        entrada = _cache_solucoes.obter(chave)
+    acertou = entrada is not None and _solucao_satisfaz(entrada['solucao'], excelencia)
+    coletor.registrar_cache(acertou)
+    if acertou:
+        return {'resultado': entrada['solucao'], 'largura_chapa': largura_chapa, 'origem': 'cache'}, entrada
+
+    with coletor.fase('historico_busca'), closing(abrir_historico()) as historico:
+        solucao_armazenada = historico_db.buscar(historico, chave)
+    if solucao_armazenada and _solucao_satisfaz(solucao_armazenada, excelencia):
+        _cache_solucoes.guardar(chave, {'solucao': solucao_armazenada})
+        return {'resultado': solucao_armazenada, 'largura_chapa': largura_chapa, 'origem': 'historico'}, entrada
+    return None, entrada
+
+def consultar_solucao(pecas_para_corte, largura_chapa, excelencia, algoritmo='best_fit'):
+    """
+    A parte de resolver_pedido que não calcula: procura o pedido no cache em
+    memória e no histórico em disco. Retorna {'resultado', 'largura_chapa', 'origem'}
+    (origem 'cache' ou 'historico') ou None se nenhuma solução guardada atingir a
+    meta (ou comprovar o ótimo). É rápida o bastante para rodar no laço de eventos
+    do servidor antes de mandar o pedido ao pool.
+    """
+    chave = gerar_chave_historico(pecas_para_corte, largura_chapa, algoritmo)
+    return _consultar(chave, largura_chapa, excelencia, metricas_mod.DESLIGADAS)[0]
 
-    solucao_anterior = historico.get(id_pecas)
-    if not solucao_anterior or resultado['aproveitamento'] > solucao_anterior.get('aproveitamento', 0):
-        historico[id_pecas] = {
+def resolver_pedido(pecas_para_corte, largura_chapa, excelencia, algoritmo='best_fit', tempo_max_s=TEMPO_MAX_PADRAO_S,
+                    tempo_melhoria_s=0, progresso=None, cancelar=None, metricas=None, consolidado=False):
+    """
+    Resolve um pedido consultando, nesta ordem, o cache em memória, o histórico em
+    disco e, só então, os algoritmos. Soluções novas são gravadas no histórico e no
+    cache (write-through). Retorna {'resultado', 'largura_chapa', 'origem'}, com
+    origem 'cache', 'historico' ou 'calculo'. O texto do plano não é gerado aqui:
+    veja relatorio_da_resposta e formatar_relatorio_final.
+    Com as métricas ligadas (`metricas`=True ou CORTEX_METRICAS=1), a resposta traz
+    também 'metricas' (ver metricas.Metricas.como_dict). Com `consolidado` o pedido
+    é a soma de vários (consolidar_pedidos) e é guardado à parte no histórico.
+    """
+    coletor = metricas_mod.coletor(metricas)
+
+    def responder(resultado, origem):
+        resposta = {'resultado': resultado, 'largura_chapa': largura_chapa, 'origem': origem}
+        if coletor is not metricas_mod.DESLIGADAS:
+            resposta['metricas'] = coletor.como_dict()
+        return resposta
+
+    with coletor.fase('cache'):
+        chave = gerar_chave_historico(pecas_para_corte, largura_chapa, algoritmo, consolidado)
+    conhecida, entrada = _consultar(chave, largura_chapa, excelencia, coletor)
+    if conhecida is not None:
+        return responder(conhecida['resultado'], conhecida['origem'])
+
+    with closing(abrir_historico()) as historico:
+        # Sem solução exata: um pedido parecido do histórico serve de ponto de partida.
+        with coletor.fase('historico_semelhante'):
+            plano_inicial = (buscar_plano_semelhante(historico, pecas_para_corte, largura_chapa, algoritmo)
+                             if pecas_para_corte else None)
+
+    with coletor.fase('calculo'):
+        resultado = calcular_melhor_otimizacao(pecas_para_corte, largura_chapa, excelencia, algoritmo, tempo_max_s,
+                                               tempo_melhoria_s, progresso, cancelar, plano_inicial, coletor)
+
+    if resultado['total_chapas']:
+        solucao = {
             'total_chapas': resultado['total_chapas'],
             'aproveitamento': resultado['aproveitamento'],
-            'detalhes_chapas': resultado['detalhes_chapas'],
+            'padroes': resultado['padroes'],
+            'limite_inferior': resultado['limite_inferior'],
+            'otimo_comprovado': resultado['otimo_comprovado'],
             'timestamp': datetime.now().isoformat()
         }
-        salvar_historico(historico)
+        # O banco só troca a solução armazenada se esta for melhor; o cache segue o mesmo critério.
+        with coletor.fase('historico_gravacao'), closing(abrir_historico()) as historico:
+            coletor.registrar_gravacao(historico_db.gravar(historico, chave, gerar_id_unico(pecas_para_corte),
+                                                           largura_chapa, algoritmo, solucao, consolidado))
+        if not entrada or solucao['aproveitamento'] > entrada['solucao']['aproveitamento']:
+            _cache_solucoes.guardar(chave, {'solucao': solucao})
 
-    relatorio_final = exibir_resultados_como_texto(resultado, largura_chapa)
+    return responder(resultado, 'calculo')
 
-    # --- NOVO FORMATO DO ALERTA ---
-    if resultado['aproveitamento'] < excelencia:
-        alerta = (
-            f"\n\n--------------------------------------\n"
-            f"ATENÇÃO: A meta de {excelencia}%% não foi atingida.\n"
-            f"Melhor aproveitamento encontrado: {resultado['aproveitamento']:.2f}%%"
-        )
-        relatorio_final += alerta
-        
-    return relatorio_final
\ No newline at end of file
+def resolver_incremental(plano_anterior, pecas_anteriores, pecas_novas, largura_chapa, tempo_reparo_s=TEMPO_REPARO_S):
+    """
+    Ajusta o último plano calculado (compacto ou com 'detalhes_chapas') a um pedido
+    editado, mexendo só nas chapas afetadas (ver reparar_plano); larguras trocadas
+    contam como peças removidas + adicionadas. Não consulta nem grava o histórico:
+    o plano ajustado é um rascunho, e "Reotimizar Tudo" (resolver_pedido) continua
+    disponível. Retorna {'resultado', 'largura_chapa', 'origem': 'incremental'}.
+    """
+    limite_inferior = calcular_limite_inferior(pecas_novas, largura_chapa)
+    resultado = compactar_resultado(reparar_plano(obter_detalhes_chapas(plano_anterior), pecas_anteriores, pecas_novas,
+                                                  largura_chapa, tempo_reparo_s, limite_inferior))
+    _registrar_limite(resultado, limite_inferior)
+    return {'resultado': resultado, 'largura_chapa': largura_chapa, 'origem': 'incremental'}
+
+def partes_relatorio_final(resposta, excelencia, algoritmo):
+    """
+    O que formatar_relatorio_final acrescenta ao plano: (cabeçalho de origem,
+    rodapé com o alerta de meta e as métricas). Separados do plano para que ele
+    possa ser exibido por páginas ou gravado aos poucos.
+    """
+    resultado = resposta['resultado']
+    cabecalho = rodape = ""
+
+    if resposta['origem'] in ('cache', 'historico'):
+        cabecalho = f"--- Solução (Algoritmo: {algoritmo.upper()}) encontrada no histórico! ---\n"
+    else:
+        if resposta['origem'] == 'incremental':
+            cabecalho = "--- Plano ajustado a partir do anterior (só as chapas afetadas foram alteradas) ---\n"
+
+        if resultado.get('cancelado'):
+            cabecalho = "--- Otimização interrompida: melhor plano encontrado até o cancelamento ---\n" + cabecalho
+
+        # --- NOVO FORMATO DO ALERTA ---
+        if resultado['aproveitamento'] < excelencia:
+            alerta = (
+                f"\n\n--------------------------------------\n"
+                f"ATENÇÃO: A meta de {excelencia}%% não foi atingida.\n"
+                f"Melhor aproveitamento encontrado: {resultado['aproveitamento']:.2f}%%"
+            )
+            if resultado.get('otimo_comprovado'):
+                alerta += (
+                    f"\nNão existe plano melhor: nenhum plano usa menos de "
+                    f"{resultado['limite_inferior']} chapas para estas peças."
+                )
+            elif resposta['origem'] == 'incremental':
+                alerta += "\nUse \"Reotimizar Tudo\" para calcular o plano do zero."
+            rodape += alerta
+
+    if resposta.get('metricas'):
+        rodape += "\n\n" + metricas_mod.formatar_rodape(resposta['metricas'])
+    return cabecalho, rodape
+
+def relatorio_da_resposta(resposta):
+    """
+    O plano da resposta (de resolver_pedido, resolver_incremental ou
+    consolidar_pedidos) em texto, sem cabeçalhos nem alertas. Gerado só quando
+    alguém vai mostrá-lo: no lote em JSONL e no serviço em JSON ele não é montado.
+    """
+    if 'pedidos' in resposta:
+        return exibir_consolidacao_como_texto(resposta, resposta['largura_chapa'])
+    return exibir_resultados_como_texto(resposta['resultado'], resposta['largura_chapa'])
+
+def _medir_relatorio(resposta, inicio):
+    """Com as métricas ligadas, soma à fase 'relatorio' da resposta o tempo desde `inicio`."""
+    dados = resposta.get('metricas')
+    if dados:
+        decorrido = time.perf_counter() - inicio
+        dados['fases_s']['relatorio'] = dados['fases_s'].get('relatorio', 0.0) + decorrido
+        dados['total_s'] += decorrido
+
+def formatar_relatorio_final(resposta, excelencia, algoritmo):
+    """
+    Relatório exibido ao usuário: o plano da resposta com o cabeçalho de origem, o
+    alerta de meta e, se a resposta trouxer 'metricas', o rodapé com elas (já com
+    o tempo gasto gerando o plano, na fase 'relatorio').
+    """
+    inicio = time.perf_counter()
+    plano = relatorio_da_resposta(resposta)
+    _medir_relatorio(resposta, inicio)
+    cabecalho, rodape = partes_relatorio_final(resposta, excelencia, algoritmo)
+    return cabecalho + plano + rodape
+
+def exportar_relatorio(arquivo, resposta, excelencia, algoritmo, largura_chapa):
+    """
+    Grava em `arquivo` (aberto para texto) o mesmo relatório de formatar_relatorio_final,
+    gerando as linhas do plano a partir do resultado enquanto escreve.
+    """
+    arquivo.write(partes_relatorio_final(resposta, excelencia, algoritmo)[0])
+    inicio = time.perf_counter()
+    separador = ""
+    for linha in gerar_linhas_relatorio(resposta['resultado'], largura_chapa):
+        arquivo.write(separador + linha)
+        separador = "\n"
+    _medir_relatorio(resposta, inicio)
+    # O rodapé é montado depois do plano para que as métricas incluam a gravação dele.
+    arquivo.write(partes_relatorio_final(resposta, excelencia, algoritmo)[1])
+
+def executar_otimizacao(pecas_para_corte, largura_chapa, excelencia, algoritmo='best_fit', tempo_max_s=TEMPO_MAX_PADRAO_S,
+                        tempo_melhoria_s=0, progresso=None, cancelar=None, metricas=None):
+    """
+    Função principal que orquestra a otimização e RETORNA o relatório.
+    `progresso` e `cancelar` são repassados a calcular_melhor_otimizacao (usados
+    pela interface para acompanhar e interromper a busca em segundo plano).
+    Com `metricas` (ou CORTEX_METRICAS=1), o relatório ganha o rodapé de métricas.
+    """
+    resposta = resolver_pedido(pecas_para_corte, largura_chapa, excelencia, algoritmo, tempo_max_s,
+                               tempo_melhoria_s, progresso, cancelar, metricas)
+    return formatar_relatorio_final(resposta, excelencia, algoritmo)
+
+# --- Consolidação de Pedidos ---
+
+def somar_pedidos(pedidos):
+    """Demanda total de vários pedidos ({id: pecas_dict}) como um único pecas_dict."""
+    total = {}
+    for pecas_dict in pedidos.values():
+        for largura, qtd in pecas_dict.items():
+            if qtd > 0:
+                total[largura] = total.get(largura, 0) + qtd
+    return total
+
+def distribuir_por_pedido(padroes, pedidos):
+    """
+    Atribui os cortes de cada padrão aos pedidos de origem, consumindo a demanda de
+    cada largura na ordem dos pedidos. Trabalha por padrão, não por chapa: enquanto
+    o primeiro pedido da fila de cada largura tiver peças para toda uma sequência de
+    chapas, a sequência inteira é atribuída de uma vez.
+    Retorna cópias dos padrões com 'distribuicao': [{'quantidade', 'cortes':
+    [[largura, pedido, qtd], ...]}, ...] (as sequências de chapas iguais do padrão).
+    """
+    filas = {}
+    for pedido, pecas_dict in pedidos.items():
+        for largura, qtd in pecas_dict.items():
+            if qtd > 0:
+                filas.setdefault(largura, []).append([pedido, qtd])
+    inicio_fila = dict.fromkeys(filas, 0)
+
+    def retirar(largura, qtd):
+        """Retira `qtd` peças da fila da largura; retorna [(pedido, qtd), ...]."""
+        fila = filas[largura]
+        retiradas = []
+        while qtd:
+            item = fila[inicio_fila[largura]]
+            usado = min(qtd, item[1])
+            retiradas.append((item[0], usado))
+            item[1] -= usado
+            qtd -= usado
+            if not item[1]:
+                inicio_fila[largura] += 1
+        return retiradas
+
+    distribuidos = []
+    for padrao in padroes:
+        distribuicao = []
+        restantes = padrao['quantidade']
+        while restantes:
+            # Quantas chapas seguidas o primeiro pedido de cada largura consegue preencher sozinho.
+            sequencia = min(filas[largura][inicio_fila[largura]][1] // qtd for largura, qtd in padrao['cortes'])
+            chapas = min(sequencia, restantes) or 1
+            cortes = []
+            for largura, qtd in padrao['cortes']:
+                for pedido, usado in retirar(largura, qtd * chapas):
+                    cortes.append([largura, pedido, usado // chapas])
+            if distribuicao and distribuicao[-1]['cortes'] == cortes:
+                distribuicao[-1]['quantidade'] += chapas
+            else:
+                distribuicao.append({'quantidade': chapas, 'cortes': cortes})
+            restantes -= chapas
+        distribuidos.append(dict(padrao, distribuicao=distribuicao))
+    return distribuidos
+
+def _resumo_por_pedido(padroes, pedidos, largura_chapa):
+    """Peças, chapas exclusivas, chapas compartilhadas e chapas equivalentes (pela largura usada) de cada pedido."""
+    resumo = {pedido: {'pecas': sum(pecas_dict.values()), 'chapas_exclusivas': 0, 'chapas_compartilhadas': 0,
+                       'chapas_equivalentes': 0.0,
+                       'limite_inferior_separado': calcular_limite_inferior(pecas_dict, largura_chapa)}
+              for pedido, pecas_dict in pedidos.items()}
+    for padrao in padroes:
+        for trecho in padrao['distribuicao']:
+            uso = {}
+            for largura, pedido, qtd in trecho['cortes']:
+                uso[pedido] = uso.get(pedido, 0) + largura * qtd
+            campo = 'chapas_exclusivas' if len(uso) == 1 else 'chapas_compartilhadas'
+            for pedido, largura_usada in uso.items():
+                resumo[pedido][campo] += trecho['quantidade']
+                resumo[pedido]['chapas_equivalentes'] += trecho['quantidade'] * largura_usada / padrao['largura_usada']
+    return resumo
+
+def consolidar_pedidos(pedidos, largura_chapa, excelencia, algoritmo='auto', tempo_max_s=TEMPO_MAX_PADRAO_S,
+                       tempo_melhoria_s=0, progresso=None, cancelar=None, metricas=None):
+    """
+    Otimiza vários pedidos ({id: pecas_dict}) da mesma largura de chapa juntos, para
+    que a sobra de um seja aproveitada pelas peças de outro. A demanda é somada por
+    largura (sem juntar listas de peças) e resolvida uma vez por resolver_pedido,
+    então o histórico e o cache valem para o conjunto (guardado como consolidado,
+    fora da busca por pedidos semelhantes); com 'auto' ou 'exato' o
+    cálculo é feito sobre padrões, e o turno inteiro custa o mesmo que um pedido
+    com as mesmas larguras. Depois cada corte é atribuído ao pedido de origem.
+    Retorna a resposta de resolver_pedido com os padrões distribuídos
+    ('distribuicao', ver distribuir_por_pedido) e 'pedidos' (resumo por pedido);
+    formatar_relatorio_final gera o relatório consolidado a partir dela.
+    """
+    pedidos = {pedido: pecas_dict for pedido, pecas_dict in pedidos.items() if any(q > 0 for q in pecas_dict.values())}
+    resposta = resolver_pedido(somar_pedidos(pedidos), largura_chapa, excelencia, algoritmo, tempo_max_s,
+                               tempo_melhoria_s, progresso, cancelar, metricas, consolidado=True)
+    resultado = dict(resposta['resultado'])
+    resultado['padroes'] = distribuir_por_pedido(padroes_compactos(resultado), pedidos)
+    resultado.pop('detalhes_chapas', None)
+    return dict(resposta, resultado=resultado, pedidos=_resumo_por_pedido(resultado['padroes'], pedidos, largura_chapa))
+
+def exibir_consolidacao_como_texto(consolidacao, largura_chapa):
+    """Relatório da consolidação: resumo por pedido e os padrões com o pedido de cada corte."""
+    resultado = consolidacao['resultado']
+    if resultado['total_chapas'] == 0:
+        return "Nenhuma peça para otimizar."
+
+    relatorio = []
+    relatorio.append("======================================")
+    relatorio.append("==   PLANO DE CORTE CONSOLIDADO     ==")
+    relatorio.append("======================================")
+    relatorio.append(f"  Pedidos...............: {len(consolidacao['pedidos'])}")
+    relatorio.append(f"  Aproveitamento Geral..: {resultado['aproveitamento']:.2f}%%")
+    relatorio.append(f"  Total de Chapas.......: {resultado['total_chapas']}")
+    if 'limite_inferior' in resultado:
+        relatorio.append(f"  Limite Inferior.......: {resultado['limite_inferior']}")
+    separados = sum(item['limite_inferior_separado'] for item in consolidacao['pedidos'].values())
+    relatorio.append(f"  Separados (mínimo)....: {separados} chapas")
+    relatorio.append("--------------------------------------")
+    relatorio.append("POR PEDIDO (exclusivas + compartilhadas, equivalente pela largura usada)")
+    for pedido, item in consolidacao['pedidos'].items():
+        relatorio.append(f"  {pedido}: {item['pecas']} peças | {item['chapas_exclusivas']} + "
+                         f"{item['chapas_compartilhadas']} chapas | ~{item['chapas_equivalentes']:.2f} chapas")
+    relatorio.append("--------------------------------------\n")
+
+    chapa_num = 1
+    for padrao in resultado['padroes']:
+        for trecho in padrao['distribuicao']:
+            if trecho['quantidade'] > 1:
+                rotulo = f"Chapas {chapa_num}–{chapa_num + trecho['quantidade'] - 1}"
+            else:
+                rotulo = f"Chapa {chapa_num:<2}"
+            chapa_num += trecho['quantidade']
+            cortes_str = "  //  ".join(f"{largura}mm #{qtd} ({pedido})" for largura, pedido, qtd in trecho['cortes'])
+            relatorio.append(f"{rotulo}: [{cortes_str}]  ->  Uso: {padrao['largura_usada']}mm | Sobra: {padrao['sobra']}mm")
+    return "\n".join(relatorio)
@@ -0,0 +1,338 @@
+# Arquivo: otimizador_exato.py
+
+"""
+Algoritmo exato para o problema de corte unidimensional (cutting stock).
+
+Resolve a relaxação linear do modelo de padrões de corte por geração de colunas:
+o problema mestre escolhe quantas vezes cada padrão é usado e o subproblema de
+preços é uma mochila limitada (programação dinâmica) sobre as larguras inteiras
+da chapa. Com uma tabela de padrões (ver tabela_padroes), as colunas são
+precificadas primeiro nos padrões da tabela, e a mochila só roda quando nenhum
+deles melhora o mestre (para provar que a relaxação chegou ao ótimo). Com o
+NumPy (opcional) a tabela inteira é avaliada de uma vez; sem ele, ela só é
+usada quando percorrê-la custa menos que uma mochila.
+A solução fracionária é arredondada para baixo e as peças que faltarem ficam
+para o empacotador do otimizador_core.
+
+Com um prazo (tempo_max_s) ou um evento de cancelamento, a geração de colunas,
+a mochila e as rodadas de arredondamento param assim que ele vence; o que já foi
+arredondado é aproveitado e o resto fica para o empacotador.
+"""
+
+import math
+import random
+import time
+
+try:
+    import numpy as np
+except ImportError:  # NumPy é opcional
+    np = None
+
+TOLERANCIA = 1e-9
+MAX_ITERACOES_COLUNAS = 2000
+# As demandas do mestre ganham até tanto a mais (fixo por pedido) para que os pivôs
+# não sejam degenerados: sem isso o simplex pode ciclar entre padrões e excessos.
+PERTURBACAO_DEMANDA = 1e-7
+
+# --- Problema mestre (simplex revisado) ---
+
+class _ProblemaMestre:
+    """
+    Problema mestre restrito: min sum(x) sujeito a A·x >= demanda, x >= 0.
+    Simplex revisado com a inversa da base explícita (m x m, m = larguras distintas),
+    então cada coluna nova entra com um único pivoteamento, sem resolver tudo de novo.
+    Colunas com `folga=True` são as variáveis de excesso (-e_i), de custo zero.
+    """
+
+    def __init__(self, demandas, colunas_iniciais):
+        # A base inicial são os padrões homogêneos, um por largura (matriz diagonal).
+        m = len(demandas)
+        self.colunas = [list(c) for c in colunas_iniciais]
+        self.custos = [1.0] * m
+        self.base = list(range(m))
+        self.inversa = [[(1.0 / self.colunas[i][i]) if i == j else 0.0 for j in range(m)] for i in range(m)]
+        self.valores = [demandas[i] / self.colunas[i][i] for i in range(m)]
+
+    def precos(self):
+        """Variáveis duais y = c_B · B^-1 (preço de cada largura)."""
+        m = len(self.base)
+        custos_base = [self.custos[j] for j in self.base]
+        return [sum(custos_base[r] * self.inversa[r][i] for r in range(m)) for i in range(m)]
+
+    def entrar(self, coluna, custo):
+        """Coloca a coluna na base (teste da razão + pivoteamento). Retorna False se nada mudou."""
+        m = len(self.base)
+        direcao = [sum(self.inversa[r][i] * coluna[i] for i in range(m) if coluna[i]) for r in range(m)]
+        linha_pivo = None
+        menor_razao = None
+        for r in range(m):
+            if direcao[r] > TOLERANCIA:
+                razao = self.valores[r] / direcao[r]
+                if (menor_razao is None or razao < menor_razao - TOLERANCIA
+                        or (abs(razao - menor_razao) <= TOLERANCIA and self.base[r] < self.base[linha_pivo])):
+                    menor_razao = razao
+                    linha_pivo = r
+        if linha_pivo is None:
+            return False
+
+        self.colunas.append(list(coluna))
+        self.custos.append(custo)
+        fator = direcao[linha_pivo]
+        pivo = [v / fator for v in self.inversa[linha_pivo]]
+        self.inversa[linha_pivo] = pivo
+        self.valores[linha_pivo] = menor_razao
+        for r in range(m):
+            if r != linha_pivo and direcao[r]:
+                coef = direcao[r]
+                self.inversa[r] = [a - coef * b for a, b in zip(self.inversa[r], pivo)]
+                self.valores[r] = max(0.0, self.valores[r] - coef * menor_razao)
+        self.base[linha_pivo] = len(self.colunas) - 1
+        return True
+
+    def solucao(self):
+        """Retorna (valor, [(coluna, uso), ...]) só com os padrões da base (excessos fora)."""
+        usados = [(self.colunas[j], x) for j, x in zip(self.base, self.valores) if self.custos[j]]
+        return sum(x for _, x in usados), usados
+
+def _esgotado(prazo, cancelar):
+    """True se o prazo (instante de time.monotonic) passou ou se `cancelar` (ex.: threading.Event) foi sinalizado."""
+    return (prazo is not None and time.monotonic() >= prazo) or (cancelar is not None and cancelar.is_set())
+
+# --- Subproblema de preços ---
+
+def mochila_limitada(larguras, valores, limites, capacidade, prazo=None, cancelar=None):
+    """
+    Mochila limitada por programação dinâmica: maximiza sum(valores[i] * a[i]) com
+    sum(larguras[i] * a[i]) <= capacidade e 0 <= a[i] <= limites[i].
+    Os limites são quebrados em potências de dois para virar uma mochila 0/1.
+    Retorna (valor, a), ou None se o prazo vencer ou `cancelar` for sinalizado
+    no meio do cálculo (ver _esgotado).
+    """
+    itens = []
+    for i, (largura, valor, limite) in enumerate(zip(larguras, valores, limites)):
+        if valor <= TOLERANCIA or limite <= 0:
+            continue
+        k = 1
+        while limite > 0:
+            lote = min(k, limite)
+            itens.append((i, lote, largura * lote, valor * lote))
+            limite -= lote
+            k *= 2
+
+    melhor = [0.0] * (capacidade + 1)
+    escolhas = []
+    for _, _, peso, valor in itens:
+        if _esgotado(prazo, cancelar):
+            return None
+        # Atualiza todas as capacidades de uma vez a partir da tabela anterior (mochila 0/1).
+        atual = melhor[peso:]
+        candidatos = [v + valor for v in melhor[:len(atual)]]
+        usou = [c > a + TOLERANCIA for c, a in zip(candidatos, atual)]
+        melhor[peso:] = [c if u else a for c, a, u in zip(candidatos, atual, usou)]
+        escolhas.append(bytearray(peso) + bytearray(usou))
+
+    padrao = [0] * len(larguras)
+    c = capacidade
+    for (i, lote, peso, _), usou in zip(reversed(itens), reversed(escolhas)):
+        if usou[c]:
+            padrao[i] += lote
+            c -= peso
+    return melhor[capacidade], padrao
+
+# --- Geração de colunas e arredondamento ---
+
+def _padroes_da_tabela(tabela, larguras, limites):
+    """
+    Padrões da tabela ((larguras da tabela, padrões com pares (índice, qtd)))
+    restritos às larguras do pedido e aos limites de cada uma, sem repetições,
+    como tuplas de (índice em `larguras`, qtd). Todo padrão maximal do pedido
+    aparece, pois é a restrição de algum padrão maximal da tabela.
+    """
+    larguras_tabela, padroes = tabela
+    posicao = {largura: i for i, largura in enumerate(larguras)}
+    mapa = [posicao.get(largura) for largura in larguras_tabela]
+    limite_mapeado = [None if i is None else limites[i] for i in mapa]
+    distintos = set()
+    for padrao in padroes:
+        candidato = tuple((mapa[indice], min(qtd, limite_mapeado[indice]))
+                          for indice, qtd in padrao if mapa[indice] is not None)
+        if candidato:
+            distintos.add(candidato)
+    return list(distintos)
+
+def _tabela_compensa(candidatos, limites, largura_chapa):
+    """
+    A tabela só compensa quando percorrer os candidatos (larguras somadas de todos
+    os padrões) custa menos que preencher uma mochila; com o NumPy cada entrada
+    custa bem menos que uma célula da mochila em Python puro.
+    """
+    celulas_mochila = largura_chapa * sum(limite.bit_length() for limite in limites)
+    entradas = sum(map(len, candidatos))
+    return entradas <= celulas_mochila * 4 if np is not None else entradas * 4 <= celulas_mochila
+
+def _precificador_tabela(candidatos):
+    """Função precos -> (valor, candidato) que acha o padrão de maior valor entre os candidatos."""
+    if not candidatos:
+        return None
+    if np is not None:
+        inicios = np.cumsum([0] + [len(c) for c in candidatos[:-1]])
+        indices = np.array([i for c in candidatos for i, _ in c])
+        quantidades = np.array([qtd for c in candidatos for _, qtd in c], dtype=float)
+
+        def melhor(precos):
+            valores = np.add.reduceat(np.asarray(precos)[indices] * quantidades, inicios)
+            k = int(valores.argmax())
+            return float(valores[k]), candidatos[k]
+        return melhor
+
+    def melhor(precos):
+        return max(((sum(precos[i] * qtd for i, qtd in c), c) for c in candidatos), key=lambda item: item[0])
+    return melhor
+
+def _gerar_colunas(larguras, demandas, largura_chapa, candidatos=None, prazo=None, cancelar=None):
+    """
+    Geração de colunas para as demandas informadas.
+    Retorna (limite_lp, [(coluna, uso), ...], convergiu), com uso = vezes que o padrão
+    entra na solução fracionária. limite_lp é o maior limite de Farley visto (com
+    os preços y >= 0 e v o valor da mochila, y·demandas / max(v, 1) nunca passa do
+    ótimo da relaxação): quando convergiu, é o próprio valor da relaxação; se a
+    geração parar antes (limite de iterações, prazo ou cancelamento), continua
+    sendo um limite inferior válido, só que mais fraco, e a solução continua
+    viável. `candidatos` são padrões da tabela (ver _padroes_da_tabela)
+    precificados antes da mochila.
+    """
+    m = len(larguras)
+    limites = [min(d, largura_chapa // l) for l, d in zip(larguras, demandas)]
+    precificar_tabela = None
+    if candidatos and _tabela_compensa(candidatos, limites, largura_chapa):
+        precificar_tabela = _precificador_tabela(candidatos)
+
+    # Padrões iniciais homogêneos: uma largura só, o máximo que couber.
+    iniciais = []
+    for i, limite in enumerate(limites):
+        coluna = [0] * m
+        coluna[i] = limite
+        iniciais.append(coluna)
+    gerador = random.Random(m)
+    mestre = _ProblemaMestre([d + PERTURBACAO_DEMANDA * gerador.random() for d in demandas], iniciais)
+
+    tabela_na_vez = precificar_tabela is not None
+    convergiu = False
+    limite_lp = 0.0
+    for _ in range(MAX_ITERACOES_COLUNAS):
+        if _esgotado(prazo, cancelar):
+            break
+        precos = mestre.precos()
+        negativo = min(range(m), key=lambda i: precos[i])
+        if precos[negativo] < -TOLERANCIA:
+            # Preço negativo: vale mais sobrar peças dessa largura (variável de excesso).
+            excesso = [0] * m
+            excesso[negativo] = -1
+            if not mestre.entrar(excesso, 0.0):
+                break
+            continue
+        if tabela_na_vez:
+            valor, melhor = precificar_tabela(precos)
+            if valor > 1 + 1e-7:
+                padrao = [0] * m
+                for i, qtd in melhor:
+                    padrao[i] = qtd
+                antes = mestre.solucao()[0]
+                if mestre.entrar(padrao, 1.0):
+                    # Pivô degenerado: a próxima coluna vem da mochila, para não ciclar entre padrões da tabela.
+                    tabela_na_vez = mestre.solucao()[0] < antes - TOLERANCIA
+                    continue
+        tabela_na_vez = precificar_tabela is not None
+        preenchida = mochila_limitada(larguras, precos, limites, largura_chapa, prazo, cancelar)
+        if preenchida is None:
+            break
+        valor, padrao = preenchida
+        # Os preços valem para as demandas sem a perturbação: o limite não depende dela.
+        limite_lp = max(limite_lp, sum(d * max(y, 0.0) for d, y in zip(demandas, precos)) / max(valor, 1.0))
+        if valor <= 1 + 1e-7:
+            convergiu = True
+            break
+        if not mestre.entrar(padrao, 1.0):
+            break
+    return limite_lp, mestre.solucao()[1], convergiu
+
+def _arredondar(larguras, restante, usados, padroes):
+    """Arredonda o uso fracionário para baixo, sem produzir além de `restante` (alterado no lugar)."""
+    for coluna, x in sorted(usados, key=lambda item: item[1], reverse=True):
+        copias = int(math.floor(x + 1e-7))
+        if copias <= 0:
+            continue
+        inteiras = min([copias] + [restante[i] // a for i, a in enumerate(coluna) if a])
+        if inteiras:
+            padroes.append(({larguras[i]: a for i, a in enumerate(coluna) if a}, inteiras))
+            for i, a in enumerate(coluna):
+                restante[i] -= a * inteiras
+        for _ in range(copias - inteiras):
+            cortada = [min(a, r) for a, r in zip(coluna, restante)]
+            if not any(cortada):
+                break
+            padroes.append(({larguras[i]: a for i, a in enumerate(cortada) if a}, 1))
+            for i, a in enumerate(cortada):
+                restante[i] -= a
+
+def resolver_padroes(pecas_dict, largura_chapa, tabela=None, tempo_max_s=None, cancelar=None):
+    """
+    Resolve a relaxação linear por geração de colunas e arredonda o resultado.
+    `tabela` é uma tabela de padrões da chapa ((larguras, padrões), ver
+    tabela_padroes.atualizar) usada na precificação das colunas.
+    O arredondamento é repetido sobre a demanda que sobrou enquanto ele ainda
+    fixar algum padrão e o prazo (tempo_max_s) não vencer nem `cancelar` for
+    sinalizado. Só trata peças de largura inteira que cabem na chapa; as demais
+    (e o que faltar no fim) voltam em 'residual'.
+    Retorna {'padroes': [(contagem_por_largura, multiplicidade), ...],
+             'residual': {largura: qtd}, 'valor_lp': float, 'lp_convergiu': bool},
+    sendo 'valor_lp' o valor da relaxação do pedido completo se 'lp_convergiu'
+    e, se a geração de colunas parar antes (prazo, cancelamento ou limite de
+    iterações), um limite inferior mais fraco para ele (ver _gerar_colunas).
+    """
+    prazo = None if tempo_max_s is None else time.monotonic() + tempo_max_s
+    residual = {}
+    demanda = {}
+    for largura, qtd in pecas_dict.items():
+        if qtd <= 0:
+            continue
+        if isinstance(largura, int) and isinstance(largura_chapa, int) and 0 < largura <= largura_chapa:
+            demanda[largura] = demanda.get(largura, 0) + qtd
+        else:
+            residual[largura] = residual.get(largura, 0) + qtd
+    if not demanda:
+        return {'padroes': [], 'residual': residual, 'valor_lp': 0.0, 'lp_convergiu': True}
+
+    larguras = sorted(demanda, reverse=True)
+    restante = [demanda[l] for l in larguras]
+    # A tabela é restrita ao pedido uma vez; cada rodada só filtra as larguras ativas.
+    limites = [min(d, largura_chapa // l) for l, d in zip(larguras, restante)]
+    candidatos = []
+    if tabela and _tabela_compensa(tabela[1], limites, largura_chapa):
+        candidatos = _padroes_da_tabela(tabela, larguras, limites)
+    padroes = []
+    valor_lp = None
+    lp_convergiu = False
+    while any(restante):
+        if valor_lp is not None and _esgotado(prazo, cancelar):
+            break  # O que faltar vai para o empacotador
+        ativos = [i for i, qtd in enumerate(restante) if qtd]
+        larguras_ativas = [larguras[i] for i in ativos]
+        restante_ativo = [restante[i] for i in ativos]
+        limites_ativos = [min(d, largura_chapa // l) for l, d in zip(larguras_ativas, restante_ativo)]
+        candidatos_ativos = _padroes_da_tabela((larguras, candidatos), larguras_ativas, limites_ativos) if candidatos else None
+        valor, usados, convergiu = _gerar_colunas(larguras_ativas, restante_ativo, largura_chapa, candidatos_ativos,
+                                                  prazo, cancelar)
+        if valor_lp is None:
+            valor_lp, lp_convergiu = valor, convergiu
+        fixados = len(padroes)
+        _arredondar(larguras_ativas, restante_ativo, usados, padroes)
+        for i, qtd in zip(ativos, restante_ativo):
+            restante[i] = qtd
+        if len(padroes) == fixados:
+            break
+
+    for largura, qtd in zip(larguras, restante):
+        if qtd:
+            residual[largura] = residual.get(largura, 0) + qtd
+    return {'padroes': padroes, 'residual': residual, 'valor_lp': valor_lp, 'lp_convergiu': lp_convergiu}
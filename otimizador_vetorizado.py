@@ -0,0 +1,98 @@
+# Arquivo: otimizador_vetorizado.py
+
+"""
+Best-Fit vetorizado: avalia K permutações da mesma lista de peças ao mesmo tempo.
+
+As sobras das chapas de todas as permutações ficam numa matriz K x max_chapas e
+cada passo coloca a j-ésima peça de todas as permutações de uma vez (teste de
+encaixe, escolha da sobra mais justa e atualização feitos com operações do NumPy).
+O resultado de cada permutação é o mesmo do otimizador_core.otimizar_com_lista_best_fit
+(a sobra mais justa e, no empate, a chapa de menor índice).
+
+O NumPy é opcional: sem ele DISPONIVEL é False e o otimizador_core continua com
+o empacotador em Python puro.
+"""
+
+try:
+    import numpy as np
+except ImportError:  # NumPy é opcional
+    np = None
+
+DISPONIVEL = np is not None
+# O custo de cada passo cresce com o número de chapas abertas (a busca binária do
+# Best-Fit em Python não); acima destes limites o lote deixa de compensar.
+MAX_CHAPAS_VETORIZADO = 500
+MIN_PERMUTACOES_VETORIZADO = 32
+# O lote guarda matrizes K x n (índices e larguras, 8 bytes por elemento): acima
+# disto a memória passa de algumas dezenas de MB e o Python puro é usado.
+MAX_ELEMENTOS_VETORIZADO = 2_000_000
+
+def limite_chapas(pecas, largura_chapa):
+    """
+    Máximo de chapas que o Best-Fit pode abrir: duas chapas abertas nunca ficam ambas
+    com metade ou menos da largura ocupada, então são no máximo 2 * área + 1, mais
+    uma por peça maior que a chapa.
+    """
+    maiores = sum(1 for peca in pecas if peca > largura_chapa)
+    area = sum(peca for peca in pecas if peca <= largura_chapa)
+    return min(len(pecas), 2 * int(-(-area // largura_chapa)) + 1 + maiores)
+
+def compensa(quantidade_permutacoes, pecas, largura_chapa):
+    """
+    Diz se vale usar o motor vetorizado para este lote: NumPy presente, lote grande,
+    poucas chapas e matrizes K x n de tamanho razoável.
+    """
+    return (DISPONIVEL and quantidade_permutacoes >= MIN_PERMUTACOES_VETORIZADO
+            and quantidade_permutacoes * len(pecas) <= MAX_ELEMENTOS_VETORIZADO
+            and limite_chapas(pecas, largura_chapa) <= MAX_CHAPAS_VETORIZADO)
+
+def contar_chapas_best_fit(permutacoes, largura_chapa):
+    """
+    Roda o Best-Fit em lote. `permutacoes` é uma matriz K x n (uma permutação por
+    linha). Retorna um vetor com o número de chapas de cada permutação.
+    """
+    pecas = np.asarray(permutacoes)
+    inteiro = np.issubdtype(pecas.dtype, np.integer) and float(largura_chapa).is_integer()
+    tipo = np.int64 if inteiro else np.float64
+    pecas = pecas.astype(tipo, copy=False)
+    k, n = pecas.shape
+    if n == 0:
+        return np.zeros(k, dtype=np.int64)
+
+    colunas = limite_chapas(pecas[0].tolist(), largura_chapa)
+    # Chapas ainda não abertas têm sobra -1: nenhuma peça (largura > 0) cabe nelas.
+    sobras = np.full((k, colunas), -1, dtype=tipo)
+    abertas = np.zeros(k, dtype=np.int64)
+    linhas = np.arange(k)
+    sem_encaixe = tipo(largura_chapa + 1)  # Maior que qualquer sobra possível
+    usadas = 0  # Colunas já abertas por alguma permutação (só elas entram na busca)
+
+    for j in range(n):
+        peca = pecas[:, j]
+        if usadas:
+            ativas = sobras[:, :usadas]
+            candidatas = np.where(ativas >= peca[:, None], ativas, sem_encaixe)
+            escolhida = candidatas.argmin(axis=1)  # argmin devolve o menor índice no empate
+            cabe = candidatas[linhas, escolhida] < sem_encaixe
+        else:
+            escolhida = np.zeros(k, dtype=np.int64)
+            cabe = np.zeros(k, dtype=bool)
+        # Quem não coube abre a próxima chapa.
+        escolhida = np.where(cabe, escolhida, abertas)
+        sobras[linhas, escolhida] = np.where(cabe, sobras[linhas, escolhida], largura_chapa) - peca
+        abertas += ~cabe
+        usadas = int(abertas.max())
+    return abertas
+
+def melhor_permutacao_best_fit(pecas, largura_chapa, quantidade, semente=None):
+    """
+    Sorteia `quantidade` permutações de `pecas`, empacota todas em lote e retorna
+    (total_chapas, ordem) da melhor, com a ordem como lista Python (pronta para o
+    otimizador_core.otimizar_com_lista_best_fit montar o plano).
+    """
+    gerador = np.random.default_rng(semente)
+    # Permuta índices, não valores: a ordem devolvida mantém as larguras originais (int ou float).
+    indices = gerador.permuted(np.tile(np.arange(len(pecas)), (quantidade, 1)), axis=1)
+    totais = contar_chapas_best_fit(np.asarray(pecas)[indices], largura_chapa)
+    melhor = int(totais.argmin())
+    return int(totais[melhor]), [pecas[i] for i in indices[melhor]]
@@ -0,0 +1,203 @@
+# Arquivo: tabela_padroes.py
+
+"""
+Tabelas persistentes de padrões de corte por largura de chapa.
+
+Para cada largura de chapa é mantida a lista dos padrões maximais (em que não
+cabe mais nenhuma peça) sobre todas as larguras de peça já vistas nos pedidos.
+O conjunto só depende da chapa e das larguras, então vale de um pedido para o
+outro: o otimizador_exato usa a tabela para precificar colunas antes de rodar
+a mochila.
+
+Cada tabela são dois arquivos no diretório configurado:
+  * padroes_<chapa>.bin: inteiros sem sinal de 16 bits (na ordem de bytes da
+    máquina, a tabela é um cache local), um registro por padrão: o número de
+    larguras do padrão seguido dos pares (índice da largura, quantidade), da
+    maior largura para a menor;
+  * padroes_<chapa>.json: metadados (larguras na ordem dos índices, número de
+    padrões, tamanho esperado do .bin e os conjuntos de larguras novas cujo
+    crescimento já estourou o limite).
+
+A tabela só cresce: larguras novas ganham índices no fim, os padrões antigos em
+que passa a caber uma largura nova são descartados e entram os padrões maximais
+que usam alguma largura nova. Se o crescimento passar de MAX_PADROES_TABELA, a
+tabela fica como está e o conjunto de larguras novas tentado é gravado nos
+metadados: enquanto a tabela não mudar, nenhum processo repete a enumeração para
+pedidos que tragam esse conjunto (ou mais larguras além dele); pedidos com outras
+larguras novas ainda podem fazê-la crescer. Os arquivos são trocados com os.replace, então
+outro processo lendo ao mesmo tempo vê a tabela antiga ou a nova; se o .bin não
+bater com os metadados, a tabela é ignorada nesta leitura.
+"""
+
+import json
+import os
+from array import array
+from pathlib import Path
+
+FORMATO = 1
+MAX_PADROES_TABELA = 100_000   # Acima disso a tabela não cresce (enumeração grande demais)
+MAX_NOS_ENUMERACAO = 2_000_000
+_MAX_INDICE = 0xFFFF
+
+# (diretório, largura da chapa) -> (assinatura dos arquivos, larguras, padrões)
+_tabelas_carregadas = {}
+# (diretório, largura da chapa, larguras na tabela) -> conjuntos de larguras novas cujo
+# crescimento estourou o limite, lidos dos metadados ('crescimentos_recusados') ou vistos
+# neste processo.
+_crescimentos_recusados = {}
+
+def _caminhos(diretorio, largura_chapa):
+    diretorio = Path(diretorio)
+    return diretorio / f"padroes_{largura_chapa}.bin", diretorio / f"padroes_{largura_chapa}.json"
+
+def _ler_registros(dados, quantidade):
+    """Converte os inteiros do .bin em padrões ((índice, qtd), ...)."""
+    padroes = []
+    posicao = 0
+    for _ in range(quantidade):
+        fim = posicao + 1 + 2 * dados[posicao]
+        padroes.append(tuple(zip(dados[posicao + 1:fim:2], dados[posicao + 2:fim:2])))
+        posicao = fim
+    return padroes
+
+def carregar(largura_chapa, diretorio):
+    """
+    Lê a tabela da chapa. Retorna (larguras, padrões), com cada padrão como uma
+    tupla de pares (índice em `larguras`, qtd), ou ([], []) se não houver tabela válida.
+    A leitura fica guardada em memória enquanto os arquivos não mudarem.
+    """
+    caminho_bin, caminho_json = _caminhos(diretorio, largura_chapa)
+    try:
+        estado_bin, estado_json = caminho_bin.stat(), caminho_json.stat()
+    except OSError:
+        return [], []
+    assinatura = (estado_bin.st_mtime_ns, estado_bin.st_size, estado_json.st_mtime_ns)
+    chave = (str(diretorio), largura_chapa)
+    guardada = _tabelas_carregadas.get(chave)
+    if guardada and guardada[0] == assinatura:
+        return guardada[1], guardada[2]
+
+    try:
+        with open(caminho_json, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        if (meta.get('formato') != FORMATO or meta.get('largura_chapa') != largura_chapa
+                or meta.get('bytes') != estado_bin.st_size):
+            return [], []
+        dados = array('H')
+        with open(caminho_bin, 'rb') as f:
+            dados.fromfile(f, estado_bin.st_size // dados.itemsize)
+        padroes = _ler_registros(dados, meta['padroes'])
+        recusados = {frozenset(novas) for novas in meta.get('crescimentos_recusados', [])}
+    except (OSError, EOFError, ValueError, KeyError, IndexError, TypeError):
+        return [], []
+    larguras = meta['larguras']
+    if recusados:
+        _crescimentos_recusados.setdefault((str(diretorio), largura_chapa, len(larguras)), set()).update(recusados)
+    _tabelas_carregadas[chave] = (assinatura, larguras, padroes)
+    return larguras, padroes
+
+def _gravar(largura_chapa, diretorio, larguras, padroes, recusados=()):
+    dados = array('H')
+    for padrao in padroes:
+        dados.append(len(padrao))
+        for indice, qtd in padrao:
+            dados.append(indice)
+            dados.append(qtd)
+    caminho_bin, caminho_json = _caminhos(diretorio, largura_chapa)
+    Path(diretorio).mkdir(parents=True, exist_ok=True)
+    sufixo = f".{os.getpid()}.tmp"
+    temporario_bin = caminho_bin.with_name(caminho_bin.name + sufixo)
+    temporario_json = caminho_json.with_name(caminho_json.name + sufixo)
+    try:
+        with open(temporario_bin, 'wb') as f:
+            dados.tofile(f)
+        with open(temporario_json, 'w', encoding='utf-8') as f:
+            json.dump({'formato': FORMATO, 'largura_chapa': largura_chapa, 'larguras': larguras,
+                       'padroes': len(padroes), 'bytes': len(dados) * 2,
+                       'crescimentos_recusados': sorted(sorted(novas) for novas in recusados)}, f)
+        os.replace(temporario_bin, caminho_bin)
+        os.replace(temporario_json, caminho_json)
+    except BaseException:
+        temporario_bin.unlink(missing_ok=True)
+        temporario_json.unlink(missing_ok=True)
+        raise
+    estado_bin, estado_json = caminho_bin.stat(), caminho_json.stat()
+    _tabelas_carregadas[(str(diretorio), largura_chapa)] = (
+        (estado_bin.st_mtime_ns, estado_bin.st_size, estado_json.st_mtime_ns), larguras, padroes)
+
+def enumerar_maximais(larguras, largura_chapa, novas, limite=MAX_PADROES_TABELA):
+    """
+    Padrões maximais sobre `larguras` que usam pelo menos uma peça de índice em
+    `novas`, como tuplas de pares (índice, qtd) da maior para a menor largura.
+    Retorna None se passarem de `limite` (ou a busca ficar grande demais).
+    """
+    menor = min(larguras)
+    # As larguras novas vêm primeiro: um ramo que já passou por todas sem usar nenhuma é cortado.
+    ordem = sorted(novas, key=lambda i: -larguras[i]) + sorted(set(range(len(larguras))) - set(novas),
+                                                                key=lambda i: -larguras[i])
+    total_novas = len(novas)
+    padroes = []
+    atual = []
+    nos = 0
+
+    def descer(posicao, livre, usou_nova):
+        nonlocal nos
+        nos += 1
+        if nos > MAX_NOS_ENUMERACAO or len(padroes) > limite:
+            raise OverflowError
+        if posicao == total_novas and not usou_nova:
+            return
+        if livre < menor or posicao == len(ordem):
+            if livre < menor:
+                padroes.append(tuple(sorted(atual, key=lambda par: -larguras[par[0]])))
+            return
+        indice = ordem[posicao]
+        largura = larguras[indice]
+        for qtd in range(livre // largura, 0, -1):
+            atual.append((indice, qtd))
+            descer(posicao + 1, livre - qtd * largura, True if posicao < total_novas else usou_nova)
+            atual.pop()
+        descer(posicao + 1, livre, usou_nova)
+
+    try:
+        descer(0, largura_chapa, False)
+    except OverflowError:
+        return None
+    return padroes
+
+def atualizar(largura_chapa, larguras_pedido, diretorio):
+    """
+    Garante que a tabela da chapa cubra as larguras do pedido (inteiras e que cabem
+    na chapa), fazendo-a crescer se preciso. Retorna (larguras, padrões) como em
+    carregar; se o crescimento estourar MAX_PADROES_TABELA, devolve a tabela como
+    estava (ela continua válida para as larguras que já tem) e grava as larguras
+    novas recusadas, para que nenhum processo volte a tentar crescê-la com elas
+    enquanto ela não mudar.
+    """
+    larguras, padroes = carregar(largura_chapa, diretorio)
+    conhecidas = set(larguras)
+    novas = sorted({l for l in larguras_pedido if isinstance(l, int) and 0 < l <= largura_chapa} - conhecidas)
+    if not novas or len(larguras) + len(novas) > _MAX_INDICE:
+        return larguras, padroes
+    # Larguras novas além de um conjunto recusado em geral só aumentam a enumeração.
+    recusados = _crescimentos_recusados.setdefault((str(diretorio), largura_chapa, len(larguras)), set())
+    if any(recusa <= set(novas) for recusa in recusados):
+        return larguras, padroes
+    todas = larguras + novas
+
+    mantidos = [p for p in padroes if largura_chapa - sum(larguras[i] * qtd for i, qtd in p) < novas[0]]
+    acrescimos = enumerar_maximais(todas, largura_chapa, list(range(len(larguras), len(todas))),
+                                   MAX_PADROES_TABELA - len(mantidos))
+    if acrescimos is None:
+        recusados.add(frozenset(novas))
+        try:
+            _gravar(largura_chapa, diretorio, larguras, padroes, recusados)
+        except OSError:
+            pass  # A recusa vale só para este processo
+        return larguras, padroes
+    padroes = mantidos + acrescimos
+    try:
+        _gravar(largura_chapa, diretorio, todas, padroes)
+    except OSError:
+        pass  # Sem disco, a tabela vale só para este cálculo
+    return todas, padroes
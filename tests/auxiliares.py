@@ -0,0 +1,33 @@
+# Arquivo: tests/auxiliares.py
+
+"""Funções comuns aos testes: conferência de planos de corte."""
+
+import otimizador_core as core
+
+
+def expandir(pecas_dict):
+    """Lista peça a peça de um pecas_dict, em ordem decrescente."""
+    pecas = []
+    for largura, qtd in sorted(pecas_dict.items(), reverse=True):
+        pecas.extend([largura] * qtd)
+    return pecas
+
+
+def contagem_do_plano(resultado):
+    """Peças cortadas num plano (compacto ou chapa a chapa), como {largura: qtd}."""
+    contagem = {}
+    for chapa in core.obter_detalhes_chapas(resultado):
+        for largura in chapa['cortes']:
+            contagem[largura] = contagem.get(largura, 0) + 1
+    return contagem
+
+
+def verificar_plano(resultado, pecas_dict, largura_chapa):
+    """O plano corta exatamente as peças do pedido, nenhuma chapa passa da largura e os totais batem."""
+    detalhes = core.obter_detalhes_chapas(resultado)
+    assert contagem_do_plano(resultado) == {l: q for l, q in pecas_dict.items() if q > 0}
+    assert resultado['total_chapas'] == len(detalhes)
+    for chapa in detalhes:
+        assert chapa['largura_usada'] == sum(chapa['cortes'])
+        assert chapa['largura_usada'] <= largura_chapa or len(chapa['cortes']) == 1
+        assert chapa['sobra'] == largura_chapa - chapa['largura_usada']
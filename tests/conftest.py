@@ -0,0 +1,22 @@
+# Arquivo: tests/conftest.py
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import otimizador_core as core
+
+
+@pytest.fixture(autouse=True)
+def historico_isolado(tmp_path, monkeypatch):
+    """Cada teste usa um histórico, um cache e tabelas de padrões próprios (nada do usuário é tocado)."""
+    monkeypatch.setattr(core, 'HISTORICO_DB_FILE', tmp_path / "historico.db")
+    monkeypatch.setattr(core, 'HISTORICO_FILE', tmp_path / "historico.json")
+    monkeypatch.setattr(core, '_diretorio_padroes', None)
+    core.limpar_cache()
+    yield
+    core.limpar_cache()
+
@@ -0,0 +1,39 @@
+# Arquivo: tests/test_agrupado.py
+
+import random
+
+import otimizador_core as core
+from auxiliares import expandir, verificar_plano
+
+
+def padroes_das_chapas(resultado):
+    """Multiconjunto das chapas (cortes ordenados), independente da ordem das chapas."""
+    return sorted(tuple(sorted(chapa['cortes'])) for chapa in core.obter_detalhes_chapas(resultado))
+
+
+def test_agrupado_igual_ao_empacotador_peca_a_peca():
+    gerador = random.Random(2)
+    for _ in range(150):
+        largura_chapa = gerador.choice([150, 1000, 1200])
+        pecas_dict = {gerador.randint(1, largura_chapa): gerador.randint(1, 30) for _ in range(gerador.randint(1, 12))}
+        grupos = sorted(pecas_dict.items(), reverse=True)
+        lista = expandir(pecas_dict)
+        ffd = core.otimizar_agrupado(grupos, largura_chapa, 'ffd')
+        best_fit = core.otimizar_agrupado(grupos, largura_chapa, 'best_fit')
+        assert padroes_das_chapas(ffd) == padroes_das_chapas(core.otimizar_com_lista_ffd(lista, largura_chapa))
+        assert padroes_das_chapas(best_fit) == padroes_das_chapas(core.otimizar_com_lista_best_fit(lista, largura_chapa))
+        verificar_plano(ffd, pecas_dict, largura_chapa)
+
+
+def test_agrupado_nao_expande_as_pecas():
+    """Um milhão de peças de poucas larguras vira poucos padrões."""
+    resultado = core.otimizar_agrupado([(500, 500_000), (110, 500_000)], 1200, 'ffd')
+    assert len(resultado['padroes']) <= 4
+    assert sum(p['quantidade'] for p in resultado['padroes']) == resultado['total_chapas']
+
+
+def test_agrupado_com_padroes_iniciais():
+    iniciais = [{'cortes': [[1000, 1]], 'largura_usada': 1000, 'quantidade': 3}]
+    resultado = core.otimizar_agrupado([(200, 4)], 1200, 'ffd', padroes_iniciais=iniciais)
+    assert resultado['total_chapas'] == 4
+    verificar_plano(resultado, {1000: 3, 200: 4}, 1200)
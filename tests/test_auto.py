@@ -0,0 +1,55 @@
+# Arquivo: tests/test_auto.py
+
+import time
+
+import cortex_benchmark
+import otimizador_core as core
+from auxiliares import verificar_plano
+
+
+def orcamentos_do_exato(monkeypatch):
+    """Registra o tempo_max_s que o 'auto' dá a cada chamada do exato."""
+    orcamentos = []
+    otimizar_exato = core.otimizar_exato
+
+    def registrar(pecas_dict, largura_chapa, tempo_max_s=None, cancelar=None):
+        orcamentos.append(tempo_max_s)
+        return otimizar_exato(pecas_dict, largura_chapa, tempo_max_s, cancelar)
+
+    monkeypatch.setattr(core, 'otimizar_exato', registrar)
+    return orcamentos
+
+
+def estrategias(pecas_dict, largura_chapa, tempo_max_s):
+    resultado = core.calcular_melhor_otimizacao(pecas_dict, largura_chapa, 100.0, 'auto', tempo_max_s, metricas=True)
+    return resultado, [item['estrategia'] for item in resultado['metricas']['estrategias']]
+
+
+def test_auto_para_no_ffd_quando_ele_fecha_no_limite():
+    resultado, testadas = estrategias({500: 10, 250: 20}, 1000, 5.0)
+    assert testadas == ['ffd'] and resultado['otimo_comprovado']
+
+
+def test_auto_roda_o_exato_com_muitas_larguras_dentro_do_orcamento(monkeypatch):
+    orcamentos = orcamentos_do_exato(monkeypatch)
+    instancia = cortex_benchmark.gerar_uniforme(500, 0)
+    assert len(instancia['pecas']) > 30
+    resultado, testadas = estrategias(instancia['pecas'], instancia['largura_chapa'], 1.0)
+    assert 'exato' in testadas
+    assert len(orcamentos) == 1 and 0 < orcamentos[0] <= core.FRACAO_TEMPO_EXATO_AUTO * 1.0
+    verificar_plano(resultado, instancia['pecas'], instancia['largura_chapa'])
+
+
+def test_auto_sem_exato_para_larguras_fracionarias():
+    _, testadas = estrategias({333.5: 7, 250.25: 9, 120: 11}, 1000, 0.5)
+    assert 'exato' not in testadas
+
+
+def test_auto_respeita_o_orcamento(monkeypatch):
+    orcamentos = orcamentos_do_exato(monkeypatch)
+    instancia = cortex_benchmark.gerar_tripla(300, 0)
+    inicio = time.monotonic()
+    resultado, _ = estrategias(instancia['pecas'], instancia['largura_chapa'], 0.5)
+    assert all(0 < orcamento <= core.FRACAO_TEMPO_EXATO_AUTO * 0.5 for orcamento in orcamentos)
+    assert time.monotonic() - inicio < 0.5 + 10  # Margem larga: só pega uma busca que ignora o prazo
+    verificar_plano(resultado, instancia['pecas'], instancia['largura_chapa'])
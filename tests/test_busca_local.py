@@ -0,0 +1,45 @@
+# Arquivo: tests/test_busca_local.py
+
+import random
+import threading
+
+import otimizador_core as core
+from auxiliares import verificar_plano
+
+
+def plano(chapas, largura_chapa):
+    return core._montar_resultado([{'largura_usada': sum(c), 'cortes': list(c)} for c in chapas], largura_chapa)
+
+
+def test_busca_local_elimina_chapa_com_movimentos():
+    resultado = core.melhorar_solucao(plano([[500, 300], [600, 200], [200, 100]], 1000), 1000)
+    assert resultado['total_chapas'] == 2
+    verificar_plano(resultado, {500: 1, 300: 1, 600: 1, 200: 2, 100: 1}, 1000)
+
+
+def test_busca_local_usa_trocas():
+    """A peça de 400 só cabe trocando-a pela de 300, que então vai para a outra sobra."""
+    resultado = core.melhorar_solucao(plano([[600, 300], [700], [400]], 1000), 1000)
+    assert resultado['total_chapas'] == 2
+    verificar_plano(resultado, {600: 1, 300: 1, 700: 1, 400: 1}, 1000)
+
+
+def test_busca_local_mantem_o_plano_consistente():
+    gerador = random.Random(5)
+    for _ in range(60):
+        pecas_dict = {gerador.randint(50, 700): gerador.randint(1, 15) for _ in range(gerador.randint(2, 8))}
+        pecas = [l for l, q in pecas_dict.items() for _ in range(q)]
+        gerador.shuffle(pecas)
+        inicial = core.otimizar_com_lista_best_fit(pecas, 1200)
+        limite = core.calcular_limite_inferior(pecas_dict, 1200)
+        resultado = core.melhorar_solucao(inicial, 1200, tempo_max_s=1.0, limite_inferior=limite)
+        assert limite <= resultado['total_chapas'] <= inicial['total_chapas']
+        verificar_plano(resultado, pecas_dict, 1200)
+
+
+def test_busca_local_cancelada_devolve_o_plano():
+    cancelar = threading.Event()
+    cancelar.set()
+    inicial = plano([[500, 300], [600, 200], [200, 100]], 1000)
+    resultado = core.melhorar_solucao(inicial, 1000, cancelar=cancelar)
+    assert resultado['total_chapas'] == 3
@@ -0,0 +1,65 @@
+# Arquivo: tests/test_cache_solucoes.py
+
+import cache_solucoes
+import otimizador_core as core
+from cache_solucoes import CacheSolucoes
+
+
+def test_lru_descarta_a_menos_usada():
+    cache = CacheSolucoes(tamanho_max=2, ttl_s=None)
+    cache.guardar('a', 1)
+    cache.guardar('b', 2)
+    assert cache.obter('a') == 1
+    cache.guardar('c', 3)
+    assert cache.obter('b') is None
+    assert (cache.obter('a'), cache.obter('c')) == (1, 3)
+    assert (cache.acertos, cache.faltas) == (3, 1)
+
+
+def test_entradas_expiram(monkeypatch):
+    agora = [1000.0]
+    monkeypatch.setattr(cache_solucoes.time, 'monotonic', lambda: agora[0])
+    cache = CacheSolucoes(tamanho_max=10, ttl_s=60.0)
+    cache.guardar('a', 1)
+    agora[0] += 61
+    assert cache.obter('a') is None
+    assert len(cache) == 0
+
+
+def test_configurar_volta_o_ttl_para_sem_validade(monkeypatch):
+    agora = [1000.0]
+    monkeypatch.setattr(cache_solucoes.time, 'monotonic', lambda: agora[0])
+    cache = CacheSolucoes(tamanho_max=10, ttl_s=60.0)
+    cache.configurar(ttl_s=None)
+    assert cache.ttl_s is None and cache.tamanho_max == 10
+    cache.guardar('a', 1)
+    agora[0] += 10_000
+    assert cache.obter('a') == 1
+
+
+def test_configurar_so_altera_o_que_foi_informado():
+    cache = CacheSolucoes(tamanho_max=10, ttl_s=60.0)
+    for chave in 'abc':
+        cache.guardar(chave, chave)
+    cache.configurar(tamanho_max=1)
+    assert cache.ttl_s == 60.0
+    assert len(cache) == 1 and cache.obter('c') == 'c'
+
+
+def test_pedido_repetido_vem_do_cache():
+    pedido = {500: 4, 300: 6}
+    assert core.resolver_pedido(pedido, 1000, 90.0, 'ffd')['origem'] == 'calculo'
+    assert core.resolver_pedido(pedido, 1000, 90.0, 'ffd')['origem'] == 'cache'
+    core.limpar_cache()
+    assert core.resolver_pedido(pedido, 1000, 90.0, 'ffd')['origem'] == 'historico'
+
+
+def test_resposta_sem_relatorio_pronto():
+    pecas = {500: 4, 300: 2}
+    calculada = core.resolver_pedido(pecas, 1200, 100.0, 'best_fit', 0.5)
+    guardada = core.resolver_pedido(pecas, 1200, 0.0, 'best_fit', 0.5)
+    assert guardada['origem'] == 'cache'
+    assert 'relatorio' not in calculada and 'relatorio' not in guardada
+    plano = core.exibir_resultados_como_texto(calculada['resultado'], 1200)
+    assert core.relatorio_da_resposta(guardada) == plano
+    assert plano in core.formatar_relatorio_final(guardada, 0.0, 'best_fit')
@@ -0,0 +1,52 @@
+# Arquivo: tests/test_cancelamento.py
+
+import threading
+import time
+
+import cortex_benchmark
+import otimizador_core as core
+from auxiliares import verificar_plano
+
+
+class CancelarDepois:
+    """Evento que passa a estar sinalizado depois de `consultas` chamadas a is_set."""
+
+    def __init__(self, consultas):
+        self.consultas = consultas
+
+    def is_set(self):
+        self.consultas -= 1
+        return self.consultas < 0
+
+
+def plano(chapas, largura_chapa):
+    return core._montar_resultado([{'largura_usada': sum(c), 'cortes': list(c)} for c in chapas], largura_chapa)
+
+
+def test_esvaziar_chapa_desiste_no_meio_sem_alterar_nada():
+    chapas = [[500, 300], [600, 200], [200, 100]]
+    sobras = [200, 200, 700]
+    assert not core._esvaziar_chapa(chapas, sobras, 2, 1000, cancelar=CancelarDepois(1))
+    assert chapas == [[500, 300], [600, 200], [200, 100]] and sobras == [200, 200, 700]
+    assert core._esvaziar_chapa(chapas, sobras, 2, 1000, prazo=time.monotonic() + 60)
+
+
+def test_busca_local_cancelada_no_meio_de_uma_chapa():
+    """O cancelamento é visto entre as peças da chapa alvo, não só entre uma chapa e outra."""
+    inicial = plano([[500, 300], [600, 200], [200, 100]], 1000)
+    resultado = core.melhorar_solucao(inicial, 1000, cancelar=CancelarDepois(2))
+    assert resultado['total_chapas'] == 3
+    verificar_plano(resultado, {500: 1, 300: 1, 600: 1, 200: 2, 100: 1}, 1000)
+
+
+def test_cancelar_durante_o_exato_devolve_o_melhor_plano():
+    instancia = cortex_benchmark.gerar_tripla(120)
+    cancelar = threading.Event()
+    threading.Timer(0.2, cancelar.set).start()
+    inicio = time.monotonic()
+    resultado = core.calcular_melhor_otimizacao(instancia['pecas'], instancia['largura_chapa'], 100, 'exato',
+                                                tempo_max_s=60, cancelar=cancelar)
+    assert time.monotonic() - inicio < 2.0
+    assert resultado['cancelado']
+    verificar_plano(resultado, instancia['pecas'], instancia['largura_chapa'])
+
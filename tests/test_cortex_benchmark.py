@@ -0,0 +1,51 @@
+# Arquivo: tests/test_cortex_benchmark.py
+
+import csv
+import io
+import json
+
+import cortex_benchmark
+
+
+def test_geradores_reproduziveis():
+    assert cortex_benchmark.gerar_uniforme(120, 3) == cortex_benchmark.gerar_uniforme(120, 3)
+    uniforme = cortex_benchmark.gerar_uniforme(120, 3)
+    assert sum(uniforme['pecas'].values()) == 120
+    assert all(20 <= largura <= 100 for largura in uniforme['pecas'])
+
+
+def test_tripla_fecha_a_chapa():
+    instancia = cortex_benchmark.gerar_tripla(60, 2)
+    assert sum(instancia['pecas'].values()) == 60
+    assert sum(l * q for l, q in instancia['pecas'].items()) == instancia['otimo'] * instancia['largura_chapa']
+
+
+def test_carregar_bpplib(tmp_path):
+    por_linha = tmp_path / "u120_00.txt"
+    por_linha.write_text("4\n150\n30\n30\n42\n99\n")
+    agrupado = tmp_path / "agrupado.txt"
+    agrupado.write_text("2\n1000\n500 3\n250 4\n")
+    assert cortex_benchmark.carregar_bpplib(por_linha) == {'nome': 'u120_00', 'pecas': {30: 2, 42: 1, 99: 1},
+                                                           'largura_chapa': 150, 'otimo': None}
+    assert cortex_benchmark.carregar_bpplib(agrupado)['pecas'] == {500: 3, 250: 4}
+
+
+def test_medir_mede_distancia_para_o_limite_e_o_otimo():
+    instancia = cortex_benchmark.gerar_tripla(30, 1)
+    linha = cortex_benchmark.medir(instancia, 'ffd', tempo_max_s=0.5)
+    assert linha['pecas'] == 30 and linha['otimo'] == 10
+    assert linha['gap_limite'] == linha['total_chapas'] - linha['limite_inferior'] >= 0
+    assert linha['gap_otimo'] == linha['total_chapas'] - 10
+    assert linha['tempo_s'] > 0 and linha['memoria_pico_kb'] > 0
+
+
+def test_main_grava_json_e_csv(tmp_path, monkeypatch):
+    monkeypatch.setattr('sys.stderr', io.StringIO())
+    argumentos = ['--tipos', 'tripla', '--tamanhos', '30', '--algoritmos', 'lista_ffd', 'ffd', '--tempo-max', '0.2']
+    cortex_benchmark.main(argumentos + ['--saida', str(tmp_path / "r.json")])
+    dados = json.loads((tmp_path / "r.json").read_text(encoding='utf-8'))
+    assert [linha['algoritmo'] for linha in dados['resultados']] == ['lista_ffd', 'ffd']
+    assert 'cpus' in dados['ambiente']
+    cortex_benchmark.main(argumentos + ['--formato', 'csv', '--saida', str(tmp_path / "r.csv")])
+    with open(tmp_path / "r.csv", newline='', encoding='utf-8') as f:
+        assert len(list(csv.DictReader(f))) == 2
@@ -0,0 +1,92 @@
+# Arquivo: tests/test_cortex_lote.py
+
+import io
+import json
+
+import cortex_lote
+import otimizador_core as core
+
+PADROES = {'largura_chapa': 1200, 'meta': 100.0, 'algoritmo': 'best_fit', 'tempo_max_s': 0.5, 'tempo_melhoria_s': 0}
+
+
+def linhas(saida):
+    return [json.loads(linha) for linha in saida.getvalue().splitlines()]
+
+
+def test_ler_pedidos_jsonl(tmp_path):
+    arquivo = tmp_path / "lote.jsonl"
+    arquivo.write_text('{"id": "a", "pecas": {"500": 2}, "largura_chapa": 1000}\n'
+                       '[{"largura": 300, "quantidade": 4}]\n\n{quebrado\n', encoding='utf-8')
+    pedidos = list(cortex_lote.ler_pedidos([str(arquivo)], PADROES))
+    assert [pedido['id'] for pedido in pedidos] == ['a', f"{arquivo}:2", f"{arquivo}:4"]
+    assert pedidos[0]['largura_chapa'] == 1000 and pedidos[1]['largura_chapa'] == 1200
+    assert 'erro' in pedidos[2]
+
+
+def test_paralelo_no_lote_nao_abre_pool_aninhado():
+    """Com 'best_fit_paralelo', cada processo do lote roda a busca nele mesmo e o lote termina."""
+    pedidos = [dict(PADROES, id=str(i), algoritmo='best_fit_paralelo',
+                    pecas={largura: 3 for largura in range(101 + i, 397, 7)}) for i in range(4)]
+    saida = io.StringIO()
+    total, erros = cortex_lote.executar_lote(pedidos, processos=2, saida=saida, log=io.StringIO())
+    assert (total, erros) == (4, 0)
+    assert sorted(linha['id'] for linha in linhas(saida)) == ['0', '1', '2', '3']
+
+
+def _processos_configurados(pedido, formato):
+    return {'id': pedido['id'], 'erro': str(core._processos_paralelos)}
+
+
+def test_processos_do_lote_configurados_sem_pool(monkeypatch):
+    monkeypatch.setattr(cortex_lote, 'resolver', _processos_configurados)
+    saida = io.StringIO()
+    cortex_lote.executar_lote([{'id': 'x'}], processos=2, saida=saida, log=io.StringIO())
+    assert linhas(saida)[0]['erro'] == '1'
+
+
+def test_falha_no_processo_informa_o_id_do_pedido():
+    pedido = dict(PADROES, id='sem_tempo', pecas={500: 2})
+    del pedido['tempo_max_s']  # resolver levanta KeyError dentro do processo
+    saida = io.StringIO()
+    total, erros = cortex_lote.executar_lote([pedido], processos=1, saida=saida, log=io.StringIO())
+    assert (total, erros) == (1, 1)
+    assert linhas(saida)[0]['id'] == 'sem_tempo'
+    assert 'KeyError' in linhas(saida)[0]['erro']
+
+
+def test_sem_pool_com_um_processo(monkeypatch):
+    def sem_pool(*args, **kwargs):
+        raise AssertionError("não devia abrir um pool")
+    monkeypatch.setattr(core, 'ProcessPoolExecutor', sem_pool)
+    monkeypatch.setattr(core, '_processos_paralelos', 1)
+    pedido = {430: 7, 317: 11, 245: 9, 190: 13, 88: 6}
+    resultado = core.otimizar_paralelo(pedido, 1200, 100.0, tempo_max_s=None, max_tentativas=64)
+    esperado = min(core._avaliar_sementes(pedido, 1200, [semente]) for semente in range(64))
+    assert (resultado['total_chapas'], resultado['semente']) == esperado
+
+
+def test_relatorio_so_no_formato_texto(monkeypatch):
+    pedido = dict(PADROES, id='a', pecas={'500': 4, '300': 2})
+    pedido_2d = dict(PADROES, id='b', comprimento_chapa=2750, pecas={'600x400': 3})
+    assert 'PLANO DE CORTE FINAL' in cortex_lote.resolver(pedido, 'texto')['relatorio']
+    assert 'relatorio' in cortex_lote.resolver(pedido_2d, 'texto')
+
+    def proibido(*args, **kwargs):
+        raise AssertionError("relatório gerado na saída JSONL")
+
+    monkeypatch.setattr(core, 'formatar_relatorio_final', proibido)
+    monkeypatch.setattr(core, 'exibir_resultados_como_texto', proibido)
+    monkeypatch.setattr(cortex_lote.otimizador_2d, 'exibir_resultado_2d_como_texto', proibido)
+    assert 'relatorio' not in cortex_lote.resolver(pedido)
+    assert 'relatorio' not in cortex_lote.resolver(pedido_2d)
+    saida = io.StringIO()
+    cortex_lote.consolidar_lote([pedido, dict(pedido, id='c'), pedido_2d], saida=saida, log=io.StringIO())
+    assert [linha['id'] for linha in linhas(saida)] == ['b', 'consolidado_1200']
+
+
+def test_consolidacao_em_texto():
+    pedidos = [dict(PADROES, id='a', pecas={'500': 4}), dict(PADROES, id='b', pecas={'300': 2})]
+    saida = io.StringIO()
+    cortex_lote.consolidar_lote(pedidos, formato='texto', saida=saida, log=io.StringIO())
+    assert "===== consolidado_1200 =====" in saida.getvalue()
+    assert "PLANO DE CORTE CONSOLIDADO" in saida.getvalue()
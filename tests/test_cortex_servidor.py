@@ -0,0 +1,127 @@
+# Arquivo: tests/test_cortex_servidor.py
+
+import asyncio
+import json
+import sqlite3
+import threading
+
+import pytest
+
+import cortex_servidor
+
+PEDIDO = {'pecas': {'500': 20, '110': 10}, 'largura_chapa': 1200, 'meta': 90, 'algoritmo': 'ffd'}
+
+
+@pytest.fixture
+def servidor():
+    servidor = cortex_servidor.ServidorCorteX(processos=2, tempo_max_s=1.0)
+    servidor.preparar_pool()
+    yield servidor
+    servidor.pool.shutdown(wait=True, cancel_futures=True)
+
+
+def corpo(**campos):
+    return json.dumps(dict(PEDIDO, **campos)).encode('utf-8')
+
+
+def test_pedido_ja_resolvido_nao_vai_para_o_pool(servidor):
+    primeira = asyncio.run(servidor.otimizar(corpo(id='a')))
+    assert primeira['origem'] == 'calculo' and primeira['id'] == 'a'
+
+    class SemPool:
+        def submit(self, *args, **kwargs):
+            raise AssertionError("o pedido devia ter sido respondido sem o pool")
+
+    pool, servidor.pool = servidor.pool, SemPool()
+    try:
+        segunda = asyncio.run(servidor.otimizar(corpo(id='b')))
+    finally:
+        servidor.pool = pool
+    assert segunda['origem'] in ('cache', 'historico') and segunda['id'] == 'b'
+    assert segunda['total_chapas'] == primeira['total_chapas']
+    assert servidor.ja_resolvidos == 1
+
+
+def test_pedidos_identicos_simultaneos_sao_agrupados(servidor):
+    async def dois():
+        return await asyncio.gather(servidor.otimizar(corpo(id='a')), servidor.otimizar(corpo(id='b')))
+
+    respostas = asyncio.run(dois())
+    assert sorted(resposta['agrupado'] for resposta in respostas) == [False, True]
+    assert [resposta['id'] for resposta in respostas] == ['a', 'b']
+
+
+def test_pedido_invalido(servidor):
+    with pytest.raises(cortex_servidor.ErroHTTP):
+        asyncio.run(servidor.otimizar(corpo(algoritmo='magico')))
+    with pytest.raises(cortex_servidor.ErroHTTP):
+        asyncio.run(servidor.otimizar(b'{"pecas": [{"largura": "x", "quantidade": "2"}]}'))
+
+
+def test_http_texto_e_json(servidor):
+    async def requisitar(caminho, dados):
+        escuta = await asyncio.start_server(servidor.atender, cortex_servidor.HOST, 0)
+        porta = escuta.sockets[0].getsockname()[1]
+        async with escuta:
+            leitor, escritor = await asyncio.open_connection(cortex_servidor.HOST, porta)
+            escritor.write(f"POST {caminho} HTTP/1.1\r\nContent-Length: {len(dados)}\r\n\r\n".encode() + dados)
+            await escritor.drain()
+            resposta = await asyncio.wait_for(leitor.read(), 30)
+            escritor.close()
+        cabecalho, _, conteudo = resposta.partition(b"\r\n\r\n")
+        return cabecalho.split(b"\r\n")[0], conteudo.decode('utf-8')
+
+    status, conteudo = asyncio.run(requisitar('/otimizar', corpo()))
+    assert status.endswith(b"200 OK")
+    assert 'relatorio' not in json.loads(conteudo)
+    status, conteudo = asyncio.run(requisitar('/otimizar?formato=texto', corpo()))
+    assert status.endswith(b"200 OK") and 'PLANO DE CORTE' in conteudo
+    status, _ = asyncio.run(requisitar('/desconhecido', b''))
+    assert status.endswith(b"404 Not Found")
+
+
+def test_consulta_fora_do_laco_e_banco_bloqueado(servidor, monkeypatch):
+    threads = []
+
+    def bloqueado(*args):
+        threads.append(threading.current_thread())
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(cortex_servidor.core, 'consultar_solucao', bloqueado)
+    resposta = asyncio.run(servidor.otimizar(corpo(id='a')))
+    assert resposta['origem'] == 'calculo' and resposta['total_chapas'] > 0
+    assert threads and threads[0] is not threading.main_thread()
+
+
+def test_pedidos_2d_nas_duas_formas(servidor):
+    # Um pedido 1D com as mesmas larguras já está no cache: o 2D não pode recebê-lo.
+    assert asyncio.run(servidor.otimizar(corpo(pecas={'600': 3, '300': 2})))['origem'] == 'calculo'
+    for pecas in ({'600x400': 3, '300x500': 2},
+                  [{'largura': 600, 'comprimento': 400, 'quantidade': 3},
+                   {'largura': 300, 'comprimento': 500, 'quantidade': 2}]):
+        resposta = asyncio.run(servidor.otimizar(corpo(id='2d', pecas=pecas, comprimento_chapa=2750)))
+        assert resposta['origem'] == 'calculo' and resposta['algoritmo'] == 'guilhotina_2d'
+        assert resposta['comprimento_chapa'] == 2750 and resposta['chapas'] and resposta['id'] == '2d'
+    with pytest.raises(cortex_servidor.ErroHTTP):
+        asyncio.run(servidor.otimizar(corpo(pecas={'5000x400': 1})))
+
+
+def test_pedido_2d_nao_agrupa_com_1d(servidor):
+    async def juntos():
+        return await asyncio.gather(servidor.otimizar(corpo(id='1d', pecas={'600': 3})),
+                                    servidor.otimizar(corpo(id='2d', pecas={'600x400': 3})))
+
+    unidimensional, bidimensional = asyncio.run(juntos())
+    assert not unidimensional['agrupado'] and not bidimensional['agrupado']
+    assert 'padroes' in unidimensional and 'chapas' in bidimensional
+
+
+def test_json_e_texto_dividem_o_mesmo_calculo(servidor):
+    async def dois():
+        return await asyncio.gather(servidor.otimizar(corpo(id='a')), servidor.otimizar(corpo(id='b'), 'texto'))
+
+    em_json, em_texto = asyncio.run(dois())
+    assert sorted([em_json['agrupado'], em_texto['agrupado']]) == [False, True]
+    assert 'relatorio' not in em_json and 'PLANO DE CORTE FINAL' in em_texto['relatorio']
+    resposta = asyncio.run(servidor.otimizar(corpo(id='c', pecas={'600x400': 3}), 'texto'))
+    assert 'relatorio' in resposta
@@ -0,0 +1,75 @@
+# Arquivo: tests/test_empacotadores.py
+
+import random
+
+import otimizador_core as core
+from auxiliares import expandir, verificar_plano
+
+
+def best_fit_linear(pecas, largura_chapa):
+    """Best-Fit da versão original (varre todas as chapas abertas), para comparação."""
+    usadas, atribuicao = [], []
+    for peca in pecas:
+        melhor = None
+        for i, usada in enumerate(usadas):
+            sobra = largura_chapa - usada
+            if peca <= sobra and (melhor is None or sobra < largura_chapa - usadas[melhor]):
+                melhor = i
+        if melhor is None:
+            melhor = len(usadas)
+            usadas.append(0)
+        usadas[melhor] += peca
+        atribuicao.append(melhor)
+    return usadas, atribuicao
+
+
+def ffd_linear(pecas, largura_chapa):
+    """First-Fit da versão original, para comparação."""
+    usadas, atribuicao = [], []
+    for peca in pecas:
+        for i, usada in enumerate(usadas):
+            if peca <= largura_chapa - usada:
+                break
+        else:
+            i = len(usadas)
+            usadas.append(0)
+        usadas[i] += peca
+        atribuicao.append(i)
+    return usadas, atribuicao
+
+
+def pedidos_aleatorios(quantidade, semente=0):
+    gerador = random.Random(semente)
+    for _ in range(quantidade):
+        largura_chapa = gerador.choice([150, 1000, 1200])
+        pecas = [gerador.randint(1, largura_chapa) for _ in range(gerador.randint(1, 80))]
+        yield pecas, largura_chapa
+
+
+def test_best_fit_indexado_igual_ao_linear():
+    for pecas, largura_chapa in pedidos_aleatorios(200):
+        assert core._empacotar_best_fit(pecas, largura_chapa) == best_fit_linear(pecas, largura_chapa)
+
+
+def test_ffd_indexado_igual_ao_linear():
+    for pecas, largura_chapa in pedidos_aleatorios(200, semente=1):
+        pecas.sort(reverse=True)
+        assert core._empacotar_ffd(pecas, largura_chapa) == ffd_linear(pecas, largura_chapa)
+
+
+def test_resultado_das_listas_cobre_o_pedido():
+    pecas_dict = {500: 3, 350: 4, 110: 10}
+    for resultado in (core.otimizar_com_lista_best_fit(expandir(pecas_dict), 1200),
+                      core.otimizar_com_lista_ffd(expandir(pecas_dict), 1200)):
+        verificar_plano(resultado, pecas_dict, 1200)
+
+
+def test_best_fit_aproveita_chapas_iniciais():
+    resultado = core.otimizar_com_lista_best_fit([100, 50], 1200, chapas_iniciais=[[1000], [600]])
+    assert resultado['total_chapas'] == 2
+    assert resultado['detalhes_chapas'][0]['cortes'] == [1000, 100, 50]
+
+
+def test_lista_vazia():
+    assert core.otimizar_com_lista_ffd([], 1200)['total_chapas'] == 0
+    assert core.otimizar_com_lista_best_fit([], 1200)['total_chapas'] == 0
@@ -0,0 +1,112 @@
+# Arquivo: tests/test_historico_db.py
+
+import json
+import sqlite3
+import threading
+
+import historico_db
+
+
+def solucao(total_chapas, aproveitamento, otimo_comprovado=False, largura_chapa=1000):
+    return {'total_chapas': total_chapas, 'aproveitamento': aproveitamento, 'otimo_comprovado': otimo_comprovado,
+            'detalhes_chapas': [{'largura_usada': 900, 'sobra': largura_chapa - 900, 'cortes': [900]}]}
+
+
+def test_gravar_so_substitui_por_solucao_melhor(tmp_path):
+    conexao = historico_db.abrir(tmp_path / "h.db")
+    chave = historico_db.gerar_chave("500x4", 1000, 'ffd')
+    assert historico_db.gravar(conexao, chave, "500x4", 1000, 'ffd', solucao(3, 66.0))
+    assert historico_db.gravar(conexao, chave, "500x4", 1000, 'ffd', solucao(3, 60.0)) == 0
+    assert historico_db.buscar(conexao, chave)['aproveitamento'] == 66.0
+    assert historico_db.gravar(conexao, chave, "500x4", 1000, 'ffd', solucao(2, 100.0))
+    assert historico_db.buscar(conexao, chave)['total_chapas'] == 2
+    # Mesmo aproveitamento, mas agora comprovadamente ótimo: substitui.
+    assert historico_db.gravar(conexao, chave, "500x4", 1000, 'ffd', solucao(2, 100.0, True))
+    assert historico_db.buscar(conexao, chave)['otimo_comprovado']
+    assert historico_db.buscar(conexao, "inexistente") is None
+
+
+def test_listar_pedidos_por_largura(tmp_path):
+    conexao = historico_db.abrir(tmp_path / "h.db")
+    for pecas_id, largura_chapa in (("500x4", 1000), ("300x2", 1000), ("500x4", 1200)):
+        historico_db.gravar(conexao, historico_db.gerar_chave(pecas_id, largura_chapa, 'ffd'), pecas_id,
+                            largura_chapa, 'ffd', solucao(2, 90.0, largura_chapa=largura_chapa))
+    assert sorted(linha[1] for linha in historico_db.listar_pedidos(conexao, 1000)) == ["300x2", "500x4"]
+
+
+def test_migracao_do_json_acontece_uma_vez(tmp_path):
+    legado = tmp_path / "historico.json"
+    legado.write_text(json.dumps({
+        "500x4": solucao(2, 100.0),
+        "300x2|alg:ffd": solucao(1, 60.0, largura_chapa=1200),
+        "200x1|alg:ffd": {'total_chapas': 0, 'aproveitamento': 0},
+    }))
+    conexao = historico_db.abrir(tmp_path / "h.db", legado)
+    assert historico_db.buscar(conexao, historico_db.gerar_chave("500x4", 1000, 'best_fit'))['total_chapas'] == 2
+    assert historico_db.buscar(conexao, historico_db.gerar_chave("300x2", 1200, 'ffd')) is not None
+    assert historico_db.migrar_json(conexao, legado) == 0
+
+
+def test_duas_conexoes_gravando_ao_mesmo_tempo(tmp_path):
+    caminho = tmp_path / "h.db"
+    historico_db.abrir(caminho).close()
+
+    def gravar_varias(inicio):
+        conexao = historico_db.abrir(caminho)
+        for i in range(inicio, inicio + 50):
+            historico_db.gravar(conexao, f"k{i}", f"{i}x1", 1000, 'ffd', solucao(1, 90.0))
+        conexao.close()
+
+    threads = [threading.Thread(target=gravar_varias, args=(inicio,)) for inicio in (0, 50)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(historico_db.listar_pedidos(historico_db.abrir(caminho), 1000)) == 100
+
+
+def test_consolidados_ficam_fora_da_listagem(tmp_path):
+    conexao = historico_db.abrir(tmp_path / "h.db")
+    historico_db.gravar(conexao, historico_db.gerar_chave("500x4", 1000, 'ffd'), "500x4", 1000, 'ffd', solucao(2, 90.0))
+    chave = historico_db.gerar_chave("500x8", 1000, 'ffd', consolidado=True)
+    assert chave != historico_db.gerar_chave("500x8", 1000, 'ffd')
+    assert historico_db.gravar(conexao, chave, "500x8", 1000, 'ffd', solucao(4, 90.0), consolidado=True)
+    assert historico_db.buscar(conexao, chave)['total_chapas'] == 4
+    assert [linha[1] for linha in historico_db.listar_pedidos(conexao, 1000)] == ["500x4"]
+
+
+def test_banco_antigo_ganha_a_coluna_consolidado(tmp_path):
+    caminho = tmp_path / "h.db"
+    antigo = sqlite3.connect(str(caminho))
+    antigo.executescript("""
+        CREATE TABLE solucoes (chave TEXT PRIMARY KEY, pecas_id TEXT NOT NULL, largura_chapa NUMERIC NOT NULL,
+                               algoritmo TEXT NOT NULL, total_chapas INTEGER NOT NULL, aproveitamento REAL NOT NULL,
+                               otimo_comprovado INTEGER NOT NULL DEFAULT 0, dados TEXT NOT NULL, timestamp TEXT NOT NULL);
+        INSERT INTO solucoes VALUES ('500x4|L1000|alg:ffd', '500x4', 1000, 'ffd', 2, 90.0, 0, '{}', '2026-01-01');
+    """)
+    antigo.close()
+    conexao = historico_db.abrir(caminho)
+    historico_db.gravar(conexao, historico_db.gerar_chave("500x8", 1000, 'ffd', True), "500x8", 1000, 'ffd',
+                        solucao(4, 90.0), consolidado=True)
+    assert [linha[1] for linha in historico_db.listar_pedidos(conexao, 1000)] == ["500x4"]
+    historico_db.abrir(caminho).close()  # A coluna já existe: abrir de novo não muda nada
+
+
+def test_abrir_nao_pede_o_bloqueio_de_escrita(tmp_path, monkeypatch):
+    legado = tmp_path / "historico.json"
+    legado.write_text(json.dumps({"500x4": solucao(2, 100.0)}), encoding='utf-8')
+    caminho = tmp_path / "h.db"
+    historico_db.abrir(caminho, legado).close()
+
+    escritor = sqlite3.connect(str(caminho), isolation_level=None)
+    escritor.execute("BEGIN IMMEDIATE")  # Outra instância no meio de uma gravação
+    monkeypatch.setattr(historico_db, 'TIMEOUT_BLOQUEIO_S', 0.1)
+    try:
+        for _ in range(2):  # Já preparado neste processo e, depois, como num processo novo
+            conexao = historico_db.abrir(caminho, legado)
+            assert historico_db.buscar(conexao, historico_db.gerar_chave("500x4", 1000, 'best_fit')) is not None
+            conexao.close()
+            historico_db._preparados.clear()
+    finally:
+        escritor.execute("ROLLBACK")
+        escritor.close()
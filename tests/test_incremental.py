@@ -0,0 +1,52 @@
+# Arquivo: tests/test_incremental.py
+
+import random
+
+import otimizador_core as core
+from auxiliares import verificar_plano
+
+
+def chapas(resultado):
+    return sorted(tuple(sorted(chapa['cortes'])) for chapa in core.obter_detalhes_chapas(resultado))
+
+
+def test_so_as_chapas_afetadas_mudam():
+    anteriores = {500: 20, 300: 1}
+    plano = core.calcular_melhor_otimizacao(anteriores, 1000, 100.0, 'ffd')
+    novas = {500: 20, 300: 1, 200: 1}
+    resultado = core.resolver_incremental(plano, anteriores, novas, 1000, tempo_reparo_s=0)['resultado']
+    assert chapas(resultado) == sorted([(500, 500)] * 10 + [(200, 300)])
+    verificar_plano(resultado, novas, 1000)
+
+
+def test_pecas_removidas_saem_das_chapas_menos_aproveitadas():
+    anteriores = {500: 20, 300: 1}
+    plano = core.calcular_melhor_otimizacao(anteriores, 1000, 100.0, 'ffd')
+    resultado = core.resolver_incremental(plano, anteriores, {500: 20}, 1000, tempo_reparo_s=0)['resultado']
+    assert chapas(resultado) == [(500, 500)] * 10
+    assert resultado['otimo_comprovado']
+
+
+def test_edicoes_aleatorias_mantem_o_plano_valido():
+    gerador = random.Random(8)
+    anteriores = {gerador.randint(100, 700): gerador.randint(1, 30) for _ in range(8)}
+    plano = core.calcular_melhor_otimizacao(anteriores, 1200, 100.0, 'ffd')
+    for _ in range(30):
+        novas = dict(anteriores)
+        largura = gerador.choice(list(novas))
+        novas[largura] = max(0, novas[largura] + gerador.randint(-5, 5))
+        if gerador.random() < 0.3:
+            novas[gerador.randint(100, 700)] = gerador.randint(1, 5)  # Largura nova (troca de largura)
+        novas = {l: q for l, q in novas.items() if q}
+        resultado = core.resolver_incremental(plano, anteriores, novas, 1200, tempo_reparo_s=0.05)['resultado']
+        verificar_plano(resultado, novas, 1200)
+        assert resultado['total_chapas'] >= resultado['limite_inferior']
+        plano, anteriores = resultado, novas
+
+
+def test_incremental_nao_grava_no_historico():
+    anteriores = {500: 4}
+    plano = core.calcular_melhor_otimizacao(anteriores, 1000, 100.0, 'ffd')
+    resposta = core.resolver_incremental(plano, anteriores, {500: 5}, 1000)
+    assert resposta['origem'] == 'incremental'
+    assert core.resolver_pedido({500: 5}, 1000, 100.0, 'ffd')['origem'] == 'calculo'
@@ -0,0 +1,43 @@
+# Arquivo: tests/test_iterativo.py
+
+import otimizador_core as core
+from auxiliares import verificar_plano
+
+PEDIDO = {430: 7, 317: 11, 245: 9, 190: 13, 88: 6}
+
+
+def test_iterativo_so_gera_planos_estritamente_melhores():
+    passos = list(core.otimizar_iterativo(PEDIDO, 1200, 'best_fit'))
+    assert passos
+    aproveitamentos = [passo['resultado']['aproveitamento'] for passo in passos]
+    assert aproveitamentos == sorted(set(aproveitamentos))
+    for passo in passos:
+        assert set(passo) == {'resultado', 'estrategia', 'tempo_decorrido', 'limite_inferior'}
+        assert passo['limite_inferior'] == core.calcular_limite_inferior(PEDIDO, 1200)
+        verificar_plano(passo['resultado'], PEDIDO, 1200)
+
+
+def test_iterativo_informa_progresso_de_cada_estrategia():
+    avisos = []
+    passos = list(core.otimizar_iterativo(PEDIDO, 1200, 'best_fit', progresso=avisos.append))
+    assert [aviso['estrategias_testadas'] for aviso in avisos] == list(range(1, len(avisos) + 1))
+    assert avisos[-1]['melhor_total_chapas'] == passos[-1]['resultado']['total_chapas']
+
+
+def test_iterativo_pode_ser_interrompido_pelo_chamador():
+    fonte = core.otimizar_iterativo(PEDIDO, 1200, 'best_fit')
+    primeiro = next(fonte)
+    fonte.close()
+    assert primeiro['estrategia'] == 'best_fit_decrescente'
+
+
+def test_iterativo_vazio():
+    assert list(core.otimizar_iterativo({}, 1200)) == []
+
+
+def test_melhor_otimizacao_consome_o_gerador():
+    resultado = core.calcular_melhor_otimizacao(PEDIDO, 1200, 100.0, 'best_fit')
+    primeiro = next(core.otimizar_iterativo(PEDIDO, 1200, 'best_fit'))['resultado']
+    assert core.calcular_limite_inferior(PEDIDO, 1200) <= resultado['total_chapas'] <= primeiro['total_chapas']
+    assert 'padroes' in resultado
+    verificar_plano(resultado, PEDIDO, 1200)
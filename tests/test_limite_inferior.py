@@ -0,0 +1,59 @@
+# Arquivo: tests/test_limite_inferior.py
+
+import random
+
+import otimizador_core as core
+from auxiliares import expandir
+
+
+def otimo_por_forca_bruta(pecas, largura_chapa):
+    """Menor número de chapas, testando todas as atribuições (só para pedidos pequenos)."""
+    pecas = sorted(pecas, reverse=True)
+    melhor = [len(pecas)]
+
+    def colocar(i, sobras):
+        if len(sobras) >= melhor[0]:
+            return
+        if i == len(pecas):
+            melhor[0] = len(sobras)
+            return
+        vistas = set()
+        for j, sobra in enumerate(sobras):
+            if pecas[i] <= sobra and sobra not in vistas:
+                vistas.add(sobra)
+                sobras[j] -= pecas[i]
+                colocar(i + 1, sobras)
+                sobras[j] += pecas[i]
+        colocar(i + 1, sobras + [largura_chapa - pecas[i]])
+
+    colocar(0, [])
+    return melhor[0]
+
+
+def test_limite_nunca_passa_do_otimo():
+    gerador = random.Random(7)
+    for _ in range(300):
+        largura_chapa = gerador.choice([10, 100, 150])
+        pecas_dict = {}
+        for _ in range(gerador.randint(1, 9)):
+            largura = gerador.randint(1, largura_chapa)
+            pecas_dict[largura] = pecas_dict.get(largura, 0) + 1
+        limite = core.calcular_limite_inferior(pecas_dict, largura_chapa)
+        area = -(-sum(l * q for l, q in pecas_dict.items()) // largura_chapa)
+        assert area <= limite <= otimo_por_forca_bruta(expandir(pecas_dict), largura_chapa)
+
+
+def test_l2_melhor_que_a_area():
+    """Peças maiores que a metade não dividem chapa: o limite é o número delas, não a área."""
+    assert core.calcular_limite_inferior({600: 10}, 1000) == 10
+
+
+def test_pecas_maiores_que_a_chapa_contam_uma_chapa_cada():
+    assert core.calcular_limite_inferior({1500: 2, 500: 2}, 1000) == 3
+
+
+def test_busca_para_no_limite_e_marca_o_otimo():
+    passos = list(core.otimizar_iterativo({500: 4, 250: 8}, 1000, 'best_fit'))
+    assert passos[-1]['resultado']['otimo_comprovado']
+    assert passos[-1]['resultado']['total_chapas'] == passos[-1]['limite_inferior'] == 4
+    assert len(passos) == 1
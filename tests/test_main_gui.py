@@ -0,0 +1,72 @@
+# Arquivo: tests/test_main_gui.py
+
+import pytest
+
+tk = pytest.importorskip("tkinter")
+
+
+@pytest.fixture
+def app():
+    try:
+        raiz = tk.Tk()
+    except tk.TclError:
+        pytest.skip("sem display para o Tk")
+    raiz.withdraw()
+    import main_gui
+    aplicacao = main_gui.OtimizadorApp(raiz)
+    yield aplicacao
+    raiz.destroy()
+
+
+def numeros(app):
+    return [int(app.pecas_tree.set(item, "item")) for item in app.pecas_tree.get_children()]
+
+
+def test_linhas_numeradas_em_sequencia(app):
+    for largura in range(100, 400):
+        app._adicionar_campo_peca(str(largura), "1")
+    assert numeros(app) == list(range(1, 306))
+    assert app.total_linhas_pecas == 305
+
+
+def test_numeracao_continua_depois_de_remover_e_colar(app, monkeypatch):
+    itens = app.pecas_tree.get_children()
+    app.pecas_tree.set(itens[0], "largura", "500")
+    app.pecas_tree.set(itens[0], "quantidade", "2")
+    app.pecas_tree.selection_set(itens[1])
+    app._remover_linhas_selecionadas()
+    assert numeros(app) == [1, 2, 3, 4]
+
+    monkeypatch.setattr(app.master, "clipboard_get", lambda: "300\t4\n200\t6\n")
+    app._colar_pecas()
+    assert numeros(app) == [1, 2, 3]  # As linhas vazias do fim foram reaproveitadas
+    assert app._linhas_pecas() == [("500", "2"), ("300", "4"), ("200", "6")]
+
+    app._limpar_lista_pecas()
+    assert numeros(app) == [1, 2, 3, 4, 5]
+
+
+def otimizar_e_esperar(app, completo=False):
+    """Roda _otimizar até o fim e retorna o estado do botão Cancelar durante a execução."""
+    app._otimizar(completo)
+    estado = str(app.cancelar_button['state'])
+    app.worker_otimizacao.join(30)
+    app._verificar_fila_otimizacao()
+    return estado
+
+
+def test_ajustes_partem_do_ultimo_plano_completo(app):
+    app._limpar_lista_pecas(recriar_campos=False)
+    app.largura_chapa_var.set("1200")
+    app.algoritmo_var.set("Primeiro Encaixe Decrescente (FFD)")
+    app._adicionar_campo_peca("500", "20")
+    app._adicionar_campo_peca("300", "20")
+    assert otimizar_e_esperar(app, completo=True) == "normal"
+    base = app.plano_atual
+    assert base['pecas'] == {500: 20, 300: 20}
+
+    for largura in ("200", "150"):
+        app._adicionar_campo_peca(largura, "1")
+        assert otimizar_e_esperar(app) == "disabled"  # O ajuste não atende ao Cancelar
+        assert app.exibicao['resposta']['origem'] == 'incremental'
+        assert app.plano_atual is base
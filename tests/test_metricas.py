@@ -0,0 +1,69 @@
+# Arquivo: tests/test_metricas.py
+
+import io
+
+import pytest
+
+import metricas
+import otimizador_core as core
+
+
+@pytest.mark.parametrize('valor, ligadas', [("", False), ("0", False), ("nao", False), ("FALSE", False),
+                                            ("1", True), ("sim", True)])
+def test_variavel_de_ambiente(monkeypatch, valor, ligadas):
+    monkeypatch.setenv(metricas.VARIAVEL_AMBIENTE, valor)
+    assert metricas.ativas_pelo_ambiente() is ligadas
+    assert (metricas.coletor() is not metricas.DESLIGADAS) is ligadas
+
+
+def test_coletor_reaproveita_o_mesmo_objeto():
+    coletor = metricas.coletor(True)
+    assert metricas.coletor(coletor) is coletor
+    assert metricas.coletor(False) is metricas.DESLIGADAS
+
+
+def test_fases_somam_o_tempo():
+    coletor = metricas.Metricas()
+    for _ in range(2):
+        with coletor.fase('calculo'):
+            pass
+    coletor.estrategia('ffd', 0.5, 3)
+    coletor.registrar_gravacao(10)
+    coletor.registrar_gravacao(5)
+    dados = coletor.como_dict()
+    assert list(dados['fases_s']) == ['calculo']
+    assert dados['estrategias'] == [{'estrategia': 'ffd', 'tempo_s': 0.5, 'total_chapas': 3}]
+    assert dados['bytes_gravados'] == 15
+    assert "Estratégia ffd" in metricas.formatar_rodape(dados)
+
+
+def test_resolver_pedido_com_metricas():
+    pedido = {500: 4, 300: 6}
+    resposta = core.resolver_pedido(pedido, 1000, 100.0, 'best_fit', metricas=True)
+    dados = resposta['metricas']
+    assert dados['cache'] == 'falta' and dados['bytes_gravados'] > 0
+    assert {'cache', 'historico_busca', 'calculo', 'limite_inferior'} <= set(dados['fases_s'])
+    assert dados['estrategia_vencedora'] == dados['estrategias'][0]['estrategia']
+    assert 'MÉTRICAS DA OTIMIZAÇÃO' in core.formatar_relatorio_final(resposta, 100.0, 'best_fit')
+
+    repetida = core.resolver_pedido(pedido, 1000, 100.0, 'best_fit', metricas=True)
+    assert repetida['origem'] == 'cache' and repetida['metricas']['cache'] == 'acerto'
+
+
+def test_sem_metricas_a_resposta_nao_muda(monkeypatch):
+    monkeypatch.delenv(metricas.VARIAVEL_AMBIENTE, raising=False)
+    assert 'metricas' not in core.resolver_pedido({500: 4}, 1000, 100.0, 'ffd')
+    assert 'metricas' not in core.calcular_melhor_otimizacao({500: 4}, 1000, 100.0, 'ffd')
+
+
+def test_geracao_do_relatorio_entra_nas_metricas():
+    resposta = core.resolver_pedido({500: 4, 300: 6}, 1000, 100.0, 'best_fit', metricas=True)
+    assert 'relatorio' not in resposta['metricas']['fases_s']
+    texto = core.formatar_relatorio_final(resposta, 100.0, 'best_fit')
+    assert resposta['metricas']['fases_s']['relatorio'] > 0
+    assert "Fase relatorio" in texto
+
+    exportada = core.resolver_pedido({500: 4, 300: 6}, 1000, 100.0, 'best_fit', metricas=True)
+    arquivo = io.StringIO()
+    core.exportar_relatorio(arquivo, exportada, 100.0, 'best_fit', 1000)
+    assert "Fase relatorio" in arquivo.getvalue()
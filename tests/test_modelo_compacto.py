@@ -0,0 +1,46 @@
+# Arquivo: tests/test_modelo_compacto.py
+
+import random
+
+import otimizador_core as core
+
+
+def conferir_modelo(pecas, largura_chapa, usadas, atribuicao, usadas_iniciais=()):
+    """usadas[i] é a soma das peças atribuídas à chapa i (mais o que ela já tinha) e nenhuma chapa transborda."""
+    assert len(atribuicao) == len(pecas)
+    soma = list(usadas_iniciais) + [0] * (len(usadas) - len(usadas_iniciais))
+    for peca, chapa_index in zip(pecas, atribuicao):
+        soma[chapa_index] += peca
+    assert soma == usadas
+    for i, usada in enumerate(usadas[len(usadas_iniciais):], start=len(usadas_iniciais)):
+        assert usada <= largura_chapa or atribuicao.count(i) == 1
+
+
+def test_modelo_dos_empacotadores_consistente():
+    gerador = random.Random(6)
+    for _ in range(200):
+        largura_chapa = gerador.choice([100, 1200])
+        pecas = [gerador.randint(1, largura_chapa + 10) for _ in range(gerador.randint(0, 80))]
+        conferir_modelo(pecas, largura_chapa, *core._empacotar_best_fit(pecas, largura_chapa))
+        ordenadas = sorted(pecas, reverse=True)
+        conferir_modelo(ordenadas, largura_chapa, *core._empacotar_ffd(ordenadas, largura_chapa))
+        iniciais = [gerador.randint(0, largura_chapa) for _ in range(3)]
+        usadas, atribuicao = core._empacotar_best_fit(pecas, largura_chapa, list(iniciais))
+        conferir_modelo(pecas, largura_chapa, usadas, atribuicao, iniciais)
+
+
+def test_resultado_publico_montado_so_na_borda():
+    pecas = [500, 700, 300, 500]
+    usadas, atribuicao = core._empacotar_best_fit(pecas, 1000)
+    resultado = core._resultado_de_atribuicao(pecas, atribuicao, usadas, 1000)
+    assert resultado['detalhes_chapas'] == [
+        {'cortes': [500, 500], 'largura_usada': 1000, 'sobra': 0},
+        {'cortes': [700, 300], 'largura_usada': 1000, 'sobra': 0},
+    ]
+    assert resultado['aproveitamento'] == 100.0
+    assert core._resultado_de_atribuicao([], [], [], 1000)['total_chapas'] == 0
+
+
+def test_chapas_iniciais_mantem_os_cortes_anteriores():
+    resultado = core.otimizar_com_lista_best_fit([200, 600], 1000, chapas_iniciais=[[700], [300]])
+    assert [chapa['cortes'] for chapa in resultado['detalhes_chapas']] == [[700, 200], [300, 600]]
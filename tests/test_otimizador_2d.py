@@ -0,0 +1,87 @@
+# Arquivo: tests/test_otimizador_2d.py
+
+import io
+import json
+import random
+
+import pytest
+
+import cortex_lote
+import otimizador_2d
+
+
+def verificar_plano_2d(resultado, pecas, largura_chapa, comprimento_chapa):
+    """Cada faixa cabe na largura, cada chapa no comprimento, e as peças cortadas são exatamente as do pedido."""
+    cortadas = {}
+    total = 0
+    for chapa in resultado['chapas']:
+        total += chapa['quantidade']
+        assert chapa['comprimento_usado'] == sum(faixa['altura'] for faixa in chapa['faixas']) <= comprimento_chapa
+        for faixa in chapa['faixas']:
+            assert faixa['largura_usada'] == sum(l * q for l, _, q in faixa['cortes']) <= largura_chapa
+            for largura, comprimento, qtd in faixa['cortes']:  # listas quando o plano vem do JSON
+                assert comprimento <= faixa['altura']
+                cortadas[(largura, comprimento)] = cortadas.get((largura, comprimento), 0) + qtd * chapa['quantidade']
+    assert cortadas == {chave: qtd for chave, qtd in pecas.items() if qtd > 0}
+    assert total == resultado['total_chapas'] >= resultado['limite_inferior']
+
+
+def test_planos_2d_viaveis():
+    gerador = random.Random(11)
+    for _ in range(40):
+        pecas = {(gerador.randint(100, 1200), gerador.randint(100, 1500)): gerador.randint(1, 12)
+                 for _ in range(gerador.randint(1, 10))}
+        resultado = otimizador_2d.otimizar_guilhotina(pecas, 1850, 2750)
+        verificar_plano_2d(resultado, pecas, 1850, 2750)
+        assert 0 < resultado['aproveitamento'] <= 100
+
+
+def test_pecas_que_enchem_a_chapa():
+    resultado = otimizador_2d.otimizar_guilhotina({(925, 1375): 8}, 1850, 2750)
+    assert resultado['total_chapas'] == resultado['limite_inferior'] == 2
+    assert resultado['aproveitamento'] == 100
+
+
+def test_peca_maior_que_a_chapa():
+    with pytest.raises(ValueError):
+        otimizador_2d.otimizar_guilhotina({(2000, 100): 1}, 1850, 2750)
+
+
+def test_pecas_de_pedido_2d():
+    assert otimizador_2d.pecas_de_pedido_2d({"600x400": 3, "600X400": 1, "300x200": 2}) == {(600, 400): 4, (300, 200): 2}
+    assert otimizador_2d.pecas_de_pedido_2d([{"largura": "600", "comprimento": "400", "quantidade": "3"},
+                                             {"largura": "", "comprimento": "", "quantidade": ""}]) == {(600, 400): 3}
+    assert otimizador_2d.e_pedido_2d({"600x400": 3})
+    assert otimizador_2d.e_pedido_2d([{"largura": 600, "comprimento": 400, "quantidade": 1}])
+    assert not otimizador_2d.e_pedido_2d({"600": 3})
+    assert not otimizador_2d.e_pedido_2d([{"largura": 600, "quantidade": 3}])
+
+
+def _lote_2d(tmp_path):
+    arquivo = tmp_path / "tampos.jsonl"
+    arquivo.write_text(
+        json.dumps({"id": "tampos", "pecas": {"600x400": 10, "1200x700": 4}}) + "\n"
+        + json.dumps({"id": "curta", "comprimento_chapa": 1500, "pecas": {"600x400": 10}}) + "\n"
+        + json.dumps({"id": "grande", "pecas": [{"largura": 3000, "comprimento": 400, "quantidade": 1}]}) + "\n"
+        + json.dumps({"id": "1d", "pecas": {"500": 4}}) + "\n", encoding='utf-8')
+    padroes = {'largura_chapa': 1850, 'comprimento_chapa': 2750, 'meta': 100.0, 'algoritmo': 'ffd',
+               'tempo_max_s': 0.5, 'tempo_melhoria_s': 0}
+    return cortex_lote.ler_pedidos([str(arquivo)], padroes)
+
+
+@pytest.mark.parametrize('consolidar', [False, True])
+def test_lote_roteia_pedidos_2d(tmp_path, consolidar):
+    saida = io.StringIO()
+    if consolidar:
+        _, erros = cortex_lote.consolidar_lote(_lote_2d(tmp_path), saida=saida, log=io.StringIO())
+    else:
+        _, erros = cortex_lote.executar_lote(_lote_2d(tmp_path), processos=1, saida=saida, log=io.StringIO())
+    assert erros == 1
+    linhas = {linha['id']: linha for linha in map(json.loads, saida.getvalue().splitlines())}
+    assert linhas['tampos']['algoritmo'] == 'guilhotina_2d'
+    verificar_plano_2d(linhas['tampos'], {(600, 400): 10, (1200, 700): 4}, 1850, 2750)
+    assert linhas['curta']['comprimento_chapa'] == 1500
+    verificar_plano_2d(linhas['curta'], {(600, 400): 10}, 1850, 1500)
+    assert 'não cabe' in linhas['grande']['erro']
+    unidimensional = linhas['consolidado_1850' if consolidar else '1d']
+    assert unidimensional['algoritmo'] == 'ffd' and 'padroes' in unidimensional
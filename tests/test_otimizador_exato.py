@@ -0,0 +1,85 @@
+# Arquivo: tests/test_otimizador_exato.py
+
+import itertools
+import math
+import random
+import threading
+import time
+
+import cortex_benchmark
+import otimizador_core as core
+import otimizador_exato
+from auxiliares import verificar_plano
+
+
+def test_mochila_limitada_igual_a_forca_bruta():
+    gerador = random.Random(4)
+    for _ in range(60):
+        larguras = [gerador.randint(5, 40) for _ in range(gerador.randint(1, 4))]
+        valores = [gerador.random() for _ in larguras]
+        limites = [gerador.randint(0, 3) for _ in larguras]
+        capacidade = gerador.randint(10, 80)
+        valor, escolha = otimizador_exato.mochila_limitada(larguras, valores, limites, capacidade)
+        melhor = max(sum(v * a for v, a in zip(valores, combinacao))
+                     for combinacao in itertools.product(*(range(l + 1) for l in limites))
+                     if sum(w * a for w, a in zip(larguras, combinacao)) <= capacidade)
+        assert math.isclose(valor, melhor, abs_tol=1e-9)
+        assert sum(w * a for w, a in zip(larguras, escolha)) <= capacidade
+        assert all(0 <= a <= l for a, l in zip(escolha, limites))
+
+
+def test_exato_cobre_o_pedido():
+    gerador = random.Random(5)
+    for _ in range(20):
+        pecas_dict = {gerador.randint(50, 900): gerador.randint(1, 20) for _ in range(gerador.randint(1, 10))}
+        resultado = core._com_detalhes(core.otimizar_exato(pecas_dict, 1200))
+        verificar_plano(resultado, pecas_dict, 1200)
+
+
+def test_relaxacao_nao_passa_do_otimo():
+    for semente in range(3):
+        instancia = cortex_benchmark.gerar_tripla(60, semente)
+        resultado = core.otimizar_exato(instancia['pecas'], instancia['largura_chapa'])
+        assert resultado['lp_convergiu']
+        assert math.ceil(resultado['valor_lp'] - 1e-6) <= instancia['otimo'] <= resultado['total_chapas']
+
+
+def test_relaxacao_interrompida_continua_sendo_limite(monkeypatch):
+    """Parando no limite de iterações ou no prazo, 'valor_lp' é mais fraco, mas nunca passa do ótimo."""
+    instancia = cortex_benchmark.gerar_tripla(90, 1)
+    for iteracoes, tempo_max_s in ((1, None), (50, None), (2000, 0.2)):
+        monkeypatch.setattr(otimizador_exato, 'MAX_ITERACOES_COLUNAS', iteracoes)
+        solucao = otimizador_exato.resolver_padroes(instancia['pecas'], instancia['largura_chapa'], tempo_max_s=tempo_max_s)
+        assert not solucao['lp_convergiu']
+        assert 0 < math.ceil(solucao['valor_lp'] - 1e-6) <= instancia['otimo']
+
+
+def test_geracao_de_colunas_nao_cicla():
+    """Instância em que o simplex sem perturbação ciclava até o limite de iterações."""
+    instancia = cortex_benchmark.gerar_tripla(60, 1)
+    solucao = otimizador_exato.resolver_padroes(instancia['pecas'], instancia['largura_chapa'])
+    assert solucao['lp_convergiu']
+    assert math.isclose(solucao['valor_lp'], instancia['otimo'], abs_tol=1e-6)
+
+
+def test_exato_respeita_o_prazo():
+    instancia = cortex_benchmark.gerar_tripla(120)
+    inicio = time.monotonic()
+    resultado = core.calcular_melhor_otimizacao(instancia['pecas'], instancia['largura_chapa'], 100, 'exato', 0.3)
+    assert time.monotonic() - inicio < 2.0
+    verificar_plano(resultado, instancia['pecas'], instancia['largura_chapa'])
+
+
+def test_exato_para_quando_cancelado():
+    cancelar = threading.Event()
+    cancelar.set()
+    instancia = cortex_benchmark.gerar_tripla(120)
+    inicio = time.monotonic()
+    solucao = otimizador_exato.resolver_padroes(instancia['pecas'], instancia['largura_chapa'], cancelar=cancelar)
+    assert time.monotonic() - inicio < 1.0
+    assert not solucao['lp_convergiu']
+
+
+def test_larguras_fora_da_chapa_ficam_no_residual():
+    solucao = otimizador_exato.resolver_padroes({1500: 2, 300: 4, 2.5: 3}, 1200)
+    assert solucao['residual'] == {1500: 2, 2.5: 3}
@@ -0,0 +1,50 @@
+# Arquivo: tests/test_otimizador_vetorizado.py
+
+import random
+
+import pytest
+
+import otimizador_core as core
+import otimizador_vetorizado
+
+
+def test_limite_chapas_cobre_o_best_fit():
+    gerador = random.Random(9)
+    for _ in range(200):
+        largura_chapa = gerador.choice([100, 1200])
+        pecas = [gerador.randint(1, largura_chapa + 20) for _ in range(gerador.randint(1, 60))]
+        usadas, _ = core._empacotar_best_fit(pecas, largura_chapa)
+        assert len(usadas) <= otimizador_vetorizado.limite_chapas(pecas, largura_chapa)
+
+
+def test_sem_numpy_nao_compensa(monkeypatch):
+    monkeypatch.setattr(otimizador_vetorizado, 'DISPONIVEL', False)
+    assert not otimizador_vetorizado.compensa(1000, [500] * 10, 1200)
+
+
+def test_pedido_com_muitas_pecas_nao_compensa(monkeypatch):
+    monkeypatch.setattr(otimizador_vetorizado, 'DISPONIVEL', True)
+    assert otimizador_vetorizado.compensa(256, [10] * 5000, 100_000)
+    # Poucas chapas, mas uma matriz 256 x 100000 ocuparia centenas de MB.
+    assert otimizador_vetorizado.limite_chapas([10] * 100_000, 100_000) <= otimizador_vetorizado.MAX_CHAPAS_VETORIZADO
+    assert not otimizador_vetorizado.compensa(256, [10] * 100_000, 100_000)
+
+
+def test_lote_igual_ao_best_fit_em_python():
+    np = pytest.importorskip("numpy")
+    gerador = random.Random(10)
+    for _ in range(30):
+        largura_chapa = gerador.choice([100, 1200, 1200.5])
+        pecas = [gerador.randint(1, int(largura_chapa)) for _ in range(gerador.randint(1, 60))]
+        permutacoes = [gerador.sample(pecas, len(pecas)) for _ in range(40)]
+        totais = otimizador_vetorizado.contar_chapas_best_fit(np.array(permutacoes), largura_chapa)
+        assert totais.tolist() == [len(core._empacotar_best_fit(p, largura_chapa)[0]) for p in permutacoes]
+
+
+def test_melhor_permutacao_reproduzivel():
+    pytest.importorskip("numpy")
+    pecas = [430] * 7 + [317] * 11 + [245] * 9 + [190] * 13
+    total, ordem = otimizador_vetorizado.melhor_permutacao_best_fit(pecas, 1200, 64, semente=1)
+    assert (total, ordem) == otimizador_vetorizado.melhor_permutacao_best_fit(pecas, 1200, 64, semente=1)
+    assert sorted(ordem) == sorted(pecas)
+    assert core.otimizar_com_lista_best_fit(ordem, 1200)['total_chapas'] == total
@@ -0,0 +1,46 @@
+# Arquivo: tests/test_padroes_compactos.py
+
+import json
+import random
+from contextlib import closing
+
+import otimizador_core as core
+from auxiliares import verificar_plano
+
+
+def test_compactar_e_expandir_preservam_o_plano():
+    gerador = random.Random(3)
+    for _ in range(40):
+        pecas_dict = {gerador.randint(50, 900): gerador.randint(1, 40) for _ in range(gerador.randint(1, 6))}
+        pecas = [l for l, q in pecas_dict.items() for _ in range(q)]
+        gerador.shuffle(pecas)
+        resultado = core.otimizar_com_lista_best_fit(pecas, 1200)
+        compacto = core.compactar_resultado(resultado)
+        assert 'detalhes_chapas' not in compacto
+        assert sum(padrao['quantidade'] for padrao in compacto['padroes']) == resultado['total_chapas']
+        assert len({str(padrao['cortes']) for padrao in compacto['padroes']}) == len(compacto['padroes'])
+        verificar_plano(compacto, pecas_dict, 1200)
+        assert core.padroes_compactos(compacto) == compacto['padroes']
+
+
+def test_chapas_iguais_viram_um_padrao():
+    resultado = core.calcular_melhor_otimizacao({500: 80, 110: 40}, 1200, 100.0, 'ffd')
+    assert resultado['padroes'] == [{'cortes': [[500, 2], [110, 1]], 'largura_usada': 1110, 'sobra': 90,
+                                     'quantidade': 40}]
+    assert "Chapas 1–40: [500mm #2  //  110mm #1]" in core.exibir_resultados_como_texto(resultado, 1200)
+
+
+def test_historico_guarda_o_plano_compacto():
+    pedido = {500: 80, 110: 40}
+    core.resolver_pedido(pedido, 1200, 100.0, 'ffd')
+    with closing(core.abrir_historico()) as historico:
+        dados = historico.execute("SELECT dados FROM solucoes").fetchone()[0]
+    solucao = json.loads(dados)
+    assert 'detalhes_chapas' not in solucao and len(solucao['padroes']) == 1
+
+
+def test_historico_antigo_chapa_a_chapa_continua_legivel():
+    antigo = {'total_chapas': 2, 'aproveitamento': 90.0,
+              'detalhes_chapas': [{'cortes': [500, 400], 'largura_usada': 900, 'sobra': 100}] * 2}
+    assert core.padroes_compactos(antigo) == [{'cortes': [[500, 1], [400, 1]], 'largura_usada': 900, 'sobra': 100,
+                                               'quantidade': 2}]
@@ -0,0 +1,30 @@
+# Arquivo: tests/test_paralelo.py
+
+import otimizador_core as core
+from auxiliares import verificar_plano
+
+PEDIDO = {430: 7, 317: 11, 245: 9, 190: 13, 88: 6}
+
+
+def test_lista_embaralhada_reproduzivel():
+    assert core._lista_embaralhada(PEDIDO, 42) == core._lista_embaralhada(PEDIDO, 42)
+    assert core._lista_embaralhada(PEDIDO, 42) != core._lista_embaralhada(PEDIDO, 43)
+
+
+def test_paralelo_deterministico_e_igual_a_busca_sequencial():
+    """Sem limite de tempo, o resultado é a melhor semente (menor em caso de empate), com qualquer número de processos."""
+    esperado = min(core._avaliar_sementes(PEDIDO, 1200, [semente]) for semente in range(64))
+    for processos in (1, 2, 3):
+        resultado = core.otimizar_paralelo(PEDIDO, 1200, 100.0, tempo_max_s=None, max_tentativas=64,
+                                           processos=processos)
+        assert (resultado['total_chapas'], resultado['semente']) == esperado
+        assert resultado['tentativas'] <= 64
+        verificar_plano(resultado, PEDIDO, 1200)
+
+
+def test_paralelo_para_no_limite_inferior():
+    pedido = {600: 4, 400: 4}
+    resultado = core.otimizar_paralelo(pedido, 1000, 100.0, limite_inferior=4, tempo_max_s=None,
+                                       max_tentativas=5000, processos=2)
+    assert resultado['total_chapas'] == 4
+    assert resultado['tentativas'] < 5000
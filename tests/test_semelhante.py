@@ -0,0 +1,54 @@
+# Arquivo: tests/test_semelhante.py
+
+import historico_db
+import otimizador_core as core
+from auxiliares import verificar_plano
+
+
+def gravar(historico, pecas_dict, largura_chapa, algoritmo, timestamp):
+    resultado = core.compactar_resultado(core.otimizar_agrupado(sorted(pecas_dict.items(), reverse=True),
+                                                                largura_chapa, 'ffd'))
+    resultado['timestamp'] = timestamp
+    historico_db.gravar(historico, core.gerar_chave_historico(pecas_dict, largura_chapa, algoritmo),
+                        core.gerar_id_unico(pecas_dict), largura_chapa, algoritmo, resultado)
+
+
+def test_plano_semelhante_reparado_para_o_pedido_novo():
+    historico = core.abrir_historico()
+    gravar(historico, {500: 10, 300: 10}, 1000, 'ffd', '2026-01-01')
+    pedido = {500: 10, 300: 11, 200: 1}
+    resultado = core.buscar_plano_semelhante(historico, pedido, 1000, 'ffd')
+    verificar_plano(resultado, pedido, 1000)
+    assert core.buscar_plano_semelhante(historico, {700: 20}, 1000, 'ffd') is None
+
+
+def test_so_considera_a_mesma_chapa_e_o_mesmo_algoritmo():
+    historico = core.abrir_historico()
+    gravar(historico, {500: 10, 300: 10}, 1000, 'best_fit', '2026-01-01')
+    gravar(historico, {500: 10, 300: 10}, 1200, 'ffd', '2026-01-02')
+    pedido = {500: 10, 300: 11}
+    assert core.buscar_plano_semelhante(historico, pedido, 1000, 'ffd') is None
+    assert core.buscar_plano_semelhante(historico, pedido, 1000, 'best_fit') is not None
+    assert core.buscar_plano_semelhante(historico, pedido, 1000) is not None
+
+
+def test_limita_os_candidatos_aos_mais_recentes():
+    historico = core.abrir_historico()
+    gravar(historico, {500: 10, 300: 10}, 1000, 'ffd', '2026-01-01')
+    for i in range(5):
+        gravar(historico, {400 + i: 20}, 1000, 'ffd', f'2026-02-0{i + 1}')
+    assert [linha[1] for linha in historico_db.listar_pedidos(historico, 1000, 'ffd', 2)] == ['404x20', '403x20']
+    pedido = {500: 10, 300: 11}
+    assert core.buscar_plano_semelhante(historico, pedido, 1000, 'ffd', max_candidatos=5) is None
+    assert core.buscar_plano_semelhante(historico, pedido, 1000, 'ffd', max_candidatos=6) is not None
+
+
+def test_consolidacao_nao_serve_de_ponto_de_partida():
+    core.consolidar_pedidos({'a': {500: 10}, 'b': {300: 10}}, 1000, 100.0, 'ffd', tempo_max_s=0.5)
+    historico = core.abrir_historico()
+    assert historico_db.listar_pedidos(historico, 1000) == []
+    assert core.buscar_plano_semelhante(historico, {500: 10, 300: 11}, 1000, 'ffd') is None
+    # O mesmo turno de novo vem do histórico; o pedido comum com as mesmas peças, não.
+    core.limpar_cache()
+    assert core.consolidar_pedidos({'a': {500: 10}, 'b': {300: 10}}, 1000, 0.0, 'ffd')['origem'] == 'historico'
+    assert core.resolver_pedido({500: 10, 300: 10}, 1000, 0.0, 'ffd', tempo_max_s=0.5)['origem'] == 'calculo'
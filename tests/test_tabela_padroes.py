@@ -0,0 +1,103 @@
+# Arquivo: tests/test_tabela_padroes.py
+
+import itertools
+import json
+
+import pytest
+
+import otimizador_core as core
+import tabela_padroes
+
+
+@pytest.fixture(autouse=True)
+def memoria_limpa():
+    """Cada teste começa sem tabelas nem recusas guardadas em memória."""
+    tabela_padroes._tabelas_carregadas.clear()
+    tabela_padroes._crescimentos_recusados.clear()
+    yield
+    tabela_padroes._tabelas_carregadas.clear()
+    tabela_padroes._crescimentos_recusados.clear()
+
+
+def maximais_forca_bruta(larguras, largura_chapa):
+    padroes = set()
+    for quantidades in itertools.product(*(range(largura_chapa // l + 1) for l in larguras)):
+        livre = largura_chapa - sum(l * q for l, q in zip(larguras, quantidades))
+        if any(quantidades) and 0 <= livre < min(larguras):
+            padroes.add(tuple(sorted(((i, q) for i, q in enumerate(quantidades) if q), key=lambda par: -larguras[par[0]])))
+    return padroes
+
+
+def test_enumerar_maximais():
+    larguras = [500, 300, 220, 130]
+    padroes = tabela_padroes.enumerar_maximais(larguras, 1200, list(range(len(larguras))))
+    assert len(padroes) == len(set(padroes))
+    assert set(padroes) == maximais_forca_bruta(larguras, 1200)
+    assert tabela_padroes.enumerar_maximais(larguras, 1200, [0, 1, 2, 3], limite=3) is None
+
+
+def test_tabela_cresce_e_persiste(tmp_path):
+    tabela_padroes.atualizar(1200, [500, 300], tmp_path)
+    larguras, padroes = tabela_padroes.atualizar(1200, [300, 220, 130, 1500, 2.5], tmp_path)
+    assert larguras == [300, 500, 130, 220]
+    esperados = {tuple(sorted(p)) for p in maximais_forca_bruta(larguras, 1200)}
+    assert {tuple(sorted(p)) for p in padroes} == esperados
+    tabela_padroes._tabelas_carregadas.clear()
+    assert tabela_padroes.carregar(1200, tmp_path) == (larguras, padroes)
+
+
+def test_falha_na_gravacao_nao_deixa_temporarios(tmp_path, monkeypatch):
+    def sem_disco(*args):
+        raise OSError("disco cheio")
+
+    monkeypatch.setattr(tabela_padroes.os, 'replace', sem_disco)
+    larguras, padroes = tabela_padroes.atualizar(1200, [500, 300], tmp_path)
+    assert larguras == [300, 500] and padroes  # A tabela vale para este cálculo
+    assert list(tmp_path.iterdir()) == []
+    with pytest.raises(OSError):
+        tabela_padroes._gravar(1200, tmp_path, larguras, padroes)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_recusa_gravada_nos_metadados(tmp_path, monkeypatch):
+    tabela_padroes.atualizar(1200, [500, 300], tmp_path)
+    monkeypatch.setattr(tabela_padroes, 'MAX_PADROES_TABELA', 3)
+    assert tabela_padroes.atualizar(1200, [500, 300, 130, 70], tmp_path)[0] == [300, 500]
+    meta = json.loads((tmp_path / "padroes_1200.json").read_text(encoding='utf-8'))
+    assert meta['crescimentos_recusados'] == [[70, 130]] and meta['larguras'] == [300, 500]
+
+    # Outro processo (sem nada em memória) lê a recusa e não repete a enumeração.
+    tabela_padroes._tabelas_carregadas.clear()
+    tabela_padroes._crescimentos_recusados.clear()
+
+    def enumeracao_proibida(*args, **kwargs):
+        raise AssertionError("a enumeração recusada foi repetida")
+
+    monkeypatch.setattr(tabela_padroes, 'enumerar_maximais', enumeracao_proibida)
+    assert tabela_padroes.atualizar(1200, [500, 300, 130, 70], tmp_path)[0] == [300, 500]
+    assert tabela_padroes.atualizar(1200, [500, 300, 130, 70, 40], tmp_path)[0] == [300, 500]
+
+
+def test_recusa_nao_congela_a_tabela(tmp_path, monkeypatch):
+    tabela_padroes.atualizar(1200, [500, 300], tmp_path)
+    monkeypatch.setattr(tabela_padroes, 'MAX_PADROES_TABELA', 3)
+    tabela_padroes.atualizar(1200, [130, 70], tmp_path)
+    monkeypatch.setattr(tabela_padroes, 'MAX_PADROES_TABELA', 100_000)
+    tabela_padroes._tabelas_carregadas.clear()
+    tabela_padroes._crescimentos_recusados.clear()
+
+    # Outra largura nova, sem as recusadas, ainda faz a tabela crescer.
+    larguras, padroes = tabela_padroes.atualizar(1200, [500, 700], tmp_path)
+    assert larguras == [300, 500, 700]
+    assert {tuple(sorted(p)) for p in padroes} == {tuple(sorted(p)) for p in maximais_forca_bruta(larguras, 1200)}
+    meta = json.loads((tmp_path / "padroes_1200.json").read_text(encoding='utf-8'))
+    assert meta['crescimentos_recusados'] == []
+
+
+def test_exato_com_tabela_da_o_mesmo_plano(tmp_path, monkeypatch):
+    pedido = {500: 13, 300: 21, 220: 9, 130: 17}
+    sem_tabela = core.otimizar_exato(pedido, 1200)
+    monkeypatch.setattr(core, '_diretorio_padroes', tmp_path)
+    com_tabela = core.otimizar_exato(pedido, 1200)
+    assert com_tabela['total_chapas'] == sem_tabela['total_chapas']
+    assert (tmp_path / "padroes_1200.bin").exists()